@@ -0,0 +1,123 @@
+"""Оповещения о приближающихся и просроченных сроках задач.
+
+DeadlineScanner хранит в min-куче моменты следующих оповещений только для
+задач со сроком в пределах горизонта. Из БД читается лишь диапазон сроков
+по индексу: при старте - всё до «сегодня + горизонт», затем, по мере
+сдвига дня, только новая полоса дат. Изменения задач в приложении
+передаются сканеру напрямую (task_changed / task_removed), поэтому
+периодических полных чтений таблицы нет.
+
+    scanner = DeadlineScanner(db, horizon_days=3)
+    for alert in scanner.poll(datetime.now()):
+        print(alert.message)
+"""
+import heapq
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.database import DatabaseManager
+from app.models import Task, ProjectStatus
+
+SOON = 'soon'
+OVERDUE = 'overdue'
+
+
+@dataclass
+class DeadlineAlert:
+    task: Task
+    level: str
+
+    @property
+    def message(self) -> str:
+        when = self.task.deadline.strftime('%Y-%m-%d')
+        if self.level == OVERDUE:
+            return f"Просрочена задача «{self.task.title}» (срок {when})"
+        return f"Скоро срок задачи «{self.task.title}»: {when}"
+
+
+def _day(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class DeadlineScanner:
+    def __init__(self, db: DatabaseManager, horizon_days: int = 3):
+        self.db = db
+        self.horizon = timedelta(days=horizon_days)
+        self.tasks: Dict[int, Task] = {}
+        # (день оповещения, id задачи, версия, уровень); устаревшие записи пропускаются по версии
+        self.heap: List[tuple] = []
+        self.versions: Dict[int, int] = {}
+        self._next_version = 0
+        self.loaded_until: Optional[datetime] = None
+
+    def reload(self) -> None:
+        """Сбросить состояние; задачи перечитаются при следующем poll"""
+        self.tasks.clear()
+        self.heap.clear()
+        self.versions.clear()
+        self.loaded_until = None
+
+    def poll(self, now: datetime) -> List[DeadlineAlert]:
+        """Оповещения, наступившие к now (каждое выдаётся один раз)"""
+        today = _day(now)
+        until = today + self.horizon
+        if self.loaded_until is None or until > self.loaded_until:
+            start = self.loaded_until + timedelta(days=1) if self.loaded_until else None
+            self.loaded_until = until
+            for task in self.db.get_tasks_due_between(start, until):
+                self._track(task)
+
+        alerts = []
+        while self.heap and self.heap[0][0] <= today:
+            _, task_id, version, level = heapq.heappop(self.heap)
+            if self.versions.get(task_id) != version:
+                continue
+            task = self.tasks[task_id]
+            overdue_at = _day(task.deadline) + timedelta(days=1)
+            if level == SOON and today >= overdue_at:
+                level = OVERDUE
+            alerts.append(DeadlineAlert(task, level))
+            if level == SOON:
+                heapq.heappush(self.heap, (overdue_at, task_id, version, OVERDUE))
+        return alerts
+
+    def upcoming(self) -> List[Task]:
+        """Отслеживаемые задачи (просроченные и со сроком в пределах горизонта) по возрастанию срока"""
+        return sorted(self.tasks.values(), key=lambda task: (task.deadline, task.id))
+
+    # Изменения задач в приложении
+
+    def task_changed(self, task: Task) -> None:
+        """Задача добавлена или изменена"""
+        if self.loaded_until is None:
+            return
+        if task.status == ProjectStatus.COMPLETED or _day(task.deadline) > self.loaded_until:
+            # Срок за горизонтом: задача будет прочитана, когда до неё дойдёт полоса дат
+            self.task_removed(task.id)
+        else:
+            self._track(task)
+
+    def task_removed(self, task_id: int) -> None:
+        self.tasks.pop(task_id, None)
+        self.versions.pop(task_id, None)
+
+    def project_removed(self, project_id: int) -> None:
+        for task_id in [task.id for task in self.tasks.values() if task.project_id == project_id]:
+            self.task_removed(task_id)
+
+    def _track(self, task: Task) -> None:
+        previous = self.tasks.get(task.id)
+        self.tasks[task.id] = task
+        if previous is not None and previous.deadline == task.deadline:
+            return
+        self._next_version += 1
+        version = self.versions[task.id] = self._next_version
+        heapq.heappush(self.heap, (_day(task.deadline) - self.horizon, task.id, version, SOON))
+        if len(self.heap) > 2 * len(self.tasks) + 64:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Убрать из кучи записи удалённых и изменённых задач"""
+        self.heap = [entry for entry in self.heap if self.versions.get(entry[1]) == entry[2]]
+        heapq.heapify(self.heap)
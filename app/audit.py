@@ -0,0 +1,116 @@
+import re
+import sqlite3
+import warnings
+from contextlib import contextmanager
+from typing import Dict, List
+
+# Операторы, для которых SQLite строит план выполнения
+PLANNED_STATEMENTS = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE')
+SCAN_PATTERN = re.compile(r'^SCAN (?:TABLE )?(\w+)(.*)$')
+
+
+class QueryPlanWarning(UserWarning):
+    """Запрос читает таблицу целиком, без индекса"""
+
+
+def normalize_sql(sql: str) -> str:
+    return ' '.join(sql.split())
+
+
+class QueryAuditor:
+    """Аудитор планов запросов.
+
+    Для каждого нового (с точностью до пробелов) запроса выполняет
+    EXPLAIN QUERY PLAN, сохраняет план и предупреждает QueryPlanWarning,
+    если отслеживаемая таблица читается целиком. Проход по обычному индексу
+    (в том числе частичному) - тоже полное чтение; допустимы только покрывающий
+    индекс и запросы из allowed, которые читают всю таблицу намеренно.
+    """
+
+    def __init__(self, tables=('tasks', 'projects'), allowed=()):
+        self.tables = set(tables)
+        self.allowed = {normalize_sql(sql) for sql in allowed}
+        self.plans: Dict[str, List[str]] = {}
+        self.scans: Dict[str, List[str]] = {}
+        self._captures: List[List[str]] = []
+
+    def check(self, conn: sqlite3.Connection, sql: str, parameters=()) -> None:
+        key = normalize_sql(sql)
+        for captured in self._captures:
+            captured.append(key)
+        if key in self.plans or not key.upper().startswith(PLANNED_STATEMENTS):
+            return
+        try:
+            rows = sqlite3.Connection.execute(conn, 'EXPLAIN QUERY PLAN ' + sql, parameters).fetchall()
+        except sqlite3.Error:
+            return
+        details = [row[-1] for row in rows]
+        self.plans[key] = details
+        scans = [] if key in self.allowed else [detail for detail in details if self._is_full_scan(detail)]
+        if scans:
+            self.scans[key] = scans
+            warnings.warn(f"Полное сканирование ({'; '.join(scans)}): {key}", QueryPlanWarning, stacklevel=4)
+
+    def _is_full_scan(self, detail: str) -> bool:
+        match = SCAN_PATTERN.match(detail)
+        return bool(match) and match.group(1) in self.tables and 'USING COVERING INDEX' not in match.group(2)
+
+    @contextmanager
+    def capture(self):
+        """Список запросов, выполненных внутри блока"""
+        captured = []
+        self._captures.append(captured)
+        try:
+            yield captured
+        finally:
+            self._captures.remove(captured)
+
+    def report(self) -> str:
+        lines = []
+        for sql, details in self.plans.items():
+            marker = '!' if sql in self.scans else ' '
+            lines.append(f"{marker} {sql}")
+            lines.extend(f"      {detail}" for detail in details)
+        return '\n'.join(lines)
+
+
+class AuditedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        self.connection.auditor.check(self.connection, sql, parameters)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        seq_of_parameters = list(seq_of_parameters)
+        self.connection.auditor.check(self.connection, sql, seq_of_parameters[0] if seq_of_parameters else ())
+        return super().executemany(sql, seq_of_parameters)
+
+
+class AuditedConnection(sqlite3.Connection):
+    """Соединение, передающее каждый запрос аудитору (атрибут auditor)"""
+
+    def cursor(self, factory=AuditedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+@contextmanager
+def assert_indexed(db):
+    """Тестовый помощник: все запросы внутри блока используют индексы.
+
+    db должен быть создан с audit_queries=True.
+    """
+    if db.auditor is None:
+        raise ValueError("Аудит запросов выключен: создайте DatabaseManager(..., audit_queries=True)")
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', QueryPlanWarning)
+        with db.auditor.capture() as executed:
+            yield
+    scans = {sql: db.auditor.scans[sql] for sql in dict.fromkeys(executed) if sql in db.auditor.scans}
+    if scans:
+        details = '\n'.join(f"  {sql}\n    {'; '.join(plan)}" for sql, plan in scans.items())
+        raise AssertionError(f"Запросы без индекса:\n{details}")
@@ -0,0 +1,55 @@
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from app.database import DatabaseManager
+
+TIMESTAMP_FORMAT = '%Y%m%d-%H%M%S'
+
+
+def backup_name(db_path: str, now: Optional[datetime] = None) -> str:
+    """Имя файла снимка: <имя БД>-ГГГГММДД-ЧЧММСС.db"""
+    stem = Path(db_path).stem
+    return f"{stem}-{(now or datetime.now()).strftime(TIMESTAMP_FORMAT)}.db"
+
+
+def list_backups(directory: str, db_path: str) -> List[str]:
+    """Снимки указанной БД в каталоге, от старых к новым"""
+    stem = Path(db_path).stem
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(
+        name for name in os.listdir(directory)
+        if name.startswith(stem + '-') and name.endswith('.db')
+    )
+    return [os.path.join(directory, name) for name in names]
+
+
+def prune_backups(directory: str, db_path: str, keep: int) -> List[str]:
+    """Удаление старых снимков сверх keep последних; возвращает удалённые пути"""
+    backups = list_backups(directory, db_path)
+    removed = backups[:-keep] if keep > 0 else backups
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def run_backup(db: DatabaseManager, directory: str, keep: int = 10, pages_per_step: int = 1024) -> str:
+    """Снимок БД в каталог с ротацией.
+
+    Снимок сначала пишется во временный файл и переименовывается только
+    после успешного завершения, поэтому недописанные копии не попадают в
+    ротацию.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, backup_name(db.db_path))
+    temp_path = path + '.part'
+    try:
+        db.backup(temp_path, pages_per_step=pages_per_step)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    prune_backups(directory, db.db_path, keep)
+    return path
@@ -0,0 +1,307 @@
+"""Консольный интерфейс без Qt и matplotlib.
+
+Импортирует только app.database и app.models; импорт/экспорт подгружаются
+лишь при вызове соответствующих команд, чтобы запуск оставался быстрым.
+
+    python main.py --cli projects list
+    python main.py --cli tasks add 1 --title "Ревью" --deadline 2024-05-01 --priority HIGH
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from app.database import DatabaseManager, TASK_ORDER
+from app.models import Project, Task, ProjectStatus, TaskPriority
+
+
+def _print_projects(projects: List[Project], as_json: bool):
+    if as_json:
+        for project in projects:
+            print(json.dumps(project.to_dict(), ensure_ascii=False))
+        return
+    for project in projects:
+        end_date = project.end_date.strftime('%Y-%m-%d') if project.end_date else '-'
+        print(f"{project.id}\t{project.name}\t{project.status.value}\t"
+              f"{project.start_date:%Y-%m-%d}\t{end_date}\t{project.budget:.2f}\t{project.team_size}")
+
+
+def _print_tasks(tasks: List[Task], as_json: bool):
+    if as_json:
+        for task in tasks:
+            print(json.dumps(task.to_dict(), ensure_ascii=False))
+        return
+    for task in tasks:
+        print(f"{task.id}\t{task.project_id}\t{task.title}\t{task.assignee}\t"
+              f"{task.priority.value}\t{task.deadline:%Y-%m-%d}\t{task.status.value}")
+
+
+def cmd_projects(db: DatabaseManager, args) -> int:
+    if args.action == 'list':
+        _print_projects(db.get_all_projects(), args.json)
+    elif args.action == 'search':
+        _print_projects(db.search_projects(args.text), args.json)
+    elif args.action == 'active':
+        from app.importer import parse_date
+        day = parse_date(args.day, 'day') if args.day else datetime.now()
+        _print_projects(db.get_projects_active_on(day), args.json)
+    elif args.action == 'add':
+        from app.importer import parse_project
+        project = parse_project({
+            'name': args.name, 'description': args.description, 'start_date': args.start,
+            'end_date': args.end, 'status': args.status, 'budget': args.budget, 'team_size': args.team
+        })
+        print(db.add_project(project))
+    elif args.action == 'delete':
+        if not db.del_project(args.id):
+            print(f"Проект не найден: {args.id}", file=sys.stderr)
+            return 1
+    elif args.action == 'restore':
+        if not db.restore_project(args.id):
+            print(f"Удалённый проект не найден: {args.id}", file=sys.stderr)
+            return 1
+    return 0
+
+
+def cmd_tasks(db: DatabaseManager, args) -> int:
+    if args.action == 'list':
+        _print_tasks(db.get_tasks_by_project(args.project_id, sort=args.sort), args.json)
+    elif args.action == 'search':
+        _print_tasks(db.search_tasks(args.text, args.project), args.json)
+    elif args.action == 'add':
+        from app.importer import parse_task
+        task = parse_task({
+            'project_id': args.project_id, 'title': args.title, 'description': args.description,
+            'assignee': args.assignee, 'priority': args.priority, 'deadline': args.deadline, 'status': args.status,
+            'duration': args.duration
+        })
+        if task.project_id not in db.get_project_ids():
+            print(f"Проект не найден: {task.project_id}", file=sys.stderr)
+            return 1
+        print(db.add_task(task))
+    elif args.action == 'delete':
+        if not db.del_task(args.id):
+            print(f"Задача не найдена: {args.id}", file=sys.stderr)
+            return 1
+    elif args.action == 'restore':
+        if not db.restore_task(args.id):
+            print(f"Удалённая задача не найдена (или удалён её проект): {args.id}", file=sys.stderr)
+            return 1
+    elif args.action == 'depend':
+        db.add_dependency(args.id, args.depends_on)
+    elif args.action == 'undepend':
+        if not db.del_dependency(args.id, args.depends_on):
+            print(f"Зависимость не найдена: {args.id} -> {args.depends_on}", file=sys.stderr)
+            return 1
+    return 0
+
+
+def cmd_assignees(db: DatabaseManager, args) -> int:
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    if args.action == 'list':
+        for assignee_id, name, open_tasks, overdue, urgent in db.get_assignee_workload(today):
+            if args.json:
+                print(json.dumps({'id': assignee_id, 'name': name, 'open': open_tasks, 'overdue': overdue,
+                                  'urgent': urgent}, ensure_ascii=False))
+            else:
+                print(f"{assignee_id}\t{name}\t{open_tasks}\t{overdue}\t{urgent}")
+    elif args.action == 'tasks':
+        assignee_id = db.find_assignee(args.name)
+        if assignee_id is None:
+            print(f"Исполнитель не найден: {args.name}", file=sys.stderr)
+            return 1
+        from app.importer import parse_enum
+        priority = parse_enum(TaskPriority, args.priority) if args.priority else None
+        _print_tasks(db.get_assignee_tasks(assignee_id, args.all, priority, today if args.overdue else None),
+                     args.json)
+    return 0
+
+
+def cmd_purge(db: DatabaseManager, args) -> int:
+    print(db.purge_deleted(datetime.now() - timedelta(days=args.days)))
+    return 0
+
+
+def cmd_archive(db: DatabaseManager, args) -> int:
+    if args.action == 'run':
+        print(db.archive_projects(datetime.now() - timedelta(days=args.days)))
+    elif args.action == 'list':
+        _print_projects(db.open_archive(read_only=True).get_all_projects(), args.json)
+    elif args.action == 'search':
+        _print_projects(db.open_archive(read_only=True).search_projects(args.text), args.json)
+    elif args.action == 'restore':
+        restored = db.restore_archived(args.ids)
+        if restored < len(args.ids):
+            print(f"Возвращено {restored} из {len(args.ids)}: остальных нет в архиве", file=sys.stderr)
+            return 1
+    return 0
+
+
+def cmd_schedule(db: DatabaseManager, args) -> int:
+    from app.schedule import ProjectSchedule
+    project = db.get_project(args.project_id)
+    if project is None:
+        print(f"Проект не найден: {args.project_id}", file=sys.stderr)
+        return 1
+    schedule = ProjectSchedule.from_database(db, project.id)
+    dates = schedule.dates(project.start_date)
+    slack = schedule.slack()
+    critical = set(schedule.critical_path())
+    for task in sorted(db.get_tasks_by_project(project.id), key=lambda item: (schedule.start[item.id], item.id)):
+        start, finish = dates[task.id]
+        if args.json:
+            print(json.dumps({'id': task.id, 'title': task.title, 'start': f"{start:%Y-%m-%d}",
+                              'finish': f"{finish:%Y-%m-%d}", 'slack': slack[task.id],
+                              'critical': task.id in critical}, ensure_ascii=False))
+        else:
+            print(f"{'*' if task.id in critical else ' '} {task.id}\t{task.title}\t"
+                  f"{start:%Y-%m-%d}\t{finish:%Y-%m-%d}\t{slack[task.id]}")
+    if not args.json:
+        print(f"Длительность проекта: {schedule.makespan()} дн.")
+    return 0
+
+
+def cmd_import(db: DatabaseManager, args) -> int:
+    from app.importer import import_file
+    id_map = {}
+    for table, path in (('projects', args.projects), ('tasks', args.tasks)):
+        if path:
+            result = import_file(db, table, path, workers=args.workers, id_map=id_map)
+            print(f"{table}: импортировано {result.imported}, отклонено {result.rejected}")
+            if result.report_path:
+                print(f"Отчёт: {result.report_path}")
+    return 0
+
+
+def cmd_export(db: DatabaseManager, args) -> int:
+    from app.exporter import detect_format, export_table
+    fmt, compress = detect_format(args.output)
+    print(export_table(db, args.table, args.output, fmt, compress))
+    return 0
+
+
+def cmd_report(db: DatabaseManager, args) -> int:
+    from app.reports import generate_reports
+    paths = generate_reports(db, args.output, args.project_ids or None, args.workers)
+    print(f"Отчётов: {len(paths)}, оглавление: {args.output}/index.html")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="main.py --cli", description="Управление проектами из командной строки")
+    parser.add_argument('--db', default='projects.db', help="Путь к базе данных")
+    parser.add_argument('--json', action='store_true', help="Вывод в формате JSON Lines")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    projects = commands.add_parser('projects', help="Проекты")
+    project_actions = projects.add_subparsers(dest='action', required=True)
+    project_actions.add_parser('list', help="Список проектов")
+    search = project_actions.add_parser('search', help="Поиск по названию и описанию")
+    search.add_argument('text')
+    active = project_actions.add_parser('active', help="Проекты, идущие в указанный день")
+    active.add_argument('day', nargs='?', help="ГГГГ-ММ-ДД (по умолчанию - сегодня)")
+    add = project_actions.add_parser('add', help="Добавить проект")
+    add.add_argument('--name', required=True)
+    add.add_argument('--description', default='')
+    add.add_argument('--start', required=True, help="ГГГГ-ММ-ДД")
+    add.add_argument('--end', help="ГГГГ-ММ-ДД")
+    add.add_argument('--status', default=ProjectStatus.PLANNING.name,
+                     help=f"{', '.join(status.name for status in ProjectStatus)} или русское название")
+    add.add_argument('--budget', type=float, default=0.0)
+    add.add_argument('--team', type=int, default=0)
+    delete = project_actions.add_parser('delete', help="Удалить проект со всеми задачами")
+    delete.add_argument('id', type=int)
+    restore = project_actions.add_parser('restore', help="Отменить удаление проекта")
+    restore.add_argument('id', type=int)
+    projects.set_defaults(handler=cmd_projects)
+
+    tasks = commands.add_parser('tasks', help="Задачи")
+    task_actions = tasks.add_subparsers(dest='action', required=True)
+    task_list = task_actions.add_parser('list', help="Задачи проекта")
+    task_list.add_argument('project_id', type=int)
+    task_list.add_argument('--sort', choices=tuple(TASK_ORDER), default='created',
+                           help="Порядок: created - новые первыми, priority - по важности, deadline - по сроку")
+    search = task_actions.add_parser('search', help="Поиск по заголовку, описанию и исполнителю")
+    search.add_argument('text')
+    search.add_argument('--project', type=int, help="Только в указанном проекте")
+    add = task_actions.add_parser('add', help="Добавить задачу")
+    add.add_argument('project_id', type=int)
+    add.add_argument('--title', required=True)
+    add.add_argument('--description', default='')
+    add.add_argument('--assignee', default='')
+    add.add_argument('--priority', default=TaskPriority.MEDIUM.name,
+                     help=f"{', '.join(priority.name for priority in TaskPriority)} или русское название")
+    add.add_argument('--deadline', required=True, help="ГГГГ-ММ-ДД")
+    add.add_argument('--status', default=ProjectStatus.PLANNING.name)
+    add.add_argument('--duration', type=int, default=1, help="Длительность в днях")
+    delete = task_actions.add_parser('delete', help="Удалить задачу")
+    delete.add_argument('id', type=int)
+    restore = task_actions.add_parser('restore', help="Отменить удаление задачи")
+    restore.add_argument('id', type=int)
+    for action, help_text in (('depend', "Задача id начинается после depends_on"),
+                              ('undepend', "Удалить зависимость")):
+        dependency = task_actions.add_parser(action, help=help_text)
+        dependency.add_argument('id', type=int)
+        dependency.add_argument('depends_on', type=int)
+    tasks.set_defaults(handler=cmd_tasks)
+
+    assignees = commands.add_parser('assignees', help="Исполнители")
+    assignee_actions = assignees.add_subparsers(dest='action', required=True)
+    assignee_actions.add_parser('list', help="Нагрузка: открытых, просроченных, срочных и высоких задач")
+    assignee_tasks = assignee_actions.add_parser('tasks', help="Задачи исполнителя по сроку")
+    assignee_tasks.add_argument('name')
+    assignee_tasks.add_argument('--overdue', action='store_true', help="Только просроченные")
+    assignee_tasks.add_argument('--priority', help="Только с этим приоритетом")
+    assignee_tasks.add_argument('--all', action='store_true', help="Включая завершённые")
+    assignees.set_defaults(handler=cmd_assignees)
+
+    schedule = commands.add_parser('schedule', help="Ранние сроки задач и критический путь (*)")
+    schedule.add_argument('project_id', type=int)
+    schedule.set_defaults(handler=cmd_schedule)
+
+    purge = commands.add_parser('purge', help="Окончательно стереть удалённое раньше, чем --days дней назад")
+    purge.add_argument('--days', type=float, default=7)
+    purge.set_defaults(handler=cmd_purge)
+
+    archive = commands.add_parser('archive', help="Архив завершённых проектов (<имя БД>-archive.db)")
+    archive_actions = archive.add_subparsers(dest='action', required=True)
+    run = archive_actions.add_parser('run', help="Перенести в архив проекты, завершённые раньше --days дней назад")
+    run.add_argument('--days', type=float, default=365)
+    archive_actions.add_parser('list', help="Проекты в архиве")
+    search = archive_actions.add_parser('search', help="Поиск в архиве по названию и описанию")
+    search.add_argument('text')
+    restore = archive_actions.add_parser('restore', help="Вернуть проекты с задачами из архива")
+    restore.add_argument('ids', type=int, nargs='+')
+    archive.set_defaults(handler=cmd_archive)
+
+    import_parser = commands.add_parser('import', help="Импорт из CSV / JSON Lines")
+    import_parser.add_argument('--projects')
+    import_parser.add_argument('--tasks')
+    import_parser.add_argument('--workers', type=int, default=0, help="Число процессов разбора")
+    import_parser.set_defaults(handler=cmd_import)
+
+    export_parser = commands.add_parser('export', help="Экспорт в CSV / JSON Lines")
+    export_parser.add_argument('table', choices=('projects', 'tasks'))
+    export_parser.add_argument('output', help="Файл вывода (.csv, .jsonl, опционально .gz)")
+    export_parser.set_defaults(handler=cmd_export)
+
+    report = commands.add_parser('report', help="HTML-отчёты с графиками по проектам")
+    report.add_argument('project_ids', type=int, nargs='*', help="Проекты (по умолчанию - все)")
+    report.add_argument('--output', default='reports', help="Каталог отчётов")
+    report.add_argument('--workers', type=int, default=None, help="Число процессов (0 - без пула)")
+    report.set_defaults(handler=cmd_report)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(DatabaseManager(args.db), args)
+    except Exception as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,330 @@
+import functools
+import itertools
+import random
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
 from datetime import datetime
-from typing import List, Optional
-from app.models import Project, Task, ProjectStatus, TaskPriority
+from typing import Callable, Iterator, List, Optional, Set
+from app.models import (Project, Task, ChangeSet, ProjectStatus, TaskPriority, PROJECT_STATUS_CODES,
+                        TASK_PRIORITY_CODES, to_day_number, from_day_number)
+from app.audit import AuditedConnection, QueryAuditor
+
+PROJECT_COLUMNS = ('id', 'name', 'description', 'start_date', 'end_date', 'status', 'budget', 'team_size',
+                   'created_at', 'version')
+TASK_COLUMNS = ('id', 'project_id', 'title', 'description', 'assignee', 'priority', 'deadline', 'status',
+                'created_at', 'duration', 'version')
+# Предельная пауза между повторами записи при занятой БД, с
+MAX_RETRY_DELAY = 1.0
+# Путь БД в памяти (см. DatabaseManager)
+MEMORY = ':memory:'
+_memory_ids = itertools.count(1)
+# Архивная БД лежит рядом с основной: <имя>-archive.db (см. DatabaseManager.open_archive)
+ARCHIVE_SUFFIX = '-archive'
+# Порядок задач проекта; priority - по важности (коды TaskPriority растут с важностью)
+TASK_ORDER = {
+    'created': 'tasks.created_at DESC, tasks.id',
+    'priority': 'tasks.priority DESC, tasks.deadline, tasks.id',
+    'deadline': 'tasks.deadline, tasks.id',
+}
+
+# Удалённые записи остаются в таблицах с deletion_id (надгробие, см. del_project)
+# до физической очистки purge_deleted; все чтения берут только живые строки.
+# Явный список колонок: после миграций порядок столбцов в таблице может отличаться
+_PROJECT_SELECT = f"SELECT {', '.join(PROJECT_COLUMNS)} FROM projects WHERE deletion_id IS NULL"
+
+# Задача с именем исполнителя, колонки в порядке TASK_COLUMNS. Таблицы без
+# псевдонимов, чтобы аудитор планов узнавал их в EXPLAIN QUERY PLAN
+_TASK_SELECT = '''
+    SELECT tasks.id, tasks.project_id, tasks.title, tasks.description, COALESCE(assignees.name, ''),
+           tasks.priority, tasks.deadline, tasks.status, tasks.created_at, tasks.duration, tasks.version
+    FROM tasks LEFT JOIN assignees ON assignees.id = tasks.assignee_id
+    WHERE tasks.deletion_id IS NULL
+'''
+
+
+# Запросы, которые читают всю таблицу намеренно (аудитор планов их не отмечает):
+# страница списка проектов идёт по индексу порядка, итоги считают все живые строки
+_PROJECTS_PAGE = _PROJECT_SELECT + ' ORDER BY created_at DESC, id LIMIT ? OFFSET ?'
+_COUNT_PROJECTS = 'SELECT COUNT(*) FROM projects WHERE deletion_id IS NULL'
+_COUNT_TASKS = 'SELECT COUNT(*) FROM tasks WHERE deletion_id IS NULL'
+_AUDIT_ALLOWED = (_PROJECTS_PAGE, _COUNT_PROJECTS, _COUNT_TASKS)
+
+
+def memory_uri(name: str) -> str:
+    """Путь именованной БД в памяти, общей для всех DatabaseManager процесса с этим путём"""
+    return f"file:/{name}?vfs=memdb"
+
+
+
+def _code(member) -> int:
+    return member.code
+
+
+def _optional_day(value: Optional[datetime]) -> Optional[int]:
+    return to_day_number(value) if value is not None else None
+
+
+# Поля моделей, которые можно изменить update_project / update_task: имя -> преобразование
+# в значение столбца (None - как есть). Исполнитель задачи пишется отдельно, через assignee_id
+_UPDATABLE = {
+    'projects': {'name': None, 'description': None, 'start_date': to_day_number, 'end_date': _optional_day,
+                 'status': _code, 'budget': None, 'team_size': None},
+    'tasks': {'title': None, 'description': None, 'priority': _code, 'deadline': to_day_number, 'status': _code,
+              'duration': None, 'assignee': None},
+}
+
+
+def _lower(value: Optional[str]) -> Optional[str]:
+    # Встроенная lower() SQLite не работает с кириллицей
+    return value.lower() if value else value
+
+
+def normalize_assignee(name: str) -> str:
+    """Ключ исполнителя: без лишних пробелов, регистра и различия е/ё"""
+    return ' '.join(name.split()).casefold().replace('ё', 'е')
+
+
+class DatabaseError(Exception):
+    """Ошибка слоя данных"""
+
+
+class DatabaseBusyError(DatabaseError):
+    """БД заблокирована другим соединением или процессом дольше busy_timeout"""
+
+
+class DatabaseIntegrityError(DatabaseError):
+    """Нарушено ограничение целостности (внешний ключ, NOT NULL и т.п.)"""
+
+
+def _database_error(message: str, error: sqlite3.Error) -> DatabaseError:
+    """Типизированное исключение для ошибки sqlite3 с сообщением вида «<message>: <error>»"""
+    if isinstance(error, sqlite3.IntegrityError):
+        cls = DatabaseIntegrityError
+    elif getattr(error, 'sqlite_errorcode', None) in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED) \
+            or 'locked' in str(error):
+        cls = DatabaseBusyError
+    else:
+        cls = DatabaseError
+    return cls(f"{message}: {error}")
+
+
+def _retry_busy(method):
+    """Повтор записи с экспоненциальной паузой, пока БД занята.
+
+    Внутри batch() не повторяет: откатывается и повторяется весь пакет.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        delay = self.retry_delay
+        for attempt in range(self.retries + 1):
+            try:
+                return method(self, *args, **kwargs)
+            except DatabaseBusyError:
+                if attempt == self.retries or getattr(self._local, 'batch', None) is not None:
+                    raise
+                time.sleep(delay * random.uniform(0.5, 1.5))
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+    return wrapper
+
+
+class DependencyCycleError(DatabaseIntegrityError):
+    """Зависимость замкнула бы цикл"""
+
+
+class StaleVersionError(DatabaseError):
+    """Строку изменили после того, как её прочитали: версия не совпала"""
+
+
+class _BatchConnection:
+    """Соединение пакета записи: commit, close и выход из with откладываются до конца пакета"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
 
 class DatabaseManager:
-    def __init__(self, db_path: str = "projects.db"):
+    def __init__(self, db_path: str = "projects.db", audit_queries: bool = False, persistent: bool = False,
+                 busy_timeout: float = 5.0, retries: int = 5, retry_delay: float = 0.05, read_only: bool = False):
         self.db_path = db_path
-        self._init_database()
+        # Сколько секунд SQLite ждёт снятия чужой блокировки, прежде чем вернуть SQLITE_BUSY,
+        # и сколько раз после этого запись повторяется с паузой от retry_delay
+        self.busy_timeout = busy_timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        # В режиме аудита для каждого нового запроса снимается план выполнения
+        self.auditor = QueryAuditor(allowed=_AUDIT_ALLOWED) if audit_queries else None
+        # persistent: у каждого потока одно долгоживущее соединение вместо нового на каждый вызов
+        self.persistent = persistent
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # БД в памяти: MEMORY - своя для экземпляра, memory_uri(name) - общая по имени.
+        # Соединения открывают её через VFS memdb: в отличие от shared cache блокировки
+        # там как у файла (ждут busy_timeout, а не падают сразу). _keeper держит БД
+        # живой между вызовами - она исчезает с последним соединением
+        if db_path == MEMORY:
+            db_path = memory_uri(f"projects-{next(_memory_ids)}")
+        # read_only: файл открывается только для чтения, схема не создаётся и не мигрирует
+        self.read_only = read_only
+        if read_only and not db_path.startswith('file:'):
+            db_path = Path(db_path).absolute().as_uri() + '?mode=ro'
+        self._database = db_path
+        self._keeper = self._open() if 'vfs=memdb' in db_path else None
+        self._archive = None
+        if not read_only:
+            self._init_database()
+
+    @property
+    def in_memory(self) -> bool:
+        return self._keeper is not None
+
+    @property
+    def uri(self) -> str:
+        """URI БД для открытия из другого соединения (например, ATTACH)"""
+        if self._database.startswith('file:'):
+            return self._database
+        return Path(self._database).absolute().as_uri()
+
+    def _open(self) -> sqlite3.Connection:
+        """Новое соединение с включёнными внешними ключами"""
+        uri = self._database.startswith('file:')
+        if self.auditor:
+            conn = sqlite3.connect(self._database, timeout=self.busy_timeout, factory=AuditedConnection,
+                                   check_same_thread=not self.persistent, uri=uri)
+            conn.auditor = self.auditor
+        else:
+            conn = sqlite3.connect(self._database, timeout=self.busy_timeout, check_same_thread=not self.persistent,
+                                   uri=uri)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        batch = getattr(self._local, 'batch', None)
+        if batch is not None:
+            return batch
+        if not self.persistent:
+            return self._open()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _release(self, conn) -> None:
+        """Закрытие соединения, полученного из _connect (долгоживущие остаются открытыми)"""
+        if not self.persistent:
+            conn.close()
 
+    def close(self) -> None:
+        """Закрытие долгоживущих соединений всех потоков"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    @contextmanager
+    def batch(self):
+        """Групповая запись: вызовы методов внутри блока (в этом потоке) идут
+        одной транзакцией на одном соединении и фиксируются одним commit"""
+        if getattr(self._local, 'batch', None) is not None:
+            yield
+            return
+        conn = self._connect()
+        self._local.batch = _BatchConnection(conn)
+        try:
+            yield
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise _database_error("Ошибка записи пакета", e)
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.batch = None
+            self._release(conn)
+
+    @contextmanager
+    def savepoint(self, name: str = 'call'):
+        """Часть пакета batch(): при исключении откатывается только она, остальное
+        пакета фиксируется как обычно. Вне batch() ничего не делает"""
+        conn = getattr(self._local, 'batch', None)
+        if conn is None:
+            yield
+            return
+        try:
+            # Транзакция открывается заранее: RELEASE внешней точки сохранения сам сделал бы commit
+            if not conn.in_transaction:
+                conn.execute('BEGIN IMMEDIATE')
+            conn.execute(f'SAVEPOINT {name}')
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка записи пакета", e)
+        try:
+            yield
+        except BaseException:
+            conn.execute(f'ROLLBACK TO {name}')
+            conn.execute(f'RELEASE {name}')
+            raise
+        conn.execute(f'RELEASE {name}')
+
+    @staticmethod
+    def _project_from_row(row) -> Project:
+        # Даты - номера дней, end_date может быть NULL
+        return Project(
+            id=row[0],
+            name=row[1],
+            description=row[2],
+            start_date=from_day_number(row[3]),
+            end_date=from_day_number(row[4]) if row[4] is not None else None,
+            status=ProjectStatus.from_code(row[5]),
+            budget=row[6],
+            team_size=row[7],
+            version=row[9]
+        )
+
+    @staticmethod
+    def _task_from_row(row) -> Task:
+        # Создаём объект Task с enum значениями
+        return Task(
+            id=row[0],
+            project_id=row[1],
+            title=row[2],
+            description=row[3],
+            assignee=row[4],
+            priority=TaskPriority.from_code(row[5]),
+            deadline=from_day_number(row[6]),
+            status=ProjectStatus.from_code(row[7]),
+            duration=row[9],
+            version=row[10]
+        )
+
+    @_retry_busy
     def _init_database(self):
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("PRAGMA foreign_keys = ON")
+            with self._connect() as conn:
                 cursor = conn.cursor()
+                # Место, освобождённое purge_deleted, возвращается порциями (действует для новых файлов БД)
+                cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
 
                 # Таблица проектов
                 cursor.execute('''
@@ -20,12 +332,32 @@ class DatabaseManager:
                                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                                 name TEXT NOT NULL,
                                 description TEXT,
-                                start_date TEXT NOT NULL,
-                                end_date TEXT,
-                                status TEXT NOT NULL,
+                                start_date INTEGER NOT NULL,
+                                end_date INTEGER,
+                                status INTEGER NOT NULL,
                                 budget REAL NOT NULL,
                                 team_size INTEGER NOT NULL,
-                                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                                deletion_id INTEGER,
+                                version INTEGER NOT NULL DEFAULT 1
+                            )
+                        ''')
+
+                # Надгробия: одно удаление (проект с задачами или задача) - одна запись
+                cursor.execute('''
+                            CREATE TABLE IF NOT EXISTS deletions (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                deleted_at REAL NOT NULL
+                            )
+                        ''')
+
+                # Исполнители; name_key - нормализованное имя, чтобы опечатки в регистре
+                # и пробелах не превращали одного человека в нескольких
+                cursor.execute('''
+                            CREATE TABLE IF NOT EXISTS assignees (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                name TEXT NOT NULL,
+                                name_key TEXT NOT NULL UNIQUE
                             )
                         ''')
 
@@ -36,22 +368,198 @@ class DatabaseManager:
                                 project_id INTEGER NOT NULL,
                                 title TEXT NOT NULL,
                                 description TEXT,
-                                assignee TEXT NOT NULL,
-                                priority TEXT NOT NULL,
-                                deadline TEXT NOT NULL,
-                                status TEXT NOT NULL,
+                                assignee_id INTEGER REFERENCES assignees (id),
+                                priority INTEGER NOT NULL,
+                                deadline INTEGER NOT NULL,
+                                status INTEGER NOT NULL,
                                 created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                                duration INTEGER NOT NULL DEFAULT 1,
+                                deletion_id INTEGER,
+                                version INTEGER NOT NULL DEFAULT 1,
                                 FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE
                             )
                         ''')
+
+                self._migrate(cursor)
+
+                # Зависимости: task_id не может начаться, пока не завершена depends_on
+                cursor.execute('''
+                            CREATE TABLE IF NOT EXISTS task_dependencies (
+                                task_id INTEGER NOT NULL,
+                                depends_on INTEGER NOT NULL,
+                                PRIMARY KEY (task_id, depends_on),
+                                FOREIGN KEY (task_id) REFERENCES tasks (id) ON DELETE CASCADE,
+                                FOREIGN KEY (depends_on) REFERENCES tasks (id) ON DELETE CASCADE
+                            )
+                        ''')
+
+                # Индекс для выборки задач проекта и каскадного удаления (полный - нужен внешнему ключу)
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_project ON tasks (project_id)')
+                # Остальные индексы частичные: только живые строки
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON tasks (deadline) '
+                               'WHERE deletion_id IS NULL')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_projects_end ON projects (end_date, start_date) '
+                               'WHERE deletion_id IS NULL')
+                # Порядок списка проектов: страница читается по индексу без сортировки
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_projects_created ON projects (created_at DESC, id) '
+                               'WHERE deletion_id IS NULL')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_assignee ON tasks (assignee_id, deadline) '
+                               'WHERE deletion_id IS NULL')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_deletion ON tasks (deletion_id) '
+                               'WHERE deletion_id IS NOT NULL')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_projects_deletion ON projects (deletion_id) '
+                               'WHERE deletion_id IS NOT NULL')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_dependencies_depends_on '
+                               'ON task_dependencies (depends_on)')
+
+                # Журнал изменений для инкрементальной синхронизации (get_changes_since):
+                # только дописывается (индекс по строкам заметно замедлил бы массовую
+                # вставку), повторы одной строки убирает compact_changes.
+                # AUTOINCREMENT не переиспользует номера ревизий
+                cursor.execute('''
+                            CREATE TABLE IF NOT EXISTS changes (
+                                revision INTEGER PRIMARY KEY AUTOINCREMENT,
+                                table_name TEXT NOT NULL,
+                                row_id INTEGER NOT NULL,
+                                operation TEXT NOT NULL
+                            )
+                        ''')
+                # Удалённый надгробием проект остаётся в таблице, и внешний ключ его пропускает:
+                # задачи в него не добавляются и не переносятся
+                for event in ('INSERT', 'UPDATE OF project_id'):
+                    cursor.execute(f'''
+                        CREATE TRIGGER IF NOT EXISTS trg_tasks_live_project_{event.split()[0].lower()}
+                        BEFORE {event} ON tasks
+                        WHEN (SELECT deletion_id FROM projects WHERE id = NEW.project_id) IS NOT NULL
+                        BEGIN
+                            SELECT RAISE(ABORT, 'проект удалён');
+                        END
+                    ''')
+
+                # Ревизия, до которой журнал уже сжат (compact_changes)
+                cursor.execute('''
+                            CREATE TABLE IF NOT EXISTS changes_compacted (
+                                id INTEGER PRIMARY KEY CHECK (id = 1),
+                                revision INTEGER NOT NULL
+                            )
+                        ''')
+                for table in ('projects', 'tasks'):
+                    for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+                        cursor.execute(f'''
+                            CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()} AFTER {event} ON {table}
+                            BEGIN
+                                INSERT INTO changes (table_name, row_id, operation)
+                                VALUES ('{table}', {row}.id, '{event.lower()}');
+                            END
+                        ''')
                 conn.commit()
         except sqlite3.Error as e:
-            raise Exception(f"Ошибка инициализации БД: {e}")
+            raise _database_error("Ошибка инициализации БД", e)
+
+    @classmethod
+    def _migrate(cls, cursor: sqlite3.Cursor) -> None:
+        """Приведение таблиц, созданных прежними версиями, к текущей схеме (одной транзакцией)"""
+        columns = {row[1]: row[2] for row in cursor.execute('PRAGMA table_info(tasks)')}
+        project_columns = {row[1]: row[2] for row in cursor.execute('PRAGMA table_info(projects)')}
+        # Прежде текстовые столбцы: (таблица, столбец, выражение нового значения, параметры, допустим ли NULL).
+        # Статусы и приоритеты хранились русскими названиями, даты - строками ГГГГ-ММ-ДД
+        conversions = []
+        for table, column, codes, types in (('projects', 'status', PROJECT_STATUS_CODES, project_columns),
+                                            ('tasks', 'status', PROJECT_STATUS_CODES, columns),
+                                            ('tasks', 'priority', TASK_PRIORITY_CODES, columns)):
+            if types[column].upper() == 'TEXT':
+                cases = ' '.join('WHEN ? THEN ?' for _ in codes)
+                params = [item for member, code in codes.items() for item in (member.value, code)]
+                conversions.append((table, column, f'CASE {column} {cases} END', params, False))
+        for table, column, types, nullable in (('projects', 'start_date', project_columns, False),
+                                               ('projects', 'end_date', project_columns, True),
+                                               ('tasks', 'deadline', columns, False)):
+            if types[column].upper() == 'TEXT':
+                conversions.append((table, column, f"CAST(julianday(date({column})) - julianday('1970-01-01') "
+                                                   f"AS INTEGER)", [], nullable))
+        soft_delete = 'deletion_id' in columns and 'deletion_id' in project_columns
+        versioned = 'version' in columns and 'version' in project_columns
+        if 'duration' in columns and 'assignee' not in columns and not conversions and soft_delete and versioned:
+            return
+
+        cursor.execute('BEGIN')
+        for table, table_columns in (('projects', project_columns), ('tasks', columns)):
+            if 'version' not in table_columns:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1')
+        if not soft_delete:
+            for table, table_columns in (('projects', project_columns), ('tasks', columns)):
+                if 'deletion_id' not in table_columns:
+                    cursor.execute(f'ALTER TABLE {table} ADD COLUMN deletion_id INTEGER')
+            # Индексы пересоздаются частичными (только живые строки)
+            for index in ('idx_tasks_deadline', 'idx_tasks_assignee', 'idx_projects_end'):
+                cursor.execute(f'DROP INDEX IF EXISTS {index}')
+        if 'duration' not in columns:
+            cursor.execute('ALTER TABLE tasks ADD COLUMN duration INTEGER NOT NULL DEFAULT 1')
+        if 'assignee' in columns:
+            # Имена исполнителей -> таблица assignees. Варианты написания одного имени
+            # объединяются по normalize_assignee, основным становится самый частый
+            if 'assignee_id' not in columns:
+                cursor.execute('ALTER TABLE tasks ADD COLUMN assignee_id INTEGER REFERENCES assignees (id)')
+            cursor.execute('CREATE TEMP TABLE assignee_map (raw TEXT PRIMARY KEY, assignee_id INTEGER)')
+            names = cursor.execute('SELECT assignee FROM tasks GROUP BY assignee ORDER BY COUNT(*) DESC').fetchall()
+            for (raw,) in names:
+                key = normalize_assignee(raw or '')
+                if not key:
+                    continue
+                cursor.execute('INSERT OR IGNORE INTO assignees (name, name_key) VALUES (?, ?)',
+                               (' '.join(raw.split()), key))
+                cursor.execute('INSERT INTO temp.assignee_map SELECT ?, id FROM assignees WHERE name_key = ?',
+                               (raw, key))
+            cursor.execute('UPDATE tasks SET assignee_id = '
+                           '(SELECT assignee_id FROM temp.assignee_map WHERE raw = tasks.assignee)')
+            cursor.execute('DROP TABLE temp.assignee_map')
+            cursor.execute('ALTER TABLE tasks DROP COLUMN assignee')
+        for conversion in conversions:
+            cls._migrate_column(cursor, *conversion)
+        cursor.execute('COMMIT')
+
+    @staticmethod
+    def _migrate_column(cursor: sqlite3.Cursor, table: str, column: str, expression: str, params: list,
+                        nullable: bool) -> None:
+        """Замена текстового столбца INTEGER-столбцом со значениями expression.
 
+        Индексы по столбцу удаляются (_init_database создаёт их заново); значение,
+        которое не удалось перевести, прерывает миграцию.
+        """
+        for _, index, _, origin, _ in cursor.execute(f'PRAGMA index_list({table})').fetchall():
+            if origin == 'c' and column in {row[2] for row in cursor.execute(f'PRAGMA index_info({index})')}:
+                cursor.execute(f'DROP INDEX {index}')
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column}_new INTEGER')
+        cursor.execute(f'UPDATE {table} SET {column}_new = {expression}', params)
+        if not nullable:
+            unknown = cursor.execute(f'SELECT DISTINCT {column} FROM {table} WHERE {column}_new IS NULL').fetchall()
+            if unknown:
+                raise sqlite3.IntegrityError(
+                    f"Неизвестные значения {table}.{column}: {', '.join(str(row[0]) for row in unknown)}")
+        cursor.execute(f'ALTER TABLE {table} DROP COLUMN {column}')
+        cursor.execute(f'ALTER TABLE {table} RENAME COLUMN {column}_new TO {column}')
+
+    @staticmethod
+    def _assignee_ids(conn, names) -> dict:
+        """{имя: id исполнителя} с созданием недостающих; пустое имя - None.
+
+        Основным написанием нового исполнителя становится первое встреченное.
+        """
+        ids = {}
+        for name in dict.fromkeys(names):
+            key = normalize_assignee(name or '')
+            if not key:
+                ids[name] = None
+                continue
+            conn.execute('INSERT OR IGNORE INTO assignees (name, name_key) VALUES (?, ?)',
+                         (' '.join(name.split()), key))
+            ids[name] = conn.execute('SELECT id FROM assignees WHERE name_key = ?', (key,)).fetchone()[0]
+        return ids
+
+    @_retry_busy
     def add_project(self, project: Project) -> int:
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("PRAGMA foreign_keys = ON")
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                             INSERT INTO projects (name, description, start_date, end_date, status, budget, team_size)
@@ -59,121 +567,862 @@ class DatabaseManager:
                         ''', (
                     project.name,
                     project.description,
-                    project.start_date.strftime('%Y-%m-%d'),
-                    project.end_date.strftime('%Y-%m-%d') if project.end_date else None,
-                    project.status.value,
+                    to_day_number(project.start_date),
+                    to_day_number(project.end_date) if project.end_date else None,
+                    project.status.code,
                     project.budget,
                     project.team_size
                 ))
                 conn.commit()
                 return cursor.lastrowid
         except sqlite3.Error as e:
-            raise Exception(f"Ошибка добавления проекта: {e}")
+            raise _database_error("Ошибка добавления проекта", e)
 
+    @_retry_busy
     def add_task(self, task: Task) -> int:
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("PRAGMA foreign_keys = ON")
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
-                            INSERT INTO tasks (project_id, title, description, assignee, priority, deadline, status)
-                            VALUES (?, ?, ?, ?, ?, ?, ?)
+                            INSERT INTO tasks (project_id, title, description, assignee_id, priority, deadline, status,
+                                               duration)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                         ''', (
                     task.project_id,
                     task.title,
                     task.description,
-                    task.assignee,
-                    task.priority.value,
-                    task.deadline.strftime('%Y-%m-%d'),
-                    task.status.value
+                    self._assignee_ids(conn, [task.assignee])[task.assignee],
+                    task.priority.code,
+                    to_day_number(task.deadline),
+                    task.status.code,
+                    task.duration
                 ))
                 conn.commit()
                 return cursor.lastrowid
         except sqlite3.Error as e:
-            raise Exception(f"Ошибка добавления задачи: {e}")
+            raise _database_error("Ошибка добавления задачи", e)
+
+    @_retry_busy
+    def update_project(self, project_id: int, version: Optional[int] = None, **fields) -> Optional[int]:
+        """Изменение полей проекта (имена - как в Project); пишутся только переданные столбцы.
+
+        version - версия, с которой проект был прочитан: если с тех пор его изменили,
+        StaleVersionError (None - без проверки). Возвращает новую версию; None - проекта нет.
+        """
+        return self._update('projects', project_id, version, fields)
+
+    @_retry_busy
+    def update_task(self, task_id: int, version: Optional[int] = None, **fields) -> Optional[int]:
+        """Изменение полей задачи (имена - как в Task), см. update_project"""
+        return self._update('tasks', task_id, version, fields)
+
+    def _update(self, table: str, object_id: int, version: Optional[int], fields: dict) -> Optional[int]:
+        updatable = _UPDATABLE[table]
+        unknown = set(fields) - set(updatable)
+        if unknown:
+            raise ValueError(f"Поля нельзя изменить: {', '.join(sorted(unknown))}")
+        try:
+            with self._connect() as conn:
+                values = {}
+                for name, value in fields.items():
+                    if name == 'assignee':
+                        values['assignee_id'] = self._assignee_ids(conn, [value])[value]
+                    else:
+                        values[name] = updatable[name](value) if updatable[name] else value
+                # Без изменяемых полей строка не пишется, только проверяется версия
+                if values:
+                    query = f'UPDATE {table} SET ' + ''.join(f'{column} = ?, ' for column in values) + \
+                        'version = version + 1 WHERE id = ? AND deletion_id IS NULL'
+                else:
+                    query = f'SELECT version FROM {table} WHERE id = ? AND deletion_id IS NULL'
+                params = [*values.values(), object_id]
+                if version is not None:
+                    query += ' AND version = ?'
+                    params.append(version)
+                rows = conn.execute(query + (' RETURNING version' if values else ''), params).fetchall()
+                if not rows:
+                    current = conn.execute(f'SELECT version FROM {table} WHERE id = ? AND deletion_id IS NULL',
+                                           (object_id,)).fetchone()
+                    if current is not None:
+                        raise StaleVersionError(f"Запись {object_id} уже изменена (версия {current[0]}, "
+                                                f"ожидалась {version})")
+                conn.commit()
+                return rows[0][0] if rows else None
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка изменения", e)
 
+    @_retry_busy
     def del_project(self, project_id: int) -> bool:
+        """Удаление проекта с задачами. Строки помечаются одним надгробием и скрываются
+        из всех выборок; отменить - restore_project, физически удаляет purge_deleted"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("PRAGMA foreign_keys = ON")
-                cursor = conn.cursor()
-                cursor.execute('DELETE FROM projects WHERE id = ?', (project_id,))
+            with self._connect() as conn:
+                if not conn.in_transaction:
+                    conn.execute('BEGIN IMMEDIATE')
+                deletion_id = self._new_deletion(conn, 'projects', project_id)
+                if deletion_id is not None:
+                    conn.execute('UPDATE tasks SET deletion_id = ? WHERE project_id = ? AND deletion_id IS NULL',
+                                 (deletion_id, project_id))
                 conn.commit()
-                return cursor.rowcount > 0
+                return deletion_id is not None
         except sqlite3.Error as e:
-            raise Exception(f"Ошибка удаления проекта: {e}")
+            raise _database_error("Ошибка удаления проекта", e)
 
+    @_retry_busy
     def del_task(self, task_id: int) -> bool:
+        """Удаление задачи надгробием (см. del_project); отменить - restore_task"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("PRAGMA foreign_keys = ON")
-                cursor = conn.cursor()
-                cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+            with self._connect() as conn:
+                if not conn.in_transaction:
+                    conn.execute('BEGIN IMMEDIATE')
+                deletion_id = self._new_deletion(conn, 'tasks', task_id)
                 conn.commit()
-                return cursor.rowcount > 0
+                return deletion_id is not None
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка удаления задачи", e)
+
+    @staticmethod
+    def _new_deletion(conn, table: str, object_id: int) -> Optional[int]:
+        """Надгробие для живой строки table; None, если строки нет или она уже удалена"""
+        if not conn.execute(f'SELECT 1 FROM {table} WHERE id = ? AND deletion_id IS NULL', (object_id,)).fetchone():
+            return None
+        deletion_id = conn.execute('INSERT INTO deletions (deleted_at) VALUES (?)', (time.time(),)).lastrowid
+        conn.execute(f'UPDATE {table} SET deletion_id = ? WHERE id = ?', (deletion_id, object_id))
+        return deletion_id
+
+    @_retry_busy
+    def restore_project(self, project_id: int) -> bool:
+        """Отмена удаления проекта вместе с задачами, удалёнными с ним"""
+        return self._restore('projects', project_id)
+
+    @_retry_busy
+    def restore_task(self, task_id: int) -> bool:
+        """Отмена удаления задачи; False, если удалён её проект"""
+        return self._restore('tasks', task_id)
+
+    def _restore(self, table: str, object_id: int) -> bool:
+        try:
+            with self._connect() as conn:
+                if table == 'tasks':
+                    row = conn.execute('''
+                        SELECT tasks.deletion_id FROM tasks JOIN projects ON projects.id = tasks.project_id
+                        WHERE tasks.id = ? AND projects.deletion_id IS NULL
+                    ''', (object_id,)).fetchone()
+                else:
+                    row = conn.execute('SELECT deletion_id FROM projects WHERE id = ?', (object_id,)).fetchone()
+                if row is None or row[0] is None:
+                    return False
+                conn.execute('UPDATE projects SET deletion_id = NULL WHERE deletion_id = ?', row)
+                conn.execute('UPDATE tasks SET deletion_id = NULL WHERE deletion_id = ?', row)
+                conn.execute('DELETE FROM deletions WHERE id = ?', row)
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка восстановления", e)
+
+    def purge_deleted(self, before: datetime, batch_size: int = 500, vacuum_pages: int = 256) -> int:
+        """Физическое удаление строк, удалённых раньше before; возвращает число удалённых строк.
+
+        Каждая порция из batch_size строк - отдельная короткая транзакция, поэтому
+        очистка не задерживает других писателей надолго. Освободившиеся страницы
+        возвращаются инкрементальным VACUUM по vacuum_pages за шаг (в БД с
+        auto_vacuum=INCREMENTAL, то есть созданных этой версией).
+        """
+        try:
+            with self._connect() as conn:
+                deletions = [row[0] for row in conn.execute(
+                    'SELECT id FROM deletions WHERE deleted_at < ? ORDER BY id', (before.timestamp(),))]
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка очистки удалённых данных", e)
+        removed = 0
+        for deletion_id in deletions:
+            # Сначала задачи порциями: каскад от проекта удалил бы их одной долгой транзакцией
+            for table in ('tasks', 'projects'):
+                while True:
+                    count = self._purge_batch(table, deletion_id, batch_size)
+                    removed += count
+                    if count < batch_size:
+                        break
+            self._purge_batch('deletions', deletion_id, 1)
+        self.compact_changes()
+        while self._incremental_vacuum(vacuum_pages):
+            pass
+        return removed
+
+    def compact_changes(self, batch_size: int = 1000) -> int:
+        """Удаление из журнала изменений всех записей строки, кроме последней; возвращает число удалённых.
+
+        Устаревшие записи бывают только у строк, изменённых после прошлого сжатия
+        (его ревизия хранится в changes_compacted). Журнал читается окнами по
+        batch_size ревизий без блокировки записи, найденное удаляется порциями
+        по batch_size - каждая отдельной короткой транзакцией.
+        """
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute('SELECT revision FROM changes_compacted').fetchone()
+                watermark = row[0] if row else 0
+                latest = {}
+                for table, row_id, revision in conn.execute(
+                        'SELECT table_name, row_id, revision FROM changes WHERE revision > ? ORDER BY revision',
+                        (watermark,)):
+                    latest[table, row_id] = revision
+                if not latest:
+                    return 0
+                top = max(latest.values())
+                stale = []
+                start = conn.execute('SELECT MIN(revision) FROM changes').fetchone()[0] - 1
+                while start < top:
+                    end = min(start + batch_size, top)
+                    stale.extend(revision for revision, table, row_id in conn.execute(
+                        'SELECT revision, table_name, row_id FROM changes WHERE revision > ? AND revision <= ?',
+                        (start, end)) if revision < latest.get((table, row_id), 0))
+                    start = end
+            finally:
+                self._release(conn)
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка сжатия журнала изменений", e)
+        for offset in range(0, len(stale), batch_size):
+            self._delete_changes(stale[offset:offset + batch_size])
+        self._delete_changes([], top)
+        return len(stale)
+
+    @_retry_busy
+    def _delete_changes(self, revisions: List[int], compacted: Optional[int] = None) -> None:
+        """Порция сжатия журнала; compacted - ревизия, до которой журнал сжат"""
+        try:
+            with self._connect() as conn:
+                if revisions:
+                    conn.execute(f"DELETE FROM changes WHERE revision IN ({', '.join('?' * len(revisions))})",
+                                 revisions)
+                if compacted is not None:
+                    conn.execute('INSERT OR REPLACE INTO changes_compacted (id, revision) VALUES (1, ?)',
+                                 (compacted,))
+                conn.commit()
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка сжатия журнала изменений", e)
+
+    @_retry_busy
+    def _purge_batch(self, table: str, deletion_id: int, batch_size: int) -> int:
+        column = 'id' if table == 'deletions' else 'deletion_id'
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute(f'''
+                    DELETE FROM {table} WHERE id IN (SELECT id FROM {table} WHERE {column} = ? LIMIT ?)
+                ''', (deletion_id, batch_size))
+                conn.commit()
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка очистки удалённых данных", e)
+
+    @_retry_busy
+    def _incremental_vacuum(self, pages: int) -> bool:
+        """Один шаг инкрементального VACUUM; True, если свободные страницы ещё остались"""
+        try:
+            with self._connect() as conn:
+                if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                    return False
+                free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+                if not free:
+                    return False
+                # execute() делает один шаг оператора, то есть освобождает одну страницу
+                conn.executescript(f'PRAGMA incremental_vacuum({pages})')
+                return free > pages
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка очистки удалённых данных", e)
+
+    def open_archive(self, read_only: bool = False) -> 'DatabaseManager':
+        """Архивная БД для archive_projects: файл <имя>-archive.db рядом с основным.
+
+        read_only - отдельное соединение только для чтения (просмотр и поиск архива);
+        у БД в памяти архив тоже в памяти и живёт, пока жив этот экземпляр.
+        """
+        if self.in_memory:
+            if self._archive is None:
+                self._archive = DatabaseManager(self._database.replace('?', ARCHIVE_SUFFIX + '?', 1))
+            return self._archive
+        path = Path(self.db_path)
+        path = str(path.with_name(f"{path.stem}{ARCHIVE_SUFFIX}{path.suffix}"))
+        if read_only:
+            # Схема создаётся при первом открытии на запись
+            if self._archive is None:
+                self._archive = DatabaseManager(path)
+            return DatabaseManager(path, read_only=True)
+        if self._archive is None:
+            self._archive = DatabaseManager(path)
+        return self._archive
+
+    def archive_projects(self, before: datetime, batch_size: int = 100) -> int:
+        """Перенос завершённых проектов, окончившихся раньше before, вместе с задачами
+        в архивную БД (open_archive); возвращает число перенесённых проектов.
+
+        Каждая порция из batch_size проектов - одна короткая транзакция над обеими БД
+        (архив подключается через ATTACH). Удалённые надгробием задачи не переносятся,
+        зависимости - только между задачами одной порции.
+        """
+        archive = self.open_archive()
+        moved = 0
+        while True:
+            count = self._archive_batch(archive, before, batch_size)
+            moved += count
+            if count < batch_size:
+                return moved
+
+    @_retry_busy
+    def _archive_batch(self, archive: 'DatabaseManager', before: datetime, batch_size: int) -> int:
+        try:
+            with self._attach(archive) as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                ids = [row[0] for row in conn.execute('''
+                    SELECT id FROM main.projects
+                    WHERE deletion_id IS NULL AND status = ? AND COALESCE(end_date, start_date) < ?
+                    ORDER BY id LIMIT ?
+                ''', (ProjectStatus.COMPLETED.code, to_day_number(before), batch_size))]
+                self._move_projects(conn, ids, 'main', 'archive')
+                conn.commit()
+                return len(ids)
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка архивирования проектов", e)
+
+    @_retry_busy
+    def restore_archived(self, project_ids: List[int]) -> int:
+        """Возврат проектов с задачами из архива с прежними id; возвращает число возвращённых.
+
+        Проект остаётся завершённым: следующий archive_projects с тем же порогом снова его перенесёт.
+        """
+        try:
+            with self._attach(self.open_archive()) as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                placeholders = ', '.join('?' * len(project_ids))
+                ids = [row[0] for row in conn.execute(
+                    f'SELECT id FROM archive.projects WHERE id IN ({placeholders})', project_ids)]
+                self._move_projects(conn, ids, 'archive', 'main')
+                conn.commit()
+                return len(ids)
         except sqlite3.Error as e:
-            raise Exception(f"Ошибка удаления задачи: {e}")
+            raise _database_error("Ошибка восстановления из архива", e)
+
+    @contextmanager
+    def _attach(self, archive: 'DatabaseManager'):
+        """Отдельное соединение с подключённой как archive архивной БД"""
+        conn = self._open()
+        try:
+            conn.execute('ATTACH DATABASE ? AS archive', (archive.uri,))
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
 
-    def get_all_projects(self) -> List[Project]:
+    @staticmethod
+    def _move_projects(conn, ids: List[int], source: str, target: str) -> None:
+        """Перенос живых проектов ids с задачами и зависимостями между схемами соединения.
+
+        Исполнители сопоставляются по name_key (id в БД разные). Копии пишутся
+        INSERT OR REPLACE: id не переиспользуются (AUTOINCREMENT), а в режиме WAL
+        фиксация атомарна лишь по каждой БД отдельно - повтор после сбоя между
+        ними не должен упасть на уже скопированных строках.
+        """
+        if not ids:
+            return
+        conn.execute('CREATE TEMP TABLE IF NOT EXISTS moved_projects (id INTEGER PRIMARY KEY)')
+        conn.execute('DELETE FROM temp.moved_projects')
+        conn.executemany('INSERT INTO temp.moved_projects VALUES (?)', [(project_id,) for project_id in ids])
+        moved = 'SELECT id FROM temp.moved_projects'
+        live_tasks = f'SELECT id FROM {source}.tasks WHERE project_id IN ({moved}) AND deletion_id IS NULL'
+        conn.execute(f'''
+            INSERT OR IGNORE INTO {target}.assignees (name, name_key)
+            SELECT name, name_key FROM {source}.assignees
+            WHERE id IN (SELECT assignee_id FROM {source}.tasks WHERE id IN ({live_tasks}))
+        ''')
+        columns = ', '.join(PROJECT_COLUMNS)
+        conn.execute(f'''
+            INSERT OR REPLACE INTO {target}.projects ({columns})
+            SELECT {columns} FROM {source}.projects WHERE id IN ({moved})
+        ''')
+        columns = ', '.join('assignee_id' if column == 'assignee' else column for column in TASK_COLUMNS)
+        values = columns.replace('assignee_id', f'''(
+            SELECT target.id FROM {target}.assignees AS target JOIN {source}.assignees AS source
+            ON source.name_key = target.name_key WHERE source.id = tasks.assignee_id
+        )''')
+        conn.execute(f'''
+            INSERT OR REPLACE INTO {target}.tasks ({columns})
+            SELECT {values} FROM {source}.tasks AS tasks WHERE id IN ({live_tasks})
+        ''')
+        conn.execute(f'''
+            INSERT OR IGNORE INTO {target}.task_dependencies (task_id, depends_on)
+            SELECT task_id, depends_on FROM {source}.task_dependencies
+            WHERE task_id IN ({live_tasks}) AND depends_on IN ({live_tasks})
+        ''')
+        # Задачи и зависимости удаляются каскадом, триггеры заносят удаление в журнал изменений
+        conn.execute(f'DELETE FROM {source}.projects WHERE id IN ({moved})')
+
+    def get_all_projects(self, limit: Optional[int] = None, offset: int = 0) -> List[Project]:
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("PRAGMA foreign_keys = ON")
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT * FROM projects ORDER BY created_at DESC')
+                cursor.execute(_PROJECTS_PAGE, (-1 if limit is None else limit, offset))
                 rows = cursor.fetchall()
 
-                projects = []
-                for row in rows:
-                    # Преобразуем строку в datetime для end_date (может быть None)
-                    end_date = None
-                    if row[4]:  # end_date
-                        try:
-                            end_date = datetime.strptime(row[4], '%Y-%m-%d')
-                        except ValueError:
-                            end_date = None
-
-                    # Создаём объект Project со статусом из enum
-                    project = Project(
-                        id=row[0],
-                        name=row[1],
-                        description=row[2],
-                        start_date=datetime.strptime(row[3], '%Y-%m-%d'),
-                        end_date=end_date,
-                        status=ProjectStatus(row[5]),
-                        budget=row[6],
-                        team_size=row[7]
-                    )
-                    projects.append(project)
+                projects = [self._project_from_row(row) for row in rows]
                 return projects
         except sqlite3.Error as e:
-            raise Exception(f"Ошибка получения проектов: {e}")
+            raise _database_error("Ошибка получения проектов", e)
 
-    def get_tasks_by_project(self, project_id: int) -> List[Task]:
+    def get_tasks_by_project(self, project_id: int, limit: Optional[int] = None, offset: int = 0,
+                             sort: str = 'created') -> List[Task]:
+        """Задачи проекта в порядке sort (ключ TASK_ORDER)"""
+        if sort not in TASK_ORDER:
+            raise ValueError(f"Неизвестный порядок сортировки: {sort}")
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("PRAGMA foreign_keys = ON")
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT * FROM tasks 
-                    WHERE project_id = ? 
-                    ORDER BY created_at DESC
-                ''', (project_id,))
+                cursor.execute(_TASK_SELECT + f'''
+                    AND tasks.project_id = ?
+                    ORDER BY {TASK_ORDER[sort]}
+                    LIMIT ? OFFSET ?
+                ''', (project_id, -1 if limit is None else limit, offset))
                 rows = cursor.fetchall()
 
-                tasks = []
-                for row in rows:
-                    # Создаём объект Task с enum значениями
-                    task = Task(
-                        id=row[0],
-                        project_id=row[1],
-                        title=row[2],
-                        description=row[3],
-                        assignee=row[4],
-                        priority=TaskPriority(row[5]),
-                        deadline=datetime.strptime(row[6], '%Y-%m-%d'),
-                        status=ProjectStatus(row[7])
-                    )
-                    tasks.append(task)
+                tasks = [self._task_from_row(row) for row in rows]
                 return tasks
         except sqlite3.Error as e:
-            raise Exception(f"Ошибка получения задач: {e}")
\ No newline at end of file
+            raise _database_error("Ошибка получения задач", e)
+
+    def get_task_rows(self, project_id: Optional[int] = None) -> List[tuple]:
+        """Сырые строки задач без создания объектов Task (для колоночной аналитики)"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                query = '''
+                    SELECT tasks.id, tasks.project_id, tasks.title, COALESCE(assignees.name, ''),
+                           tasks.priority, tasks.deadline, tasks.status
+                    FROM tasks LEFT JOIN assignees ON assignees.id = tasks.assignee_id
+                    WHERE tasks.deletion_id IS NULL
+                '''
+                params = ()
+                if project_id is not None:
+                    query += ' AND tasks.project_id = ?'
+                    params = (project_id,)
+                cursor.execute(query + ' ORDER BY tasks.id', params)
+                return cursor.fetchall()
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка получения задач", e)
+
+    def count_projects(self) -> int:
+        try:
+            with self._connect() as conn:
+                return conn.execute(_COUNT_PROJECTS).fetchone()[0]
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка подсчёта проектов", e)
+
+    def count_tasks(self, project_id: Optional[int] = None) -> int:
+        try:
+            with self._connect() as conn:
+                if project_id is None:
+                    return conn.execute(_COUNT_TASKS).fetchone()[0]
+                return conn.execute('SELECT COUNT(*) FROM tasks WHERE project_id = ? AND deletion_id IS NULL',
+                                    (project_id,)).fetchone()[0]
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка подсчёта задач", e)
+
+    def iter_project_rows(self, chunk_size: int = 1000) -> Iterator[List[tuple]]:
+        """Потоковое чтение проектов порциями (колонки PROJECT_COLUMNS)"""
+        query = _PROJECT_SELECT + ' ORDER BY id'
+        return self._iter_chunks(query, (), chunk_size)
+
+    def iter_task_rows(self, chunk_size: int = 1000, project_id: Optional[int] = None) -> Iterator[List[tuple]]:
+        """Потоковое чтение задач порциями (колонки TASK_COLUMNS)"""
+        query = _TASK_SELECT
+        params = ()
+        if project_id is not None:
+            query += ' AND tasks.project_id = ?'
+            params = (project_id,)
+        return self._iter_chunks(query + ' ORDER BY tasks.id', params, chunk_size)
+
+    def _iter_chunks(self, query: str, params: tuple, chunk_size: int) -> Iterator[List[tuple]]:
+        try:
+            conn = self._connect()
+            try:
+                cursor = conn.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                self._release(conn)
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка чтения данных", e)
+
+    def get_project_ids(self) -> Set[int]:
+        try:
+            with self._connect() as conn:
+                return {row[0] for row in conn.execute('SELECT id FROM projects WHERE deletion_id IS NULL')}
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка получения проектов", e)
+
+    @_retry_busy
+    def add_projects(self, projects: List[Project]) -> List[int]:
+        """Добавление порции проектов одной транзакцией"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                ids = []
+                for project in projects:
+                    cursor.execute('''
+                                INSERT INTO projects (name, description, start_date, end_date, status, budget, team_size)
+                                VALUES (?, ?, ?, ?, ?, ?, ?)
+                            ''', (
+                        project.name,
+                        project.description,
+                        to_day_number(project.start_date),
+                        to_day_number(project.end_date) if project.end_date else None,
+                        project.status.code,
+                        project.budget,
+                        project.team_size
+                    ))
+                    ids.append(cursor.lastrowid)
+                conn.commit()
+                return ids
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка добавления проектов", e)
+
+    @_retry_busy
+    def add_tasks(self, tasks: List[Task]) -> int:
+        """Добавление порции задач одной транзакцией"""
+        try:
+            with self._connect() as conn:
+                assignee_ids = self._assignee_ids(conn, [task.assignee for task in tasks])
+                cursor = conn.cursor()
+                cursor.executemany('''
+                            INSERT INTO tasks (project_id, title, description, assignee_id, priority, deadline, status,
+                                               duration)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', [(
+                    task.project_id,
+                    task.title,
+                    task.description,
+                    assignee_ids[task.assignee],
+                    task.priority.code,
+                    to_day_number(task.deadline),
+                    task.status.code,
+                    task.duration
+                ) for task in tasks])
+                conn.commit()
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка добавления задач", e)
+
+    def backup(self, dest: str, pages_per_step: int = 1024,
+               progress: Optional[Callable[[int, int, int], None]] = None) -> None:
+        """Горячее резервное копирование через online backup API SQLite.
+
+        Копирование идёт шагами по pages_per_step страниц с короткой паузой
+        между шагами, поэтому писатели блокируются лишь на время одного шага.
+        progress(status, remaining, total) вызывается после каждого шага.
+        """
+        try:
+            source = self._connect()
+            target = sqlite3.connect(dest)
+            try:
+                source.backup(target, pages=pages_per_step, progress=progress, sleep=0.005)
+            finally:
+                target.close()
+                self._release(source)
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка резервного копирования", e)
+
+    def clone(self, db_path: str = MEMORY, **kwargs) -> 'DatabaseManager':
+        """Копия БД в новом DatabaseManager (по умолчанию в памяти) через backup API.
+
+        Заполненная один раз БД-шаблон копируется постранично, без повторной
+        вставки строк; kwargs передаются конструктору копии.
+        """
+        copy = DatabaseManager(db_path, **kwargs)
+        try:
+            source = self._connect()
+            target = copy._connect()
+            try:
+                source.backup(target)
+            finally:
+                copy._release(target)
+                self._release(source)
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка копирования БД", e)
+        return copy
+
+    def restore(self, source_path: str, pages_per_step: int = -1) -> None:
+        """Восстановление БД из снимка, созданного backup()"""
+        try:
+            source = sqlite3.connect(Path(source_path).absolute().as_uri() + '?mode=ro', uri=True)
+            try:
+                if source.execute('PRAGMA quick_check').fetchone()[0] != 'ok':
+                    raise sqlite3.DatabaseError("файл снимка повреждён")
+                target = self._connect()
+                try:
+                    source.backup(target, pages=pages_per_step)
+                finally:
+                    self._release(target)
+            finally:
+                source.close()
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка восстановления БД", e)
+        self._init_database()
+
+    def search_projects(self, text: str) -> List[Project]:
+        """Поиск проектов по подстроке в названии или описании (без учёта регистра)"""
+        try:
+            with self._connect() as conn:
+                conn.create_function('py_lower', 1, _lower, deterministic=True)
+                cursor = conn.cursor()
+                cursor.execute(_PROJECT_SELECT + '''
+                    AND (instr(py_lower(name), ?) > 0 OR instr(py_lower(description), ?) > 0)
+                    ORDER BY created_at DESC
+                ''', (text.lower(), text.lower()))
+                return [self._project_from_row(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка поиска проектов", e)
+
+    def search_tasks(self, text: str, project_id: Optional[int] = None) -> List[Task]:
+        """Поиск задач по подстроке в заголовке, описании или исполнителе (без учёта регистра)"""
+        try:
+            with self._connect() as conn:
+                conn.create_function('py_lower', 1, _lower, deterministic=True)
+                cursor = conn.cursor()
+                query = _TASK_SELECT + '''
+                    AND (instr(py_lower(tasks.title), ?) > 0 OR instr(py_lower(tasks.description), ?) > 0
+                           OR instr(py_lower(assignees.name), ?) > 0)
+                '''
+                params = [text.lower()] * 3
+                if project_id is not None:
+                    query += ' AND tasks.project_id = ?'
+                    params.append(project_id)
+                cursor.execute(query + ' ORDER BY tasks.created_at DESC', params)
+                return [self._task_from_row(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка поиска задач", e)
+
+    def get_project(self, project_id: int) -> Optional[Project]:
+        try:
+            with self._connect() as conn:
+                row = conn.execute(_PROJECT_SELECT + ' AND id = ?', (project_id,)).fetchone()
+                return self._project_from_row(row) if row else None
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка получения проекта", e)
+
+    def enable_wal(self) -> None:
+        """Журнал WAL: читатели не блокируют писателя (настройка сохраняется в файле БД)"""
+        try:
+            with self._connect() as conn:
+                conn.execute('PRAGMA journal_mode = WAL')
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка настройки журнала", e)
+
+    @_retry_busy
+    def add_dependency(self, task_id: int, depends_on: int) -> None:
+        """Задача task_id начинается после завершения depends_on (обе из одного проекта)"""
+        try:
+            with self._connect() as conn:
+                # Проверка и вставка одной транзакцией, чтобы параллельная запись не замкнула цикл
+                if not conn.in_transaction:
+                    conn.execute('BEGIN IMMEDIATE')
+                projects = dict(conn.execute('SELECT id, project_id FROM tasks WHERE id IN (?, ?) AND deletion_id IS NULL',
+                                             (task_id, depends_on)).fetchall())
+                if task_id not in projects or depends_on not in projects:
+                    raise sqlite3.IntegrityError("задача не найдена")
+                if projects[task_id] != projects[depends_on]:
+                    raise sqlite3.IntegrityError("задачи из разных проектов")
+                # Цикл возникнет, если depends_on уже (транзитивно) зависит от task_id
+                cycle = conn.execute('''
+                    WITH RECURSIVE ancestors(id) AS (
+                        SELECT ?
+                        UNION
+                        SELECT d.depends_on FROM task_dependencies d JOIN ancestors a ON d.task_id = a.id
+                    )
+                    SELECT 1 FROM ancestors WHERE id = ? LIMIT 1
+                ''', (depends_on, task_id)).fetchone()
+                if cycle:
+                    raise DependencyCycleError(
+                        f"Ошибка добавления зависимости: задача {depends_on} уже зависит от {task_id}")
+                conn.execute('INSERT OR IGNORE INTO task_dependencies (task_id, depends_on) VALUES (?, ?)',
+                             (task_id, depends_on))
+                conn.commit()
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка добавления зависимости", e)
+
+    @_retry_busy
+    def del_dependency(self, task_id: int, depends_on: int) -> bool:
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute('DELETE FROM task_dependencies WHERE task_id = ? AND depends_on = ?',
+                                      (task_id, depends_on))
+                conn.commit()
+                return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка удаления зависимости", e)
+
+    def get_dependencies(self, project_id: int) -> List[tuple]:
+        """Пары (task_id, depends_on) для задач проекта"""
+        try:
+            with self._connect() as conn:
+                return conn.execute('''
+                    SELECT d.task_id, d.depends_on FROM tasks t
+                    JOIN task_dependencies d ON d.task_id = t.id
+                    JOIN tasks p ON p.id = d.depends_on AND p.deletion_id IS NULL
+                    WHERE t.project_id = ? AND t.deletion_id IS NULL
+                ''', (project_id,)).fetchall()
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка получения зависимостей", e)
+
+    def get_task_durations(self, project_id: int) -> dict:
+        """Длительности задач проекта: {task_id: дней}"""
+        try:
+            with self._connect() as conn:
+                return dict(conn.execute('SELECT id, duration FROM tasks WHERE project_id = ? AND deletion_id IS NULL',
+                                         (project_id,)))
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка получения задач", e)
+
+    @_retry_busy
+    def set_task_duration(self, task_id: int, duration: int) -> bool:
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute('UPDATE tasks SET duration = ?, version = version + 1 '
+                                      'WHERE id = ? AND deletion_id IS NULL', (duration, task_id))
+                conn.commit()
+                return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка изменения задачи", e)
+
+    def get_tasks_due_between(self, start: Optional[datetime], end: datetime,
+                              include_completed: bool = False) -> List[Task]:
+        """Задачи со сроком в [start, end] (start=None - без нижней границы) по индексу idx_tasks_deadline"""
+        try:
+            with self._connect() as conn:
+                query = _TASK_SELECT + ' AND tasks.deadline <= ?'
+                params = [to_day_number(end)]
+                if start is not None:
+                    query += ' AND tasks.deadline >= ?'
+                    params.append(to_day_number(start))
+                if not include_completed:
+                    query += ' AND tasks.status != ?'
+                    params.append(ProjectStatus.COMPLETED.code)
+                cursor = conn.execute(query + ' ORDER BY tasks.deadline, tasks.id', params)
+                return [self._task_from_row(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка получения задач", e)
+
+    def get_projects_active_on(self, day: datetime) -> List[Project]:
+        """Проекты, идущие в день day: начались не позже и не завершились раньше (индекс idx_projects_end)"""
+        try:
+            with self._connect() as conn:
+                number = to_day_number(day)
+                # Две ветки вместо OR: каждая - поиск по диапазону индекса, а не проход по нему
+                cursor = conn.execute(_PROJECT_SELECT + ' AND end_date >= ? AND start_date <= ? UNION ALL ' +
+                                      _PROJECT_SELECT + ' AND end_date IS NULL AND start_date <= ? '
+                                      'ORDER BY start_date, id', (number, number, number))
+                return [self._project_from_row(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка получения проектов", e)
+
+    def get_revision(self) -> int:
+        """Текущая ревизия данных (0 - изменений ещё не было)"""
+        try:
+            with self._connect() as conn:
+                return conn.execute('SELECT COALESCE(MAX(revision), 0) FROM changes').fetchone()[0]
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка получения ревизии", e)
+
+    def get_changes_since(self, revision: int) -> ChangeSet:
+        """Проекты и задачи, добавленные, изменённые или удалённые после revision.
+
+        Живые строки возвращаются целиком, удалённые (в том числе надгробием) - списком id.
+        Всё читается одним снимком, поэтому следующий вызов с ChangeSet.revision
+        не пропустит и не повторит изменений.
+        """
+        try:
+            with self._connect() as conn:
+                if not conn.in_transaction:
+                    conn.execute('BEGIN')
+                current = conn.execute('SELECT COALESCE(MAX(revision), ?) FROM changes', (revision,)).fetchone()[0]
+                changed = '''
+                    SELECT DISTINCT row_id FROM changes WHERE table_name = ? AND revision > ? AND revision <= ?
+                '''
+                params = (revision, current)
+                projects = [self._project_from_row(row) for row in conn.execute(
+                    _PROJECT_SELECT + f' AND id IN ({changed}) ORDER BY id', ('projects',) + params)]
+                tasks = [self._task_from_row(row) for row in conn.execute(
+                    _TASK_SELECT + f' AND tasks.id IN ({changed}) ORDER BY tasks.id', ('tasks',) + params)]
+                live_projects = {project.id for project in projects}
+                live_tasks = {task.id for task in tasks}
+                deleted_projects = [row[0] for row in conn.execute(changed + ' ORDER BY row_id', ('projects',) + params)
+                                    if row[0] not in live_projects]
+                deleted_tasks = [row[0] for row in conn.execute(changed + ' ORDER BY row_id', ('tasks',) + params)
+                                 if row[0] not in live_tasks]
+                conn.commit()
+                return ChangeSet(current, projects, tasks, deleted_projects, deleted_tasks)
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка получения изменений", e)
+
+    def get_assignees(self) -> List[tuple]:
+        """Исполнители (id, имя) по алфавиту - источник автодополнения"""
+        try:
+            with self._connect() as conn:
+                return conn.execute('SELECT id, name FROM assignees ORDER BY name').fetchall()
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка получения исполнителей", e)
+
+    def find_assignee(self, name: str) -> Optional[int]:
+        """id исполнителя по имени с точностью до регистра, пробелов и е/ё"""
+        try:
+            with self._connect() as conn:
+                row = conn.execute('SELECT id FROM assignees WHERE name_key = ?',
+                                   (normalize_assignee(name),)).fetchone()
+                return row[0] if row else None
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка получения исполнителей", e)
+
+    def get_assignee_tasks(self, assignee_id: int, include_completed: bool = False,
+                           priority: Optional[TaskPriority] = None,
+                           due_before: Optional[datetime] = None) -> List[Task]:
+        """Задачи исполнителя по возрастанию срока (индекс idx_tasks_assignee).
+
+        due_before - только со сроком раньше этой даты (просроченные на неё).
+        """
+        try:
+            with self._connect() as conn:
+                query = _TASK_SELECT + ' AND tasks.assignee_id = ?'
+                params = [assignee_id]
+                if due_before is not None:
+                    query += ' AND tasks.deadline < ?'
+                    params.append(to_day_number(due_before))
+                if not include_completed:
+                    query += ' AND tasks.status != ?'
+                    params.append(ProjectStatus.COMPLETED.code)
+                if priority is not None:
+                    query += ' AND tasks.priority = ?'
+                    params.append(priority.code)
+                cursor = conn.execute(query + ' ORDER BY tasks.deadline, tasks.id', params)
+                return [self._task_from_row(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка получения задач", e)
+
+    def get_assignee_workload(self, today: datetime) -> List[tuple]:
+        """Нагрузка: (id, имя, открытых задач, просроченных, срочных и высоких) по убыванию открытых"""
+        try:
+            with self._connect() as conn:
+                return conn.execute('''
+                    SELECT assignees.id, assignees.name, COUNT(tasks.id),
+                           COALESCE(SUM(tasks.deadline < ?), 0),
+                           COALESCE(SUM(tasks.priority IN (?, ?)), 0)
+                    FROM assignees
+                    LEFT JOIN tasks ON tasks.assignee_id = assignees.id AND tasks.status != ?
+                                   AND tasks.deletion_id IS NULL
+                    GROUP BY assignees.id
+                    ORDER BY 3 DESC, assignees.name
+                ''', (to_day_number(today), TaskPriority.CRITICAL.code, TaskPriority.HIGH.code,
+                      ProjectStatus.COMPLETED.code)).fetchall()
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка подсчёта нагрузки", e)
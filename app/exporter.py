@@ -0,0 +1,122 @@
+import argparse
+import csv
+import gzip
+import json
+import sys
+from typing import Callable, Optional
+
+from app.database import DatabaseManager, PROJECT_COLUMNS, TASK_COLUMNS
+from app.models import ProjectStatus, TaskPriority, from_day_number
+
+FORMATS = ('csv', 'jsonl')
+TABLES = ('projects', 'tasks')
+
+ProgressCallback = Callable[[int, int], None]
+
+# В БД перечисления хранятся кодами, а даты - номерами дней; в файл пишутся
+# названия и ГГГГ-ММ-ДД - как принимает импорт
+_STATUS_NAMES = {status.code: status.value for status in ProjectStatus}.get
+_PRIORITY_NAMES = {priority.code: priority.value for priority in TaskPriority}.get
+
+
+def _date_text(number):
+    return from_day_number(number).strftime('%Y-%m-%d') if number is not None else None
+
+
+DECODERS = {
+    'projects': {PROJECT_COLUMNS.index('status'): _STATUS_NAMES,
+                 PROJECT_COLUMNS.index('start_date'): _date_text,
+                 PROJECT_COLUMNS.index('end_date'): _date_text},
+    'tasks': {TASK_COLUMNS.index('priority'): _PRIORITY_NAMES,
+              TASK_COLUMNS.index('status'): _STATUS_NAMES,
+              TASK_COLUMNS.index('deadline'): _date_text},
+}
+
+
+def detect_format(path: str) -> tuple:
+    """Определение формата и сжатия по расширению файла: (формат, gzip)"""
+    name = path.lower()
+    compress = name.endswith('.gz')
+    if compress:
+        name = name[:-3]
+    for fmt in FORMATS:
+        if name.endswith('.' + fmt):
+            return fmt, compress
+    raise ValueError(f"Неизвестный формат файла: {path}")
+
+
+def decode_rows(table: str, rows: list) -> list:
+    """Замена кодов статуса и приоритета названиями, номеров дней - датами"""
+    decoders = DECODERS[table]
+    return [tuple(decoders[i](value) if i in decoders else value for i, value in enumerate(row)) for row in rows]
+
+
+def open_output(path: str, compress: bool = False):
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def export_table(db: DatabaseManager, table: str, path: str, fmt: str = 'csv', compress: bool = False,
+                 chunk_size: int = 1000, progress: Optional[ProgressCallback] = None) -> int:
+    """Потоковая выгрузка таблицы в CSV или JSON Lines.
+
+    Строки читаются из курсора порциями по chunk_size, поэтому потребление
+    памяти не зависит от размера БД. progress(записано, всего) вызывается
+    после каждой порции. Возвращает количество записанных строк.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+    if table == 'projects':
+        columns, total, chunks = PROJECT_COLUMNS, db.count_projects(), db.iter_project_rows(chunk_size)
+    elif table == 'tasks':
+        columns, total, chunks = TASK_COLUMNS, db.count_tasks(), db.iter_task_rows(chunk_size)
+    else:
+        raise ValueError(f"Неизвестная таблица: {table}")
+
+    chunks = (decode_rows(table, rows) for rows in chunks)
+    written = 0
+    with open_output(path, compress) as f:
+        if fmt == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for rows in chunks:
+                writer.writerows(rows)
+                written += len(rows)
+                if progress:
+                    progress(written, total)
+        else:
+            for rows in chunks:
+                f.writelines(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n' for row in rows)
+                written += len(rows)
+                if progress:
+                    progress(written, total)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Экспорт проектов и задач в CSV / JSON Lines")
+    parser.add_argument('table', choices=TABLES)
+    parser.add_argument('output', help="Файл вывода (.csv, .jsonl, опционально .gz)")
+    parser.add_argument('--db', default='projects.db', help="Путь к базе данных")
+    parser.add_argument('--format', choices=FORMATS, help="Формат (по умолчанию - по расширению)")
+    parser.add_argument('--gzip', action='store_true', help="Сжать вывод gzip")
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    if args.format:
+        fmt, compress = args.format, args.gzip
+    else:
+        fmt, compress = detect_format(args.output)
+        compress = compress or args.gzip
+
+    def report(written, total):
+        print(f"\r{written}/{total}", end='', file=sys.stderr)
+
+    count = export_table(DatabaseManager(args.db), args.table, args.output, fmt, compress,
+                         args.chunk_size, report)
+    print(f"\nЭкспортировано строк: {count}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
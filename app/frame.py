@@ -0,0 +1,120 @@
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.database import DatabaseManager
+from app.models import ProjectStatus, TaskPriority, to_day_number
+
+
+class TaskFrame:
+    """Колоночное представление задач для массовой аналитики.
+
+    Числовые колонки хранятся в массивах NumPy, строковые (заголовок,
+    исполнитель) - в отдельных списках и выбираются по тем же индексам.
+    Приоритет и статус - коды перечислений (TaskPriority.code, ProjectStatus.code),
+    дедлайн - номер дня от 1970-01-01, как они лежат в БД.
+    """
+
+    def __init__(self, ids: np.ndarray, project_ids: np.ndarray, deadlines: np.ndarray,
+                 priorities: np.ndarray, statuses: np.ndarray,
+                 titles: List[str], assignees: List[str]):
+        self.ids = ids
+        self.project_ids = project_ids
+        self.deadlines = deadlines
+        self.priorities = priorities
+        self.statuses = statuses
+        self.titles = titles
+        self.assignees = assignees
+
+    @classmethod
+    def from_rows(cls, rows: List[tuple]) -> "TaskFrame":
+        """Построение из строк (id, project_id, title, assignee, priority, deadline, status)"""
+        if not rows:
+            return cls.empty()
+        ids, project_ids, titles, assignees, priorities, deadlines, statuses = zip(*rows)
+        return cls(
+            ids=np.array(ids, dtype=np.int64),
+            project_ids=np.array(project_ids, dtype=np.int64),
+            deadlines=np.array(deadlines, dtype=np.int32),
+            priorities=np.array(priorities, dtype=np.int8),
+            statuses=np.array(statuses, dtype=np.int8),
+            titles=list(titles),
+            assignees=list(assignees)
+        )
+
+    @classmethod
+    def from_database(cls, db: DatabaseManager, project_id: Optional[int] = None) -> "TaskFrame":
+        """Загрузка всех задач (или задач одного проекта) одним запросом"""
+        return cls.from_rows(db.get_task_rows(project_id))
+
+    @classmethod
+    def empty(cls) -> "TaskFrame":
+        return cls(
+            ids=np.empty(0, dtype=np.int64),
+            project_ids=np.empty(0, dtype=np.int64),
+            deadlines=np.empty(0, dtype=np.int32),
+            priorities=np.empty(0, dtype=np.int8),
+            statuses=np.empty(0, dtype=np.int8),
+            titles=[],
+            assignees=[]
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def take(self, mask: np.ndarray) -> "TaskFrame":
+        """Выборка строк по булевой маске или массиву индексов"""
+        index = np.flatnonzero(mask) if mask.dtype == np.bool_ else mask
+        return TaskFrame(
+            ids=self.ids[index],
+            project_ids=self.project_ids[index],
+            deadlines=self.deadlines[index],
+            priorities=self.priorities[index],
+            statuses=self.statuses[index],
+            titles=[self.titles[i] for i in index],
+            assignees=[self.assignees[i] for i in index]
+        )
+
+    # Фильтры
+
+    def overdue(self, today: Optional[date] = None) -> "TaskFrame":
+        """Незавершённые задачи с истёкшим дедлайном"""
+        today_number = to_day_number(today or date.today())
+        mask = (self.deadlines < today_number) & (self.statuses != ProjectStatus.COMPLETED.code)
+        return self.take(mask)
+
+    def due_between(self, start: date, end: date) -> "TaskFrame":
+        """Задачи с дедлайном в диапазоне [start, end]"""
+        mask = (self.deadlines >= to_day_number(start)) & (self.deadlines <= to_day_number(end))
+        return self.take(mask)
+
+    def by_priority(self, *priorities: TaskPriority) -> "TaskFrame":
+        codes = [p.code for p in priorities]
+        return self.take(np.isin(self.priorities, codes))
+
+    def by_status(self, *statuses: ProjectStatus) -> "TaskFrame":
+        codes = [s.code for s in statuses]
+        return self.take(np.isin(self.statuses, codes))
+
+    def by_project(self, *project_ids: int) -> "TaskFrame":
+        return self.take(np.isin(self.project_ids, project_ids))
+
+    # Группировки
+
+    def count_by_priority(self) -> Dict[TaskPriority, int]:
+        counts = np.bincount(self.priorities, minlength=max(p.code for p in TaskPriority) + 1)
+        return {priority: int(counts[priority.code]) for priority in TaskPriority}
+
+    def count_by_status(self) -> Dict[ProjectStatus, int]:
+        counts = np.bincount(self.statuses, minlength=max(s.code for s in ProjectStatus) + 1)
+        return {status: int(counts[status.code]) for status in ProjectStatus}
+
+    def count_by_project(self) -> Dict[int, int]:
+        project_ids, counts = np.unique(self.project_ids, return_counts=True)
+        return {int(project_id): int(count) for project_id, count in zip(project_ids, counts)}
+
+    def count_by_assignee(self) -> Dict[str, int]:
+        names, inverse = np.unique(np.array(self.assignees, dtype=object), return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(names))
+        return {str(name): int(count) for name, count in zip(names, counts)}
@@ -0,0 +1,211 @@
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Callable, List, Optional, Tuple
+
+from app.database import DatabaseManager
+from app.models import Project, Task, ProjectStatus, TaskPriority
+
+ProgressCallback = Callable[[int, int], None]
+
+STATUS_WEIGHTS = {
+    ProjectStatus.PLANNING: 15,
+    ProjectStatus.IN_PROGRESS: 35,
+    ProjectStatus.TESTING: 15,
+    ProjectStatus.COMPLETED: 25,
+    ProjectStatus.ON_HOLD: 10,
+}
+PRIORITY_WEIGHTS = {
+    TaskPriority.LOW: 30,
+    TaskPriority.MEDIUM: 40,
+    TaskPriority.HIGH: 20,
+    TaskPriority.CRITICAL: 10,
+}
+FIRST_NAMES = ["Анна", "Иван", "Пётр", "Мария", "Сергей", "Ольга", "Дмитрий", "Елена", "Алексей", "Наталья",
+               "Михаил", "Татьяна", "Андрей", "Ирина", "Николай", "Светлана", "Павел", "Юлия", "Артём", "Ксения"]
+LAST_NAMES = ["Иванов", "Петров", "Смирнов", "Кузнецов", "Попов", "Соколов", "Лебедев", "Козлов", "Новиков",
+              "Морозов", "Волков", "Соловьёв", "Васильев", "Зайцев", "Павлов", "Семёнов", "Голубев", "Виноградов"]
+PROJECT_WORDS = ["Портал", "CRM", "Биллинг", "Мобильное приложение", "Аналитика", "Платформа", "Сервис",
+                 "Интеграция", "Миграция", "Хранилище", "API", "Личный кабинет"]
+TASK_WORDS = ["Разработка", "Тестирование", "Ревью", "Исправление", "Документация", "Проектирование",
+              "Развёртывание", "Оптимизация", "Рефакторинг", "Настройка"]
+
+# Период, по которому распределяются даты начала проектов
+PERIOD_START = datetime(2018, 1, 1)
+PERIOD_DAYS = 9 * 365
+
+# Состояние рабочего процесса, задаётся в _init_worker
+_worker_state = {}
+
+
+def make_assignees(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    names = sorted({f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(count * 3)})
+    rng.shuffle(names)
+    return names[:count]
+
+
+def zipf_cum_weights(count: int, exponent: float = 1.1) -> List[float]:
+    """Накопленные веса Ципфа: первые элементы выбираются намного чаще остальных"""
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def generate_projects(count: int, seed: int) -> List[Project]:
+    """Детерминированная генерация проектов всех статусов"""
+    rng = random.Random(seed)
+    statuses, weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+    projects = []
+    for i in range(count):
+        start = PERIOD_START + timedelta(days=rng.randrange(PERIOD_DAYS))
+        status = rng.choices(statuses, weights)[0]
+        duration = rng.randint(30, 900)
+        end = start + timedelta(days=duration) if status == ProjectStatus.COMPLETED or rng.random() < 0.7 else None
+        projects.append(Project(
+            id=None,
+            name=f"{rng.choice(PROJECT_WORDS)} {i + 1}",
+            description=f"Синтетический проект #{i + 1}",
+            start_date=start,
+            end_date=end,
+            status=status,
+            budget=round(rng.lognormvariate(13, 1), 2),
+            team_size=rng.randint(2, 40)
+        ))
+    return projects
+
+
+def _project_meta(projects: List[Project]) -> List[Tuple[int, int, int]]:
+    """Компактное описание проектов для рабочих процессов: (начало, длительность, статус)"""
+    statuses = list(ProjectStatus)
+    return [
+        (project.start_date.toordinal(),
+         (project.end_date - project.start_date).days if project.end_date else 365,
+         statuses.index(project.status))
+        for project in projects
+    ]
+
+
+def _init_worker(seed: int, meta: List[Tuple[int, int, int]], assignees: List[str]) -> None:
+    _worker_state.update(
+        seed=seed,
+        meta=meta,
+        assignees=assignees,
+        assignee_weights=zipf_cum_weights(len(assignees)),
+        # Число задач в проекте тоже неравномерно: крупные проекты встречаются реже
+        project_weights=list(accumulate(random.Random(seed).paretovariate(1.5) for _ in meta)),
+    )
+
+
+def _task_batch(batch_index: int, offset: int, size: int) -> List[tuple]:
+    """Порция задач в виде кортежей примитивов.
+
+    Генератор порции зависит только от (seed, batch_index), поэтому результат
+    не зависит от числа процессов и порядка их завершения.
+    """
+    state = _worker_state
+    rng = random.Random(f"{state['seed']}-{batch_index}")
+    meta, assignees = state['meta'], state['assignees']
+    priorities, priority_weights = list(range(len(TaskPriority))), list(PRIORITY_WEIGHTS.values())
+    completed = list(ProjectStatus).index(ProjectStatus.COMPLETED)
+    project_indexes = rng.choices(range(len(meta)), cum_weights=state['project_weights'], k=size)
+    assignee_indexes = rng.choices(range(len(assignees)), cum_weights=state['assignee_weights'], k=size)
+    priority_codes = rng.choices(priorities, priority_weights, k=size)
+    rows = []
+    for i in range(size):
+        project_index = project_indexes[i]
+        start, duration, project_status = meta[project_index]
+        status = completed if project_status == completed else rng.randrange(len(ProjectStatus))
+        rows.append((
+            project_index,
+            f"{rng.choice(TASK_WORDS)} {offset + i + 1}",
+            assignees[assignee_indexes[i]],
+            priority_codes[i],
+            start + rng.randint(0, duration),
+            status
+        ))
+    return rows
+
+
+def _batches(total: int, batch_size: int) -> List[Tuple[int, int, int]]:
+    """Порции (номер, смещение, размер)"""
+    return [(index, offset, min(batch_size, total - offset))
+            for index, offset in enumerate(range(0, total, batch_size))]
+
+
+def _generated_batches(seed: int, meta, assignees, batches, workers: int):
+    """Порции задач по порядку; не больше 2 * workers порций в работе"""
+    if workers <= 0:
+        _init_worker(seed, meta, assignees)
+        for batch in batches:
+            yield _task_batch(*batch)
+        return
+    # spawn, как в импорте и отчётах: fork процесса с фоновыми потоками небезопасен
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(seed, meta, assignees)) as executor:
+        pending = deque()
+        for batch in batches:
+            pending.append(executor.submit(_task_batch, *batch))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def generate(db: DatabaseManager, projects: int, tasks: int, seed: int = 42, workers: Optional[int] = None,
+             batch_size: int = 50000, assignees: int = 300,
+             progress: Optional[ProgressCallback] = None) -> Tuple[int, int]:
+    """Заполнение БД синтетическими проектами и задачами.
+
+    Порции задач строятся параллельно в рабочих процессах, запись ведёт один
+    писатель (текущий процесс) транзакцией на порцию. При одинаковом seed
+    результат одинаков при любом числе процессов.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    project_list = generate_projects(projects, seed)
+    project_ids = []
+    for start in range(0, len(project_list), batch_size):
+        project_ids.extend(db.add_projects(project_list[start:start + batch_size]))
+    if not project_ids:
+        return 0, 0
+
+    priorities, statuses = list(TaskPriority), list(ProjectStatus)
+    names = make_assignees(assignees, seed)
+    written = 0
+    for rows in _generated_batches(seed, _project_meta(project_list), names, _batches(tasks, batch_size), workers):
+        written += db.add_tasks([
+            Task(None, project_ids[project_index], title, "", assignee, priorities[priority],
+                 datetime.fromordinal(deadline), statuses[status])
+            for project_index, title, assignee, priority, deadline, status in rows
+        ])
+        if progress:
+            progress(written, tasks)
+    return len(project_ids), written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Генерация синтетических данных для нагрузочного тестирования")
+    parser.add_argument('--db', default='projects.db', help="Путь к базе данных")
+    parser.add_argument('--projects', type=int, default=10000)
+    parser.add_argument('--tasks', type=int, default=1000000)
+    parser.add_argument('--assignees', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None, help="Число процессов генерации (0 - без пула)")
+    parser.add_argument('--batch-size', type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    def report(written, total):
+        print(f"\rЗадач записано: {written}/{total}", end='', file=sys.stderr)
+
+    projects, tasks = generate(DatabaseManager(args.db), args.projects, args.tasks, args.seed, args.workers,
+                               args.batch_size, args.assignees, report)
+    print(f"\nСоздано проектов: {projects}, задач: {tasks}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,324 @@
 import sys
 import os
+import threading
 from datetime import datetime, timedelta
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QTextEdit, QComboBox, QPushButton,
     QTableWidget, QTableWidgetItem, QHeaderView, QGroupBox,
     QFormLayout, QMessageBox, QSplitter, QMenuBar, QMenu,
-    QStatusBar, QDialog, QScrollArea
+    QStatusBar, QDialog, QScrollArea, QFileDialog, QProgressDialog,
+    QCheckBox, QSpinBox, QDialogButtonBox, QSystemTrayIcon, QCompleter
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QAction
+from PySide6.QtCore import Qt, QTimer, QStringListModel
+from PySide6.QtGui import QAction, QActionGroup
 from PySide6.QtGui import QFont
 
-from app.database import DatabaseManager
+from app.database import StaleVersionError
 from app.models import Project, Task, ProjectStatus, TaskPriority
 from app.logger import ActivityLogger
+from app.exporter import export_table, detect_format
+from app.importer import import_file, parse_date, parse_enum
+from app.backup import run_backup
+from app.reports import generate_reports
+from app.workspaces import Workspaces
+from app.metrics import metrics
+from app.alerts import DeadlineScanner
+from app.timeline import Timeline, PROJECT
+from app.models import PROJECT_STATUS_CODES, TASK_PRIORITY_CODES, to_day_number, from_day_number
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba
 from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+from matplotlib.ticker import FuncFormatter
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QSplitter
 
+STATUS_COLORS = {
+    ProjectStatus.PLANNING: '#90A4AE',
+    ProjectStatus.IN_PROGRESS: '#42A5F5',
+    ProjectStatus.TESTING: '#AB47BC',
+    ProjectStatus.COMPLETED: '#66BB6A',
+    ProjectStatus.ON_HOLD: '#FFA726',
+}
+PRIORITY_COLORS = {
+    TaskPriority.LOW: '#C5E1A5',
+    TaskPriority.MEDIUM: '#FFF59D',
+    TaskPriority.HIGH: '#FFCC80',
+    TaskPriority.CRITICAL: '#EF9A9A',
+}
+
+
+
+def _parse_required(text: str) -> str:
+    if not text.strip():
+        raise ValueError("Поле не может быть пустым")
+    return text.strip()
+
+
+def _parse_budget(text: str) -> float:
+    budget = float(text.replace('₽', '').replace(',', '').replace(' ', ''))
+    if budget < 0:
+        raise ValueError("Бюджет не может быть отрицательным")
+    return budget
+
+
+# Редактируемые столбцы таблиц: номер -> (поле модели, разбор текста ячейки)
+PROJECT_EDITS = {
+    1: ('name', _parse_required),
+    2: ('description', str),
+    3: ('status', lambda text: parse_enum(ProjectStatus, text)),
+    4: ('start_date', lambda text: parse_date(text, 'start_date')),
+    5: ('end_date', lambda text: None if text.strip() in ('', '-') else parse_date(text, 'end_date')),
+    6: ('budget', _parse_budget),
+    7: ('team_size', int),
+}
+TASK_EDITS = {
+    1: ('title', _parse_required),
+    2: ('assignee', str.strip),
+    3: ('priority', lambda text: parse_enum(TaskPriority, text)),
+    4: ('deadline', lambda text: parse_date(text, 'deadline')),
+    5: ('status', lambda text: parse_enum(ProjectStatus, text)),
+}
+
+
+class GanttCanvas(FigureCanvas):
+    """Диаграмма Ганта с отрисовкой только видимого окна (Timeline.visible).
+
+    После полной отрисовки изображение осей кэшируется. Перетаскивание и
+    прокрутка строк сдвигают кэш блиттингом, а полная перерисовка выполняется
+    при отпускании кнопки или после паузы в прокрутке. Колесо прокручивает
+    строки, Ctrl+колесо меняет масштаб дат.
+    """
+    ROWS = 30
+    SCROLL_ROWS = 3
+    ZOOM = 1.25
+
+    def __init__(self, timeline: Timeline, parent=None):
+        self.figure = Figure(figsize=(10, 6))
+        super().__init__(self.figure)
+        self.setParent(parent)
+        self.timeline = timeline
+        self.ax = self.figure.add_subplot(111)
+        self.figure.subplots_adjust(left=0.22, right=0.98, top=0.97, bottom=0.08)
+        self.ax.grid(True, axis='x', alpha=0.3)
+        self.ax.xaxis.set_major_formatter(FuncFormatter(
+            lambda day, _: from_day_number(int(day)).strftime('%d.%m.%y')))
+
+        # Цвет каждой полосы: проекты - по статусу, задачи - по приоритету
+        size = max(*PROJECT_STATUS_CODES.values(), *TASK_PRIORITY_CODES.values()) + 1
+        status_colors = np.zeros((size, 4))
+        for status, code in PROJECT_STATUS_CODES.items():
+            status_colors[code] = to_rgba(STATUS_COLORS[status])
+        priority_colors = np.zeros((size, 4))
+        for priority, code in TASK_PRIORITY_CODES.items():
+            priority_colors[code] = to_rgba(PRIORITY_COLORS[priority])
+        projects = (timeline.kinds == PROJECT)[:, None]
+        self.colors = np.where(projects, status_colors[timeline.codes], priority_colors[timeline.codes])
+        self.heights = np.where(timeline.kinds == PROJECT, 0.8, 0.5)
+
+        self.bars = PolyCollection([], edgecolors='none')
+        self.ax.add_collection(self.bars)
+        today = to_day_number(datetime.now())
+        self.ax.axvline(today, color='red', linewidth=1, alpha=0.6)
+        # Анимированные элементы рисуются поверх кэша и в него не попадают
+        self.blank = Rectangle((0, 0), 1, 1, transform=self.ax.transAxes, facecolor=self.ax.get_facecolor(),
+                               edgecolor='none', animated=True)
+        self.ax.add_patch(self.blank)
+        self.hover = self.ax.text(0.01, 0.01, '', transform=self.ax.transAxes, fontsize=8, animated=True,
+                                  bbox=dict(boxstyle='round', facecolor='white', alpha=0.9))
+        self.background = None
+        self.axes_image = None
+        self.drag = None
+        self.rendered_row = 0
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.timeout.connect(self.render)
+
+        self.mpl_connect('draw_event', self.on_draw)
+        self.mpl_connect('button_press_event', self.on_press)
+        self.mpl_connect('motion_notify_event', self.on_motion)
+        self.mpl_connect('button_release_event', self.on_release)
+        self.mpl_connect('scroll_event', self.on_scroll)
+
+        # Начальное окно - от начала первых строк
+        start = int(timeline.starts[:self.ROWS].min()) - 7 if len(timeline) else today - 30
+        self.ax.set_xlim(start, start + 90)
+        self.ax.set_ylim(self.ROWS, 0)
+        self.render()
+
+    def view(self):
+        """Видимое окно: (первый день, последний день, первая строка, последняя строка)"""
+        first_day, last_day = self.ax.get_xlim()
+        last_row, first_row = self.ax.get_ylim()
+        return first_day, last_day, first_row, last_row
+
+    def render(self):
+        """Полная отрисовка полос видимого окна"""
+        self.render_timer.stop()
+        first_day, last_day, first_row, last_row = self.view()
+        index = self.timeline.visible(first_day, last_day, first_row, last_row)
+        starts = self.timeline.starts[index]
+        ends = self.timeline.ends[index]
+        top = index - self.heights[index] / 2
+        bottom = index + self.heights[index] / 2
+        self.bars.set_verts(np.stack([
+            np.column_stack([starts, top]), np.column_stack([ends, top]),
+            np.column_stack([ends, bottom]), np.column_stack([starts, bottom])
+        ], axis=1))
+        self.bars.set_facecolors(self.colors[index])
+
+        rows = range(max(int(np.ceil(first_row)), 0), min(int(last_row) + 1, len(self.timeline)))
+        self.ax.set_yticks(list(rows), [self.timeline.labels[row][:30] for row in rows], fontsize=8)
+        for row, label in zip(rows, self.ax.get_yticklabels()):
+            if self.timeline.kinds[row] == PROJECT:
+                label.set_fontweight('bold')
+        self.rendered_row = first_row
+        self.draw()
+
+    def on_draw(self, event):
+        self.background = self.copy_from_bbox(self.figure.bbox)
+        self.axes_image = self.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.hover)
+
+    def shift(self, dx: float, dy: float):
+        """Сдвиг кэшированного изображения осей на (dx, dy) пикселей без перерисовки полос"""
+        if self.axes_image is None:
+            return
+        self.restore_region(self.background)
+        self.ax.draw_artist(self.blank)
+        # Координаты области в буфере Agg: y растёт вниз
+        x1, y1, x2, y2 = self.axes_image.get_extents()
+        sx, sy = int(dx), int(-dy)
+        self.restore_region(self.axes_image, bbox=(max(x1, x1 - sx), max(y1, y1 - sy), min(x2, x2 - sx),
+                                                   min(y2, y2 - sy)), xy=(x1 + sx, y1 + sy))
+        self.blit(self.ax.bbox)
+
+    def pixels_to_data(self, dx: float, dy: float):
+        first_day, last_day, first_row, last_row = self.view()
+        return (dx * (last_day - first_day) / self.ax.bbox.width,
+                dy * (last_row - first_row) / self.ax.bbox.height)
+
+    def scroll_rows(self, rows: float):
+        """Прокрутка на rows строк (в пределах диаграммы)"""
+        _, _, first_row, last_row = self.view()
+        first = min(max(first_row + rows, 0), max(len(self.timeline) - (last_row - first_row), 0))
+        self.ax.set_ylim(first + last_row - first_row, first)
+        return first - first_row
+
+    def on_press(self, event):
+        if event.button == 1 and event.inaxes is self.ax:
+            self.drag = (event.x, event.y, self.ax.get_xlim(), self.ax.get_ylim())
+
+    def on_motion(self, event):
+        if self.drag is not None:
+            self.shift(event.x - self.drag[0], event.y - self.drag[1])
+            return
+        if self.background is None:
+            return
+        text = ''
+        if event.inaxes is self.ax:
+            row = int(round(event.ydata))
+            if 0 <= row < len(self.timeline) and \
+                    self.timeline.starts[row] <= event.xdata < self.timeline.ends[row]:
+                start = from_day_number(int(self.timeline.starts[row])).strftime('%d.%m.%Y')
+                end = from_day_number(int(self.timeline.ends[row]) - 1).strftime('%d.%m.%Y')
+                text = f"{self.timeline.labels[row]}: {start} - {end}"
+        if text != self.hover.get_text():
+            self.hover.set_text(text)
+            self.restore_region(self.background)
+            self.ax.draw_artist(self.hover)
+            self.blit(self.ax.bbox)
+
+    def on_release(self, event):
+        if self.drag is None:
+            return
+        x, y, xlim, ylim = self.drag
+        self.drag = None
+        self.ax.set_xlim(xlim)
+        self.ax.set_ylim(ylim)
+        days, rows = self.pixels_to_data(event.x - x, event.y - y)
+        self.ax.set_xlim(xlim[0] - days, xlim[1] - days)
+        self.scroll_rows(rows)
+        self.render()
+
+    def on_scroll(self, event):
+        if event.key == 'control':
+            first_day, last_day = self.ax.get_xlim()
+            center = event.xdata if event.inaxes is self.ax else (first_day + last_day) / 2
+            scale = self.ZOOM ** -event.step
+            self.ax.set_xlim(center - (center - first_day) * scale, center + (last_day - center) * scale)
+            self.render()
+            return
+        if self.scroll_rows(-event.step * self.SCROLL_ROWS):
+            # Кэш сдвигается сразу, новые строки дорисуются после паузы в прокрутке
+            _, _, first_row, last_row = self.view()
+            self.shift(0, (first_row - self.rendered_row) * self.ax.bbox.height / (last_row - first_row))
+            self.render_timer.start(150)
+
 
 class ProjectManagementGUI(QMainWindow):
-    def __init__(self):
+    def __init__(self, workspaces: Workspaces = None):
         super().__init__()
-        self.db = DatabaseManager()
+        # Рабочие пространства - файлы БД команд; окно работает с текущим
+        self.workspaces = workspaces if workspaces is not None else Workspaces.load()
+        if not self.workspaces.paths:
+            self.workspaces.add("projects.db")
+        self.db = self.workspaces.open()
         self.logger = ActivityLogger()
         self.current_project_id = None
+        # id проектов из импортированных файлов -> id в БД (для последующего импорта задач)
+        self.import_id_map = {}
+        # Настройки автоматического резервного копирования
+        self.backup_dir = "backups"
+        self.backup_keep = 10
+        self.backup_interval = 60
+        self.backup_thread = None
+        self.backup_timer = QTimer(self)
+        self.backup_timer.timeout.connect(self.run_scheduled_backup)
+        # Оповещения о сроках: сканер читает из БД только полосу ближайших дат
+        self.deadline_scanner = DeadlineScanner(self.db)
+        self.deadline_timer = QTimer(self)
+        self.deadline_timer.timeout.connect(self.check_deadlines)
+        self.tray = None
+        # Отмена удалений: (вид, id, название); удалённое лежит в БД надгробием,
+        # пока фоновая очистка не удалит его через purge_after
+        self.undo_stack = []
+        self.purge_after = timedelta(days=7)
+        self.purge_thread = None
+        self.purge_timer = QTimer(self)
+        self.purge_timer.timeout.connect(self.run_purge)
+        self.purge_timer.start(60 * 60 * 1000)
+        # Порог архивирования завершённых проектов (Файл - Архивировать завершённые)
+        self.archive_after_days = 365
+        # Синхронизация с изменениями других экземпляров по журналу изменений БД
+        self.revision = 0
+        self.sync_timer = QTimer(self)
+        self.sync_timer.timeout.connect(self.sync_changes)
+        # Правки в таблицах: {(таблица, id): (версия, {поле: значение})}; сохраняются
+        # одной транзакцией после паузы в редактировании или по Ctrl+S
+        self.pending_edits = {}
+        self.filling = False
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.timeout.connect(self.save_edits)
         self.setFont(QFont("Inter", 10))
         self.setup_ui()
+        self.revision = self.db.get_revision()
         self.load_projects()
+        self.load_assignees()
         self.update_status_bar()
+        self.sync_timer.start(5 * 1000)
+        self.setup_deadline_alerts()
         self.logger.log_activity("Приложение запущено")
 
 
     def setup_ui(self):
         """Настройка пользовательского интерфейса"""
-        self.setWindowTitle("Система управления IT-проектами")
+        self.setWindowTitle(f"Система управления IT-проектами - {self.workspaces.current}")
         self.setGeometry(100, 50, 1400, 900)
 
         self.create_menu()
@@ -53,19 +334,126 @@ class ProjectManagementGUI(QMainWindow):
         file_menu = menubar.addMenu("Файл")
 
         refresh_action = QAction("Обновить", self)
-        refresh_action.triggered.connect(self.load_projects)
+        # Через lambda, чтобы слот проходил через инструментированный метод класса
+        refresh_action.triggered.connect(lambda: self.refresh())
         file_menu.addAction(refresh_action)
 
         view_logs_action = QAction("Посмотреть логи", self)
-        view_logs_action.triggered.connect(self.show_logs)
+        view_logs_action.triggered.connect(lambda: self.show_logs())
         file_menu.addAction(view_logs_action)
 
+        metrics_action = QAction("Метрики", self)
+        metrics_action.triggered.connect(self.show_metrics)
+        file_menu.addAction(metrics_action)
+
+        file_menu.addSeparator()
+
+        export_projects_action = QAction("Экспорт проектов...", self)
+        export_projects_action.triggered.connect(lambda: self.export_data('projects'))
+        file_menu.addAction(export_projects_action)
+
+        export_tasks_action = QAction("Экспорт задач...", self)
+        export_tasks_action.triggered.connect(lambda: self.export_data('tasks'))
+        file_menu.addAction(export_tasks_action)
+
+        reports_action = QAction("Отчёты по проектам...", self)
+        reports_action.triggered.connect(self.create_reports)
+        file_menu.addAction(reports_action)
+
+        import_projects_action = QAction("Импорт проектов...", self)
+        import_projects_action.triggered.connect(lambda: self.import_data('projects'))
+        file_menu.addAction(import_projects_action)
+
+        import_tasks_action = QAction("Импорт задач...", self)
+        import_tasks_action.triggered.connect(lambda: self.import_data('tasks'))
+        file_menu.addAction(import_tasks_action)
+
+        file_menu.addSeparator()
+
+        backup_action = QAction("Резервная копия...", self)
+        backup_action.triggered.connect(self.backup_database)
+        file_menu.addAction(backup_action)
+
+        restore_action = QAction("Восстановить из копии...", self)
+        restore_action.triggered.connect(self.restore_database)
+        file_menu.addAction(restore_action)
+
+        schedule_action = QAction("Автоматическое резервирование...", self)
+        schedule_action.triggered.connect(self.configure_backup_schedule)
+        file_menu.addAction(schedule_action)
+
+        archive_action = QAction("Архивировать завершённые...", self)
+        archive_action.triggered.connect(self.archive_completed)
+        file_menu.addAction(archive_action)
+
+        show_archive_action = QAction("Архив проектов...", self)
+        show_archive_action.triggered.connect(self.show_archive)
+        file_menu.addAction(show_archive_action)
+
+        file_menu.addSeparator()
+
+        deadlines_action = QAction("Ближайшие сроки...", self)
+        deadlines_action.triggered.connect(self.show_deadlines)
+        file_menu.addAction(deadlines_action)
+
+        workload_action = QAction("Нагрузка исполнителей...", self)
+        workload_action.triggered.connect(self.show_workload)
+        file_menu.addAction(workload_action)
+
+        gantt_action = QAction("Диаграмма Ганта...", self)
+        gantt_action.triggered.connect(self.show_gantt)
+        file_menu.addAction(gantt_action)
+
         file_menu.addSeparator()
 
         exit_action = QAction("Выход", self)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
 
+        self.create_edit_menu(menubar)
+        self.workspace_menu = menubar.addMenu("Пространства")
+        self.update_workspace_menu()
+
+    def create_edit_menu(self, menubar):
+        """Меню Правка"""
+        edit_menu = menubar.addMenu("Правка")
+        self.undo_action = QAction("Отменить удаление", self)
+        self.undo_action.setShortcut("Ctrl+Z")
+        self.undo_action.setEnabled(False)
+        self.undo_action.triggered.connect(self.undo_delete)
+        edit_menu.addAction(self.undo_action)
+
+        save_action = QAction("Сохранить правки", self)
+        save_action.setShortcut("Ctrl+S")
+        save_action.triggered.connect(self.save_edits)
+        edit_menu.addAction(save_action)
+
+    def update_workspace_menu(self):
+        """Меню пространств: переключение между БД и запросы по всем сразу"""
+        self.workspace_menu.clear()
+        group = QActionGroup(self.workspace_menu)
+        for name in self.workspaces.names:
+            action = QAction(name, self, checkable=True, checked=name == self.workspaces.current)
+            action.setToolTip(self.workspaces.paths[name])
+            action.triggered.connect(lambda checked, name=name: self.switch_workspace(name))
+            group.addAction(action)
+            self.workspace_menu.addAction(action)
+        self.workspace_menu.addSeparator()
+
+        open_action = QAction("Открыть или создать БД...", self)
+        open_action.triggered.connect(self.open_workspace)
+        self.workspace_menu.addAction(open_action)
+
+        remove_action = QAction("Убрать текущее из списка", self)
+        remove_action.setEnabled(len(self.workspaces.names) > 1)
+        remove_action.triggered.connect(self.remove_workspace)
+        self.workspace_menu.addAction(remove_action)
+
+        self.workspace_menu.addSeparator()
+        summary_action = QAction("Сводка и поиск по всем...", self)
+        summary_action.triggered.connect(self.show_workspaces)
+        self.workspace_menu.addAction(summary_action)
+
     def create_central_widget(self):
         """Создание центрального виджета"""
         central_widget = QWidget()
@@ -158,6 +546,12 @@ class ProjectManagementGUI(QMainWindow):
 
         self.task_assignee = QLineEdit()
         self.task_assignee.setPlaceholderText("Имя исполнителя")
+        # Автодополнение из таблицы исполнителей
+        self.assignee_model = QStringListModel(self)
+        assignee_completer = QCompleter(self.assignee_model, self)
+        assignee_completer.setCaseSensitivity(Qt.CaseInsensitive)
+        assignee_completer.setFilterMode(Qt.MatchContains)
+        self.task_assignee.setCompleter(assignee_completer)
         task_form_layout.addRow("Исполнитель:", self.task_assignee)
 
         self.task_priority = QComboBox()
@@ -207,7 +601,17 @@ class ProjectManagementGUI(QMainWindow):
         # Таблица задач
         tasks_label = QLabel("Задачи выбранного проекта:")
         tasks_label.setStyleSheet("font-family: Inter; font-weight: bold; font-size: 14px;")
-        layout.addWidget(tasks_label)
+        tasks_header = QHBoxLayout()
+        tasks_header.addWidget(tasks_label)
+        tasks_header.addStretch()
+        tasks_header.addWidget(QLabel("Сортировка:"))
+        self.task_sort = QComboBox()
+        self.task_sort.addItem("Новые первыми", 'created')
+        self.task_sort.addItem("По важности", 'priority')
+        self.task_sort.addItem("По сроку", 'deadline')
+        self.task_sort.currentIndexChanged.connect(lambda: self.load_tasks())
+        tasks_header.addWidget(self.task_sort)
+        layout.addLayout(tasks_header)
 
         self.tasks_table = QTableWidget()
         self.setup_tasks_table()
@@ -226,6 +630,7 @@ class ProjectManagementGUI(QMainWindow):
         self.projects_table.setSelectionBehavior(QTableWidget.SelectRows)
         self.projects_table.setSelectionMode(QTableWidget.SingleSelection)
         self.projects_table.itemSelectionChanged.connect(self.on_project_select)
+        self.projects_table.itemChanged.connect(lambda item: self.on_item_changed('projects', item))
 
     def setup_tasks_table(self):
         """Настройка таблицы задач"""
@@ -237,6 +642,7 @@ class ProjectManagementGUI(QMainWindow):
         self.tasks_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.tasks_table.setSelectionBehavior(QTableWidget.SelectRows)
         self.tasks_table.setSelectionMode(QTableWidget.SingleSelection)
+        self.tasks_table.itemChanged.connect(lambda item: self.on_item_changed('tasks', item))
 
     def create_status_bar(self):
         """Создание статус бара"""
@@ -302,6 +708,8 @@ class ProjectManagementGUI(QMainWindow):
 
             task_id = self.db.add_task(task)
             task.id = task_id
+            self.deadline_scanner.task_changed(task)
+            self.load_assignees()
 
             self.logger.log_task_creation(task)
             self.load_tasks()
@@ -345,12 +753,15 @@ class ProjectManagementGUI(QMainWindow):
                         f"Удален проект: {project_name} (ID: {project_id}) с {tasks_count} задачами"
                     )
 
+                    self.deadline_scanner.project_removed(project_id)
+                    self.push_undo('project', project_id, project_name)
                     self.load_projects()
                     self.update_status_bar()
                     self.current_project_id = None
                     self.tasks_table.setRowCount(0)
 
-                    QMessageBox.information(self, "Успех", "Проект и все связанные задачи удалены!")
+                    QMessageBox.information(self, "Успех", "Проект и все связанные задачи удалены!\n"
+                                                           "Отменить: Правка → Отменить удаление (Ctrl+Z)")
                 else:
                     QMessageBox.warning(self, "Ошибка", "Проект не найден")
 
@@ -387,9 +798,12 @@ class ProjectManagementGUI(QMainWindow):
 
                 if success:
                     self.logger.log_activity(f"Удалена задача: {task_title} (ID: {task_id})")
+                    self.deadline_scanner.task_removed(task_id)
+                    self.push_undo('task', task_id, task_title)
                     self.load_tasks()
                     self.update_status_bar()
-                    QMessageBox.information(self, "Успех", "Задача удалена!")
+                    QMessageBox.information(self, "Успех", "Задача удалена!\n"
+                                                           "Отменить: Правка → Отменить удаление (Ctrl+Z)")
                 else:
                     QMessageBox.warning(self, "Ошибка", "Задача не найдена")
 
@@ -405,20 +819,39 @@ class ProjectManagementGUI(QMainWindow):
             self.projects_table.setRowCount(len(projects))
 
             for row, project in enumerate(projects):
-                self.projects_table.setItem(row, 0, QTableWidgetItem(str(project.id)))
-                self.projects_table.setItem(row, 1, QTableWidgetItem(project.name))
-                self.projects_table.setItem(row, 2, QTableWidgetItem(project.description))
-                self.projects_table.setItem(row, 3, QTableWidgetItem(project.status.value))
-                self.projects_table.setItem(row, 4, QTableWidgetItem(project.start_date.strftime('%Y-%m-%d')))
-                end_date = project.end_date.strftime('%Y-%m-%d') if project.end_date else '-'
-                self.projects_table.setItem(row, 5, QTableWidgetItem(end_date))
-                self.projects_table.setItem(row, 6, QTableWidgetItem(f"₽{project.budget:,.2f}"))
-                self.projects_table.setItem(row, 7, QTableWidgetItem(str(project.team_size)))
+                self.fill_project_row(row, project)
 
         except Exception as e:
             self.logger.log_error(e)
             QMessageBox.critical(self, "Ошибка", f"Ошибка загрузки проектов: {str(e)}")
 
+    def fill_project_row(self, row: int, project: Project):
+        end_date = project.end_date.strftime('%Y-%m-%d') if project.end_date else '-'
+        self.fill_row(self.projects_table, row, project.id, project.version, [
+            project.name, project.description, project.status.value, project.start_date.strftime('%Y-%m-%d'),
+            end_date, f"₽{project.budget:,.2f}", str(project.team_size)
+        ])
+
+    def fill_task_row(self, row: int, task: Task):
+        self.fill_row(self.tasks_table, row, task.id, task.version, [
+            task.title, task.assignee, task.priority.value, task.deadline.strftime('%Y-%m-%d'), task.status.value
+        ])
+
+    def fill_row(self, table: QTableWidget, row: int, object_id: int, version: int, values: list):
+        """Строка таблицы: id (с версией строки) и значения; исходный текст ячеек хранится для отката правок"""
+        filling, self.filling = self.filling, True
+        try:
+            id_item = QTableWidgetItem(str(object_id))
+            id_item.setFlags(id_item.flags() & ~Qt.ItemIsEditable)
+            id_item.setData(Qt.UserRole, version)
+            table.setItem(row, 0, id_item)
+            for column, value in enumerate(values, 1):
+                item = QTableWidgetItem(value)
+                item.setData(Qt.UserRole, value)
+                table.setItem(row, column, item)
+        finally:
+            self.filling = filling
+
     def load_tasks(self):
         """Загрузка задач выбранного проекта"""
         if not self.current_project_id:
@@ -426,21 +859,79 @@ class ProjectManagementGUI(QMainWindow):
 
         try:
             self.tasks_table.setRowCount(0)
-            tasks = self.db.get_tasks_by_project(self.current_project_id)
+            tasks = self.db.get_tasks_by_project(self.current_project_id, sort=self.task_sort.currentData())
             self.tasks_table.setRowCount(len(tasks))
 
             for row, task in enumerate(tasks):
-                self.tasks_table.setItem(row, 0, QTableWidgetItem(str(task.id)))
-                self.tasks_table.setItem(row, 1, QTableWidgetItem(task.title))
-                self.tasks_table.setItem(row, 2, QTableWidgetItem(task.assignee))
-                self.tasks_table.setItem(row, 3, QTableWidgetItem(task.priority.value))
-                self.tasks_table.setItem(row, 4, QTableWidgetItem(task.deadline.strftime('%Y-%m-%d')))
-                self.tasks_table.setItem(row, 5, QTableWidgetItem(task.status.value))
+                self.fill_task_row(row, task)
 
         except Exception as e:
             self.logger.log_error(e)
             QMessageBox.critical(self, "Ошибка", f"Ошибка загрузки задач: {str(e)}")
 
+    def on_item_changed(self, table: str, item: QTableWidgetItem):
+        """Правка ячейки: значение проверяется и копится до save_edits"""
+        if self.filling:
+            return
+        widget = self.projects_table if table == 'projects' else self.tasks_table
+        field, parse = (PROJECT_EDITS if table == 'projects' else TASK_EDITS)[item.column()]
+        try:
+            value = parse(item.text())
+        except ValueError as e:
+            self.filling = True
+            item.setText(item.data(Qt.UserRole))
+            self.filling = False
+            QMessageBox.warning(self, "Ошибка", str(e))
+            return
+        id_item = widget.item(item.row(), 0)
+        key = (table, int(id_item.text()))
+        self.pending_edits.setdefault(key, (id_item.data(Qt.UserRole), {}))[1][field] = value
+        self.save_timer.start(1000)
+
+    def save_edits(self):
+        """Сохранение накопленных правок таблиц одной транзакцией"""
+        self.save_timer.stop()
+        if not self.pending_edits:
+            return
+        edits, self.pending_edits = self.pending_edits, {}
+        try:
+            versions = {}
+            with self.db.batch():
+                for (table, object_id), (version, fields) in edits.items():
+                    update = self.db.update_project if table == 'projects' else self.db.update_task
+                    versions[table, object_id] = update(object_id, version, **fields)
+        except StaleVersionError as e:
+            QMessageBox.warning(self, "Конфликт правок",
+                                f"Данные уже изменены в другом окне, правки не сохранены.\n{str(e)}")
+            self.load_projects()
+            self.load_tasks()
+            return
+        except Exception as e:
+            self.logger.log_error(e)
+            QMessageBox.critical(self, "Ошибка", f"Ошибка сохранения правок: {str(e)}")
+            self.load_projects()
+            self.load_tasks()
+            return
+
+        # Таблицы уже показывают новые значения: обновляются только версии и исходный текст ячеек
+        self.filling = True
+        for table, widget in (('projects', self.projects_table), ('tasks', self.tasks_table)):
+            for row in range(widget.rowCount()):
+                version = versions.get((table, int(widget.item(row, 0).text())))
+                if version is not None:
+                    widget.item(row, 0).setData(Qt.UserRole, version)
+                    for column in range(1, widget.columnCount()):
+                        widget.item(row, column).setData(Qt.UserRole, widget.item(row, column).text())
+        self.filling = False
+        self.logger.log_activity(f"Сохранены правки: {len(edits)} записей")
+
+    def load_assignees(self):
+        """Обновление списка автодополнения исполнителей"""
+        try:
+            self.assignee_model.setStringList([name for _, name in self.db.get_assignees()])
+        except Exception as e:
+            self.logger.log_error(e)
+
     def on_project_select(self):
         """Обработка выбора проекта"""
         selected_items = self.projects_table.selectedItems()
@@ -471,16 +962,705 @@ class ProjectManagementGUI(QMainWindow):
     def update_status_bar(self):
         """Обновление статус бара"""
         try:
-            projects = self.db.get_all_projects()
-            total_tasks = sum(len(self.db.get_tasks_by_project(p.id)) for p in projects)
-
-            message = f"Проектов: {len(projects)} | Задач: {total_tasks}"
+            message = f"Проектов: {self.db.count_projects()} | Задач: {self.db.count_tasks()}"
             self.status_bar.showMessage(message)
         except Exception as e:
             self.status_bar.showMessage("Ошибка загрузки статистики")
 
+    def export_data(self, table: str):
+        """Потоковый экспорт таблицы в CSV / JSON Lines"""
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Экспорт", f"{table}.csv",
+            "CSV (*.csv);;JSON Lines (*.jsonl);;CSV gzip (*.csv.gz);;JSON Lines gzip (*.jsonl.gz)"
+        )
+        if not path:
+            return
+
+        progress_dialog = QProgressDialog("Экспорт данных...", None, 0, 100, self)
+        progress_dialog.setWindowModality(Qt.WindowModal)
+        progress_dialog.setMinimumDuration(500)
+
+        def on_progress(written, total):
+            progress_dialog.setValue(int(written * 100 / total) if total else 100)
+            QApplication.processEvents()
+
+        try:
+            fmt, compress = detect_format(path)
+            count = export_table(self.db, table, path, fmt, compress, progress=on_progress)
+            progress_dialog.setValue(100)
+            self.logger.log_activity(f"Экспорт {table}: {count} строк в {path}")
+            QMessageBox.information(self, "Успех", f"Экспортировано строк: {count}")
+        except Exception as e:
+            progress_dialog.cancel()
+            self.logger.log_error(e)
+            QMessageBox.critical(self, "Ошибка", f"Ошибка экспорта: {str(e)}")
+
+    def create_reports(self):
+        """HTML-отчёты по всем проектам, графики рисуются в пуле процессов"""
+        directory = QFileDialog.getExistingDirectory(self, "Каталог для отчётов")
+        if not directory:
+            return
+
+        progress_dialog = QProgressDialog("Создание отчётов...", None, 0, 100, self)
+        progress_dialog.setWindowModality(Qt.WindowModal)
+        progress_dialog.setMinimumDuration(500)
+
+        def on_progress(done, total):
+            progress_dialog.setLabelText(f"Создание отчётов: {done} из {total}")
+            progress_dialog.setValue(int(done * 100 / total) if total else 100)
+            QApplication.processEvents()
+
+        try:
+            paths = generate_reports(self.db, directory, progress=on_progress)
+            progress_dialog.setValue(100)
+            self.logger.log_activity(f"Отчёты по проектам: {len(paths)} в {directory}")
+            QMessageBox.information(self, "Успех", f"Создано отчётов: {len(paths)}\n"
+                                                   f"Оглавление: {os.path.join(directory, 'index.html')}")
+        except Exception as e:
+            progress_dialog.cancel()
+            self.logger.log_error(e)
+            QMessageBox.critical(self, "Ошибка", f"Ошибка создания отчётов: {str(e)}")
+
+    def import_data(self, table: str):
+        """Пакетный импорт из CSV / JSON Lines с отчётом об отклонённых строках"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Импорт", "",
+            "CSV / JSON Lines (*.csv *.jsonl *.csv.gz *.jsonl.gz)"
+        )
+        if not path:
+            return
+
+        def on_progress(imported, rejected):
+            self.status_bar.showMessage(f"Импорт: {imported} строк, отклонено {rejected}")
+            QApplication.processEvents()
+
+        try:
+            result = import_file(self.db, table, path, progress=on_progress, id_map=self.import_id_map)
+            self.logger.log_activity(
+                f"Импорт {table} из {path}: {result.imported} строк, отклонено {result.rejected}"
+            )
+            self.deadline_scanner.reload()
+            self.load_projects()
+            self.load_tasks()
+            self.load_assignees()
+            self.update_status_bar()
+            message = f"Импортировано строк: {result.imported}\nОтклонено: {result.rejected}"
+            if result.report_path:
+                message += f"\nОтчёт: {result.report_path}"
+            QMessageBox.information(self, "Импорт", message)
+        except Exception as e:
+            self.logger.log_error(e)
+            QMessageBox.critical(self, "Ошибка", f"Ошибка импорта: {str(e)}")
+
+    def backup_database(self):
+        """Ручное резервное копирование БД"""
+        default_name = datetime.now().strftime("projects-%Y%m%d-%H%M%S.db")
+        path, _ = QFileDialog.getSaveFileName(self, "Резервная копия", default_name, "SQLite (*.db)")
+        if not path:
+            return
+
+        progress_dialog = QProgressDialog("Резервное копирование...", None, 0, 100, self)
+        progress_dialog.setWindowModality(Qt.WindowModal)
+        progress_dialog.setMinimumDuration(500)
+
+        def on_progress(status, remaining, total):
+            progress_dialog.setValue(int((total - remaining) * 100 / total) if total else 100)
+            QApplication.processEvents()
+
+        try:
+            self.db.backup(path, progress=on_progress)
+            progress_dialog.setValue(100)
+            self.logger.log_activity(f"Создана резервная копия: {path}")
+            QMessageBox.information(self, "Успех", "Резервная копия создана!")
+        except Exception as e:
+            progress_dialog.cancel()
+            self.logger.log_error(e)
+            QMessageBox.critical(self, "Ошибка", str(e))
+
+    def restore_database(self):
+        """Восстановление БД из резервной копии"""
+        path, _ = QFileDialog.getOpenFileName(self, "Восстановить из копии", self.backup_dir, "SQLite (*.db)")
+        if not path:
+            return
+
+        reply = QMessageBox.question(
+            self,
+            "Подтверждение восстановления",
+            "Текущие данные будут заменены данными из резервной копии. Продолжить?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+
+        try:
+            self.db.restore(path)
+            self.logger.log_activity(f"БД восстановлена из копии: {path}")
+            self.undo_stack.clear()
+            self.undo_action.setEnabled(False)
+            self.revision = self.db.get_revision()
+            self.deadline_scanner.reload()
+            self.current_project_id = None
+            self.tasks_table.setRowCount(0)
+            self.load_projects()
+            self.load_assignees()
+            self.update_status_bar()
+            QMessageBox.information(self, "Успех", "Данные восстановлены!")
+        except Exception as e:
+            self.logger.log_error(e)
+            QMessageBox.critical(self, "Ошибка", str(e))
+
+    def configure_backup_schedule(self):
+        """Настройка автоматического резервного копирования"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Автоматическое резервирование")
+        layout = QFormLayout(dialog)
+
+        enabled = QCheckBox("Включено")
+        enabled.setChecked(self.backup_timer.isActive())
+        layout.addRow(enabled)
+
+        interval = QSpinBox()
+        interval.setRange(1, 24 * 60)
+        interval.setValue(self.backup_interval)
+        interval.setSuffix(" мин")
+        layout.addRow("Интервал:", interval)
+
+        keep = QSpinBox()
+        keep.setRange(1, 1000)
+        keep.setValue(self.backup_keep)
+        layout.addRow("Хранить копий:", keep)
+
+        directory = QLineEdit(self.backup_dir)
+        layout.addRow("Каталог:", directory)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        layout.addRow(buttons)
+
+        if dialog.exec() != QDialog.Accepted:
+            return
+
+        self.backup_interval = interval.value()
+        self.backup_keep = keep.value()
+        self.backup_dir = directory.text().strip() or "backups"
+        if enabled.isChecked():
+            self.backup_timer.start(self.backup_interval * 60 * 1000)
+            self.logger.log_activity(
+                f"Автоматическое резервирование: каждые {self.backup_interval} мин, хранить {self.backup_keep}"
+            )
+        else:
+            self.backup_timer.stop()
+            self.logger.log_activity("Автоматическое резервирование отключено")
+
+    def archive_completed(self):
+        """Перенос давно завершённых проектов с задачами в архивную БД"""
+        self.save_edits()
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Архивирование проектов")
+        layout = QFormLayout(dialog)
+        days = QSpinBox()
+        days.setRange(0, 100 * 365)
+        days.setValue(self.archive_after_days)
+        days.setSuffix(" дн.")
+        layout.addRow("Завершены более чем:", days)
+        layout.addRow(QLabel("Проекты переносятся в архив вместе с задачами; вернуть - Файл - Архив проектов"))
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        layout.addRow(buttons)
+        if dialog.exec() != QDialog.Accepted:
+            return
+
+        self.archive_after_days = days.value()
+        try:
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                moved = self.db.archive_projects(datetime.now() - timedelta(days=self.archive_after_days))
+            finally:
+                QApplication.restoreOverrideCursor()
+            self.logger.log_activity(f"В архив перенесено проектов: {moved}")
+            self.refresh()
+            self.update_status_bar()
+            QMessageBox.information(self, "Успех", f"В архив перенесено проектов: {moved}")
+        except Exception as e:
+            self.logger.log_error(e)
+            QMessageBox.critical(self, "Ошибка", f"Ошибка архивирования: {str(e)}")
+
+    def show_archive(self):
+        """Просмотр и поиск архивных проектов (только чтение) с возвратом выбранных"""
+        try:
+            archive = self.db.open_archive(read_only=True)
+        except Exception as e:
+            self.logger.log_error(e)
+            QMessageBox.critical(self, "Ошибка", str(e))
+            return
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Архив проектов")
+        dialog.setGeometry(200, 200, 1000, 650)
+        layout = QVBoxLayout(dialog)
+
+        search = QLineEdit()
+        search.setPlaceholderText("Поиск по названию и описанию")
+        layout.addWidget(search)
+        projects_table = QTableWidget()
+        projects_table.setColumnCount(6)
+        projects_table.setHorizontalHeaderLabels(["ID", "Название", "Статус", "Начало", "Окончание", "Бюджет"])
+        projects_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        projects_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        projects_table.setSelectionBehavior(QTableWidget.SelectRows)
+        layout.addWidget(projects_table)
+        tasks_table = QTableWidget()
+        tasks_table.setColumnCount(5)
+        tasks_table.setHorizontalHeaderLabels(["ID", "Задача", "Исполнитель", "Срок", "Статус"])
+        tasks_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        tasks_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(tasks_table)
+        restore_btn = QPushButton("Вернуть выбранные из архива")
+        layout.addWidget(restore_btn)
+
+        def load():
+            text = search.text().strip()
+            try:
+                projects = archive.search_projects(text) if text else archive.get_all_projects()
+            except Exception as e:
+                self.logger.log_error(e)
+                QMessageBox.critical(self, "Ошибка", str(e))
+                return
+            projects_table.setRowCount(len(projects))
+            tasks_table.setRowCount(0)
+            for row, project in enumerate(projects):
+                end_date = project.end_date.strftime('%Y-%m-%d') if project.end_date else '-'
+                values = [str(project.id), project.name, project.status.value,
+                          project.start_date.strftime('%Y-%m-%d'), end_date, f"₽{project.budget:,.2f}"]
+                for column, value in enumerate(values):
+                    projects_table.setItem(row, column, QTableWidgetItem(value))
+
+        def show_tasks():
+            rows = projects_table.selectionModel().selectedRows()
+            if not rows:
+                tasks_table.setRowCount(0)
+                return
+            tasks = archive.get_tasks_by_project(int(projects_table.item(rows[0].row(), 0).text()))
+            tasks_table.setRowCount(len(tasks))
+            for row, task in enumerate(tasks):
+                values = [str(task.id), task.title, task.assignee, task.deadline.strftime('%Y-%m-%d'),
+                          task.status.value]
+                for column, value in enumerate(values):
+                    tasks_table.setItem(row, column, QTableWidgetItem(value))
+
+        def restore():
+            ids = [int(projects_table.item(index.row(), 0).text())
+                   for index in projects_table.selectionModel().selectedRows()]
+            if not ids:
+                return
+            try:
+                restored = self.db.restore_archived(ids)
+            except Exception as e:
+                self.logger.log_error(e)
+                QMessageBox.critical(self, "Ошибка", f"Ошибка возврата из архива: {str(e)}")
+                return
+            self.logger.log_activity(f"Возвращено из архива проектов: {restored}")
+            self.refresh()
+            self.update_status_bar()
+            load()
+
+        search.returnPressed.connect(load)
+        projects_table.itemSelectionChanged.connect(show_tasks)
+        restore_btn.clicked.connect(restore)
+        load()
+        dialog.exec()
+        archive.close()
+
+    def run_scheduled_backup(self):
+        """Плановое резервное копирование в фоновом потоке"""
+        if self.backup_thread and self.backup_thread.is_alive():
+            return
+
+        def worker():
+            try:
+                path = run_backup(self.db, self.backup_dir, self.backup_keep)
+                self.logger.log_activity(f"Создана плановая резервная копия: {path}")
+            except Exception as e:
+                self.logger.log_error(e)
+
+        self.backup_thread = threading.Thread(target=worker, daemon=True)
+        self.backup_thread.start()
+
+    def push_undo(self, kind: str, object_id: int, title: str):
+        self.undo_stack.append((kind, object_id, title))
+        self.undo_action.setEnabled(True)
+        self.undo_action.setText(f"Отменить удаление «{title}»")
+
+    def undo_delete(self):
+        """Восстановление последнего удалённого проекта или задачи"""
+        if not self.undo_stack:
+            return
+        kind, object_id, title = self.undo_stack.pop()
+        try:
+            if kind == 'project':
+                restored = self.db.restore_project(object_id)
+            else:
+                restored = self.db.restore_task(object_id)
+            if restored:
+                self.logger.log_activity(f"Отменено удаление: {title} (ID: {object_id})")
+                self.refresh()
+                self.update_status_bar()
+            else:
+                QMessageBox.warning(self, "Ошибка", f"Не удалось восстановить «{title}»")
+        except Exception as e:
+            self.logger.log_error(e)
+            QMessageBox.critical(self, "Ошибка", f"Ошибка восстановления: {str(e)}")
+        self.undo_action.setEnabled(bool(self.undo_stack))
+        self.undo_action.setText(f"Отменить удаление «{self.undo_stack[-1][2]}»" if self.undo_stack
+                                 else "Отменить удаление")
+
+    def run_purge(self):
+        """Физическое удаление старых надгробий в фоновом потоке"""
+        if self.purge_thread and self.purge_thread.is_alive():
+            return
+
+        def worker():
+            try:
+                removed = self.db.purge_deleted(datetime.now() - self.purge_after)
+                if removed:
+                    self.logger.log_activity(f"Очистка удалённых данных: {removed} записей")
+            except Exception as e:
+                self.logger.log_error(e)
+
+        self.purge_thread = threading.Thread(target=worker, daemon=True)
+        self.purge_thread.start()
+
+    def sync_changes(self):
+        """Применение к таблицам только строк, изменённых после последней синхронизации"""
+        if self.pending_edits:
+            # Сначала сохраняются свои правки, иначе строки с ними перезаписались бы
+            return
+        try:
+            changes = self.db.get_changes_since(self.revision)
+        except Exception as e:
+            self.logger.log_error(e)
+            return
+        self.revision = changes.revision
+        if not changes:
+            return
+
+        rows = {int(self.projects_table.item(row, 0).text()): row for row in range(self.projects_table.rowCount())}
+        for project in changes.projects:
+            if project.id in rows:
+                self.fill_project_row(rows[project.id], project)
+            else:
+                # Новые проекты - сверху, как в load_projects
+                self.projects_table.insertRow(0)
+                self.fill_project_row(0, project)
+                rows = {project_id: row + 1 for project_id, row in rows.items()}
+        for project_id in changes.deleted_projects:
+            self.deadline_scanner.project_removed(project_id)
+            if project_id in rows:
+                self.projects_table.removeRow(rows.pop(project_id))
+                rows = {int(self.projects_table.item(row, 0).text()): row
+                        for row in range(self.projects_table.rowCount())}
+            if project_id == self.current_project_id:
+                self.current_project_id = None
+                self.tasks_table.setRowCount(0)
+
+        for task in changes.tasks:
+            self.deadline_scanner.task_changed(task)
+        for task_id in changes.deleted_tasks:
+            self.deadline_scanner.task_removed(task_id)
+        shown = {int(self.tasks_table.item(row, 0).text()): row for row in range(self.tasks_table.rowCount())}
+        reload = any(task_id in shown for task_id in changes.deleted_tasks)
+        for task in changes.tasks:
+            if task.id in shown:
+                self.fill_task_row(shown[task.id], task)
+            elif task.project_id == self.current_project_id:
+                reload = True
+        if reload:
+            self.load_tasks()
+        if changes.tasks:
+            self.load_assignees()
+        self.update_status_bar()
+
+    def refresh(self):
+        """Перечитать данные (в том числе изменённые другими экземплярами приложения)"""
+        self.revision = self.db.get_revision()
+        self.deadline_scanner.reload()
+        self.load_projects()
+        self.load_tasks()
+        self.load_assignees()
+        self.check_deadlines()
+
+    def setup_deadline_alerts(self):
+        """Значок в трее для оповещений и проверка сроков раз в минуту"""
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            self.tray = QSystemTrayIcon(self.style().standardIcon(self.style().StandardPixmap.SP_MessageBoxWarning),
+                                        self)
+            self.tray.setToolTip(self.windowTitle())
+            self.tray.show()
+        self.deadline_timer.start(60 * 1000)
+        QTimer.singleShot(0, self.check_deadlines)
+
+    def check_deadlines(self):
+        """Показ наступивших оповещений о сроках"""
+        try:
+            alerts = self.deadline_scanner.poll(datetime.now())
+        except Exception as e:
+            self.logger.log_error(e)
+            return
+        if not alerts:
+            return
+        for alert in alerts:
+            self.logger.log_activity(alert.message)
+        text = "\n".join(alert.message for alert in alerts[:5])
+        if len(alerts) > 5:
+            text += f"\n...и ещё {len(alerts) - 5}"
+        if self.tray is not None:
+            self.tray.showMessage("Сроки задач", text, QSystemTrayIcon.Warning, 10000)
+        else:
+            self.status_bar.showMessage(text.replace("\n", " | "), 10000)
+
+    def show_deadlines(self):
+        """Задачи со сроком на ближайшие дни, включая просроченные"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Ближайшие сроки")
+        dialog.setGeometry(200, 200, 800, 500)
+        layout = QVBoxLayout(dialog)
+
+        days = QSpinBox()
+        days.setRange(1, 365)
+        days.setValue(7)
+        days.setSuffix(" дн.")
+        form = QFormLayout()
+        form.addRow("Период:", days)
+        layout.addLayout(form)
+
+        table = QTableWidget()
+        table.setColumnCount(5)
+        table.setHorizontalHeaderLabels(["ID", "Задача", "Исполнитель", "Срок", "Статус"])
+        table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(table)
+
+        def refresh():
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            try:
+                tasks = self.db.get_tasks_due_between(None, today + timedelta(days=days.value()))
+            except Exception as e:
+                self.logger.log_error(e)
+                QMessageBox.critical(self, "Ошибка", str(e))
+                return
+            table.setRowCount(len(tasks))
+            for row, task in enumerate(tasks):
+                values = [str(task.id), task.title, task.assignee, task.deadline.strftime('%Y-%m-%d'),
+                          task.status.value]
+                for column, value in enumerate(values):
+                    item = QTableWidgetItem(value)
+                    if task.deadline < today:
+                        item.setForeground(Qt.red)
+                    table.setItem(row, column, item)
+
+        days.valueChanged.connect(refresh)
+        refresh()
+        dialog.exec()
+
+    def show_workload(self):
+        """Открытые, просроченные и срочные задачи по исполнителям"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Нагрузка исполнителей")
+        dialog.setGeometry(200, 200, 900, 600)
+        layout = QVBoxLayout(dialog)
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        workload_table = QTableWidget()
+        workload_table.setColumnCount(4)
+        workload_table.setHorizontalHeaderLabels(["Исполнитель", "Открытых", "Просроченных", "Срочных и высоких"])
+        workload_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        workload_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        workload_table.setSelectionBehavior(QTableWidget.SelectRows)
+        layout.addWidget(workload_table)
+
+        overdue_only = QCheckBox("Только просроченные")
+        layout.addWidget(overdue_only)
+        tasks_table = QTableWidget()
+        tasks_table.setColumnCount(5)
+        tasks_table.setHorizontalHeaderLabels(["ID", "Задача", "Приоритет", "Срок", "Статус"])
+        tasks_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        tasks_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(tasks_table)
+
+        try:
+            workload = self.db.get_assignee_workload(today)
+        except Exception as e:
+            self.logger.log_error(e)
+            QMessageBox.critical(self, "Ошибка", str(e))
+            return
+        workload_table.setRowCount(len(workload))
+        for row, (_, name, open_tasks, overdue, urgent) in enumerate(workload):
+            for column, value in enumerate((name, open_tasks, overdue, urgent)):
+                workload_table.setItem(row, column, QTableWidgetItem(str(value)))
+
+        def show_tasks():
+            rows = workload_table.selectionModel().selectedRows()
+            if not rows:
+                tasks_table.setRowCount(0)
+                return
+            assignee_id = workload[rows[0].row()][0]
+            tasks = self.db.get_assignee_tasks(assignee_id, due_before=today if overdue_only.isChecked() else None)
+            tasks_table.setRowCount(len(tasks))
+            for row, task in enumerate(tasks):
+                values = [str(task.id), task.title, task.priority.value, task.deadline.strftime('%Y-%m-%d'),
+                          task.status.value]
+                for column, value in enumerate(values):
+                    tasks_table.setItem(row, column, QTableWidgetItem(value))
+
+        workload_table.itemSelectionChanged.connect(show_tasks)
+        overdue_only.toggled.connect(show_tasks)
+        dialog.exec()
+
+    def show_gantt(self):
+        """Диаграмма Ганта проектов и их задач"""
+        try:
+            timeline = Timeline.from_database(self.db)
+        except Exception as e:
+            self.logger.log_error(e)
+            QMessageBox.critical(self, "Ошибка", str(e))
+            return
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Диаграмма Ганта")
+        dialog.setGeometry(100, 100, 1200, 700)
+        layout = QVBoxLayout(dialog)
+        layout.addWidget(QLabel("Перетаскивание - прокрутка, колесо - строки, Ctrl+колесо - масштаб дат"))
+        layout.addWidget(GanttCanvas(timeline, dialog))
+        dialog.exec()
+
+    def save_workspaces(self):
+        try:
+            self.workspaces.save()
+        except OSError as e:
+            self.logger.log_error(e)
+
+    def switch_workspace(self, name: str):
+        """Переход к другому пространству: несохранённые правки сначала записываются"""
+        if name == self.workspaces.current:
+            return
+        self.save_edits()
+        try:
+            db = self.workspaces.open(name)
+        except Exception as e:
+            self.logger.log_error(e)
+            QMessageBox.critical(self, "Ошибка", f"Ошибка открытия пространства: {str(e)}")
+            self.update_workspace_menu()
+            return
+        self.workspaces.current = name
+        self.db = db
+        self.deadline_scanner = DeadlineScanner(self.db)
+        self.undo_stack.clear()
+        self.undo_action.setEnabled(False)
+        self.undo_action.setText("Отменить удаление")
+        self.import_id_map = {}
+        self.current_project_id = None
+        self.tasks_table.setRowCount(0)
+        self.setWindowTitle(f"Система управления IT-проектами - {name}")
+        self.refresh()
+        self.update_status_bar()
+        self.update_workspace_menu()
+        self.save_workspaces()
+        self.logger.log_activity(f"Пространство: {name} ({self.workspaces.paths[name]})")
+
+    def open_workspace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Открыть или создать БД", "", "SQLite (*.db)",
+                                              options=QFileDialog.DontConfirmOverwrite)
+        if not path:
+            return
+        name = self.workspaces.add(path)
+        self.update_workspace_menu()
+        self.switch_workspace(name)
+        self.save_workspaces()
+
+    def remove_workspace(self):
+        """Исключение текущего пространства из списка; файл БД не удаляется"""
+        name = self.workspaces.current
+        others = [other for other in self.workspaces.names if other != name]
+        if not others:
+            return
+        self.switch_workspace(others[0])
+        if self.workspaces.current == name:
+            return
+        self.workspaces.remove(name)
+        self.update_workspace_menu()
+        self.save_workspaces()
+
+    def show_workspaces(self):
+        """Сводка по всем пространствам и поиск сразу во всех (одним запросом через ATTACH)"""
+        self.save_edits()
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Пространства")
+        dialog.setGeometry(200, 200, 1000, 650)
+        layout = QVBoxLayout(dialog)
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        summary_table = QTableWidget()
+        summary_table.setColumnCount(6)
+        summary_table.setHorizontalHeaderLabels(["Пространство", "Проектов", "Задач", "Открытых",
+                                                 "Просроченных", "Бюджет"])
+        summary_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        summary_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(summary_table)
+
+        search = QLineEdit()
+        search.setPlaceholderText("Поиск проектов и задач во всех пространствах")
+        layout.addWidget(search)
+        results_table = QTableWidget()
+        results_table.setColumnCount(5)
+        results_table.setHorizontalHeaderLabels(["Пространство", "Вид", "ID", "Название", "Статус"])
+        results_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        results_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        results_table.setSelectionBehavior(QTableWidget.SelectRows)
+        layout.addWidget(results_table)
+
+        try:
+            summary = self.workspaces.summary(today)
+        except Exception as e:
+            self.logger.log_error(e)
+            QMessageBox.critical(self, "Ошибка", str(e))
+            return
+        summary_table.setRowCount(len(summary))
+        for row, (name, projects, tasks, open_tasks, overdue, budget) in enumerate(summary):
+            values = [name, str(projects), str(tasks), str(open_tasks), str(overdue), f"₽{budget:,.2f}"]
+            for column, value in enumerate(values):
+                summary_table.setItem(row, column, QTableWidgetItem(value))
+
+        def run_search():
+            text = search.text().strip()
+            if not text:
+                results_table.setRowCount(0)
+                return
+            try:
+                results = [(name, "Проект", project.id, project.name, project.status.value)
+                           for name, project in self.workspaces.search_projects(text)]
+                results += [(name, "Задача", task.id, task.title, task.status.value)
+                            for name, task in self.workspaces.search_tasks(text)]
+            except Exception as e:
+                self.logger.log_error(e)
+                QMessageBox.critical(self, "Ошибка", str(e))
+                return
+            results_table.setRowCount(len(results))
+            for row, values in enumerate(results):
+                for column, value in enumerate(values):
+                    results_table.setItem(row, column, QTableWidgetItem(str(value)))
+
+        def open_result(item):
+            dialog.accept()
+            self.switch_workspace(results_table.item(item.row(), 0).text())
+
+        search.returnPressed.connect(run_search)
+        results_table.itemDoubleClicked.connect(open_result)
+        dialog.exec()
+
     def closeEvent(self, event):
         """Обработка закрытия приложения"""
+        self.save_edits()
         self.logger.log_activity("Приложение закрыто")
         event.accept()
 
@@ -545,6 +1725,57 @@ class ProjectManagementGUI(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось прочитать логи: {str(e)}")
 
+    def show_metrics(self):
+        """Окно метрик производительности с обновлением в реальном времени"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Метрики")
+        dialog.setGeometry(200, 200, 900, 500)
+        layout = QVBoxLayout(dialog)
+
+        enabled = QCheckBox("Сбор метрик включён")
+        enabled.setChecked(metrics.enabled)
+        enabled.toggled.connect(lambda checked: metrics.enable() if checked else metrics.disable())
+        layout.addWidget(enabled)
+
+        table = QTableWidget()
+        table.setColumnCount(8)
+        table.setHorizontalHeaderLabels([
+            'Операция', 'Вызовов', 'Ошибок', 'p50, мс', 'p95, мс', 'p99, мс', 'Всего, мс', 'Строк'
+        ])
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(table)
+
+        def refresh():
+            snapshot = metrics.snapshot()
+            table.setRowCount(len(snapshot))
+            for row, (name, stats) in enumerate(snapshot.items()):
+                values = [
+                    name, str(stats['count']), str(stats['errors']),
+                    f"{stats['p50'] * 1000:.2f}", f"{stats['p95'] * 1000:.2f}", f"{stats['p99'] * 1000:.2f}",
+                    f"{stats['total'] * 1000:.1f}", str(stats['rows'])
+                ]
+                for column, value in enumerate(values):
+                    table.setItem(row, column, QTableWidgetItem(value))
+
+        timer = QTimer(dialog)
+        timer.timeout.connect(refresh)
+        timer.start(1000)
+        refresh()
+
+        buttons_layout = QHBoxLayout()
+        reset_btn = QPushButton("Сбросить")
+        reset_btn.clicked.connect(lambda: (metrics.reset(), refresh()))
+        buttons_layout.addWidget(reset_btn)
+        close_btn = QPushButton("Закрыть")
+        close_btn.clicked.connect(dialog.close)
+        buttons_layout.addWidget(close_btn)
+        layout.addLayout(buttons_layout)
+
+        dialog.exec()
+        timer.stop()
+
     def analyze_activity(self):
         """Анализ логов и подсчет активности по дням"""
         activity_by_day = {}
@@ -563,4 +1794,7 @@ class ProjectManagementGUI(QMainWindow):
             return activity_by_day
         except Exception as e:
             print(f"Ошибка анализа логов: {e}")
-            return {}
\ No newline at end of file
+            return {}
+
+
+metrics.register(ProjectManagementGUI, ['load_projects', 'load_tasks', 'update_status_bar', 'show_logs'])
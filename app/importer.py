@@ -0,0 +1,323 @@
+import argparse
+import csv
+import gzip
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+from app.database import DatabaseManager
+from app.exporter import detect_format
+from app.models import Project, Task, ProjectStatus, TaskPriority
+
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass
+class ImportResult:
+    """Итог импорта"""
+    imported: int = 0
+    rejected: int = 0
+    report_path: Optional[str] = None
+    # Соответствие id проекта в исходном файле -> id в БД
+    id_map: Dict[int, int] = field(default_factory=dict)
+
+
+_ENUM_LOOKUP = {
+    enum_cls: {**{member.value: member for member in enum_cls}, **{member.name: member for member in enum_cls}}
+    for enum_cls in (ProjectStatus, TaskPriority)
+}
+
+
+def parse_enum(enum_cls: Type[Enum], value) -> Enum:
+    """Значение перечисления по отображаемому тексту ("Высокий") или имени ("HIGH")"""
+    text = str(value).strip()
+    member = _ENUM_LOOKUP[enum_cls].get(text) or _ENUM_LOOKUP[enum_cls].get(text.upper())
+    if member is None:
+        raise ValueError(f"Недопустимое значение {enum_cls.__name__}: {text!r}")
+    return member
+
+
+def parse_date(value, field_name: str) -> datetime:
+    """Дата в формате ГГГГ-ММ-ДД (fromisoformat в разы быстрее strptime)"""
+    text = str(value).strip()
+    try:
+        if len(text) != 10 or text[4] != '-' or text[7] != '-':
+            raise ValueError
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"Некорректная дата в поле {field_name}: {value!r}")
+
+
+def _required(record: dict, field_name: str) -> str:
+    value = record.get(field_name)
+    if value is None or str(value).strip() == '':
+        raise ValueError(f"Не заполнено поле {field_name}")
+    return str(value).strip()
+
+
+def _optional(record: dict, field_name: str) -> Optional[str]:
+    value = record.get(field_name)
+    if value is None or str(value).strip() == '':
+        return None
+    return str(value).strip()
+
+
+def parse_project(record: dict) -> Project:
+    """Проверка и преобразование записи в Project"""
+    start_date = parse_date(_required(record, 'start_date'), 'start_date')
+    end_value = _optional(record, 'end_date')
+    end_date = parse_date(end_value, 'end_date') if end_value else None
+    if end_date and end_date < start_date:
+        raise ValueError("Дата окончания раньше даты начала")
+    status_value = _optional(record, 'status')
+    budget = float(_optional(record, 'budget') or 0)
+    team_size = int(_optional(record, 'team_size') or 0)
+    if budget < 0 or team_size < 0:
+        raise ValueError("Бюджет и размер команды не могут быть отрицательными")
+    return Project(
+        id=None,
+        name=_required(record, 'name'),
+        description=_optional(record, 'description') or '',
+        start_date=start_date,
+        end_date=end_date,
+        status=parse_enum(ProjectStatus, status_value) if status_value else ProjectStatus.PLANNING,
+        budget=budget,
+        team_size=team_size
+    )
+
+
+def parse_duration(value) -> int:
+    """Длительность задачи в днях (по умолчанию 1)"""
+    if value in (None, ''):
+        return 1
+    try:
+        duration = int(value)
+    except ValueError:
+        raise ValueError(f"Поле duration: ожидается целое число дней, получено {value!r}")
+    if duration < 0:
+        raise ValueError(f"Поле duration не может быть отрицательным: {value!r}")
+    return duration
+
+
+def parse_task(record: dict) -> Task:
+    """Проверка и преобразование записи в Task"""
+    priority_value = _optional(record, 'priority')
+    status_value = _optional(record, 'status')
+    return Task(
+        id=None,
+        project_id=int(_required(record, 'project_id')),
+        title=_required(record, 'title'),
+        description=_optional(record, 'description') or '',
+        assignee=_optional(record, 'assignee') or '',
+        priority=parse_enum(TaskPriority, priority_value) if priority_value else TaskPriority.MEDIUM,
+        deadline=parse_date(_required(record, 'deadline'), 'deadline'),
+        status=parse_enum(ProjectStatus, status_value) if status_value else ProjectStatus.PLANNING,
+        duration=parse_duration(_optional(record, 'duration'))
+    )
+
+
+PARSERS = {'projects': parse_project, 'tasks': parse_task}
+
+
+def read_records(path: str) -> Iterator[Tuple[int, object]]:
+    """Потоковое чтение записей (номер строки, словарь) из CSV / JSON Lines.
+
+    Нераспознанные строки JSON возвращаются как есть (строкой) и попадают в отчёт.
+    """
+    fmt, compress = detect_format(path)
+    f = gzip.open(path, 'rt', encoding='utf-8', newline='') if compress \
+        else open(path, 'r', encoding='utf-8', newline='')
+    with f:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError:
+                    yield line_no, line.rstrip('\n')
+
+
+def _pack_project(project: Project) -> tuple:
+    return (project.name, project.description, project.start_date.toordinal(),
+            project.end_date.toordinal() if project.end_date else None,
+            project.status.name, project.budget, project.team_size)
+
+
+def _unpack_project(values: tuple) -> Project:
+    name, description, start_date, end_date, status, budget, team_size = values
+    return Project(None, name, description, datetime.fromordinal(start_date),
+                   datetime.fromordinal(end_date) if end_date else None,
+                   ProjectStatus[status], budget, team_size)
+
+
+def _pack_task(task: Task) -> tuple:
+    return (task.project_id, task.title, task.description, task.assignee,
+            task.priority.name, task.deadline.toordinal(), task.status.name, task.duration)
+
+
+def _unpack_task(values: tuple) -> Task:
+    project_id, title, description, assignee, priority, deadline, status, duration = values
+    return Task(None, project_id, title, description, assignee,
+                TaskPriority[priority], datetime.fromordinal(deadline), ProjectStatus[status], duration)
+
+
+# Dataclass с enum и datetime сериализуются pickle в разы медленнее кортежей
+# примитивов, поэтому между процессами передаются упакованные значения
+PACKERS = {'projects': (_pack_project, _unpack_project), 'tasks': (_pack_task, _unpack_task)}
+
+
+def _parse_chunk(table: str, chunk: List[Tuple[int, object]], pack: bool = False) -> Tuple[list, list]:
+    """Разбор порции записей (выполняется в рабочем процессе)"""
+    parse = PARSERS[table]
+    pack_item = PACKERS[table][0] if pack else None
+    parsed, rejected = [], []
+    for line_no, record in chunk:
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("Некорректная строка JSON")
+            source_id = _optional(record, 'id')
+            item = parse(record)
+            parsed.append((line_no, int(source_id) if source_id else None,
+                           pack_item(item) if pack_item else item))
+        except (ValueError, TypeError) as e:
+            rejected.append((line_no, str(e), record))
+    return parsed, rejected
+
+
+def _chunks(records: Iterator, chunk_size: int) -> Iterator[list]:
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _parsed_chunks(table: str, records: Iterator, chunk_size: int, workers: int) -> Iterator[Tuple[list, list]]:
+    """Разбор порций в пуле процессов с сохранением порядка.
+
+    В работе держится не больше 2 * workers порций, поэтому файл не
+    загружается в память целиком.
+    """
+    if workers <= 0:
+        for chunk in _chunks(records, chunk_size):
+            yield _parse_chunk(table, chunk)
+        return
+    unpack_item = PACKERS[table][1]
+
+    def unpacked(future):
+        parsed, rejected = future.result()
+        return [(line_no, source_id, unpack_item(item)) for line_no, source_id, item in parsed], rejected
+
+    # spawn: fork процесса с Qt и фоновыми потоками небезопасен (импорт запускается и из GUI)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        pending = deque()
+        for chunk in _chunks(records, chunk_size):
+            pending.append(executor.submit(_parse_chunk, table, chunk, True))
+            if len(pending) >= workers * 2:
+                yield unpacked(pending.popleft())
+        while pending:
+            yield unpacked(pending.popleft())
+
+
+def import_file(db: DatabaseManager, table: str, path: str, chunk_size: int = 5000,
+                workers: Optional[int] = None, report_path: Optional[str] = None,
+                progress: Optional[ProgressCallback] = None,
+                id_map: Optional[Dict[int, int]] = None) -> ImportResult:
+    """Импорт проектов или задач из CSV / JSON Lines.
+
+    Записи разбираются и проверяются в пуле процессов (workers=0 - в
+    текущем процессе), каждая порция пишется одной транзакцией. Отклонённые
+    строки с причиной пишутся в CSV-отчёт report_path (по умолчанию
+    <path>.rejected.csv). Для задач project_id сначала ищется в id_map
+    (id проектов из предыдущего импорта), затем среди проектов БД.
+    """
+    if table not in PARSERS:
+        raise ValueError(f"Неизвестная таблица: {table}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    result = ImportResult(report_path=report_path or path + '.rejected.csv',
+                          id_map=id_map if id_map is not None else {})
+    project_ids = db.get_project_ids() if table == 'tasks' else set()
+    report_file = None
+    report_writer = None
+
+    try:
+        for parsed, rejected in _parsed_chunks(table, read_records(path), chunk_size, workers):
+            if table == 'projects':
+                new_ids = db.add_projects([project for _, _, project in parsed])
+                for (_, source_id, _), new_id in zip(parsed, new_ids):
+                    if source_id is not None:
+                        result.id_map[source_id] = new_id
+                result.imported += len(new_ids)
+            else:
+                tasks = []
+                for line_no, _, task in parsed:
+                    task.project_id = result.id_map.get(task.project_id, task.project_id)
+                    if task.project_id in project_ids:
+                        tasks.append(task)
+                    else:
+                        rejected.append((line_no, f"Проект не найден: {task.project_id}", None))
+                result.imported += db.add_tasks(tasks) if tasks else 0
+
+            if rejected:
+                if report_writer is None:
+                    report_file = open(result.report_path, 'w', encoding='utf-8', newline='')
+                    report_writer = csv.writer(report_file)
+                    report_writer.writerow(['line', 'error', 'record'])
+                for line_no, error, record in sorted(rejected, key=lambda item: item[0]):
+                    report_writer.writerow([line_no, error,
+                                            json.dumps(record, ensure_ascii=False) if record is not None else ''])
+                result.rejected += len(rejected)
+
+            if progress:
+                progress(result.imported, result.rejected)
+    finally:
+        if report_file:
+            report_file.close()
+
+    if not result.rejected:
+        result.report_path = None
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Импорт проектов и задач из CSV / JSON Lines")
+    parser.add_argument('--projects', help="Файл проектов (.csv, .jsonl, опционально .gz)")
+    parser.add_argument('--tasks', help="Файл задач (.csv, .jsonl, опционально .gz)")
+    parser.add_argument('--db', default='projects.db', help="Путь к базе данных")
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=None, help="Число процессов разбора (0 - без пула)")
+    args = parser.parse_args(argv)
+    if not args.projects and not args.tasks:
+        parser.error("Укажите --projects и/или --tasks")
+
+    db = DatabaseManager(args.db)
+    id_map = {}
+    for table, path in (('projects', args.projects), ('tasks', args.tasks)):
+        if not path:
+            continue
+
+        def report(imported, rejected):
+            print(f"\r{table}: {imported} импортировано, {rejected} отклонено", end='', file=sys.stderr)
+
+        result = import_file(db, table, path, args.chunk_size, args.workers, progress=report, id_map=id_map)
+        print(file=sys.stderr)
+        if result.report_path:
+            print(f"Отчёт об отклонённых строках: {result.report_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
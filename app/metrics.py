@@ -0,0 +1,178 @@
+import functools
+import threading
+import types
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional
+
+from app.database import DatabaseManager
+
+
+def _rows(result) -> Optional[int]:
+    """Число строк в результате операции (для списков, множеств и словарей)"""
+    if isinstance(result, (list, tuple, set, dict)):
+        return len(result)
+    return None
+
+
+class OperationStats:
+    """Счётчики одной операции; задержки хранятся в скользящем окне"""
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.rows = 0
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds: float, rows: Optional[int], failed: bool):
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+        if rows:
+            self.rows += rows
+        if failed:
+            self.errors += 1
+
+    def percentile(self, sorted_samples: List[float], q: float) -> float:
+        if not sorted_samples:
+            return 0.0
+        index = min(len(sorted_samples) - 1, int(round(q * (len(sorted_samples) - 1))))
+        return sorted_samples[index]
+
+    def summary(self) -> Dict[str, float]:
+        samples = sorted(self.samples)
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total': self.total,
+            'rows': self.rows,
+            'p50': self.percentile(samples, 0.50),
+            'p95': self.percentile(samples, 0.95),
+            'p99': self.percentile(samples, 0.99),
+        }
+
+
+class Metrics:
+    """Реестр замеров времени операций.
+
+    Методы зарегистрированных классов оборачиваются таймерами только при
+    enable(); disable() возвращает исходные функции, поэтому в выключенном
+    состоянии инструментирование ничего не стоит.
+    """
+
+    def __init__(self, window: int = 2048):
+        self.window = window
+        self.enabled = False
+        self._stats: Dict[str, OperationStats] = {}
+        self._targets = []
+        self._originals = []
+        self._lock = threading.Lock()
+
+    def register(self, cls: type, names: Optional[Iterable[str]] = None) -> None:
+        """Регистрация методов класса (по умолчанию - всех публичных)"""
+        if names is None:
+            names = [name for name, value in vars(cls).items()
+                     if not name.startswith('_') and isinstance(value, types.FunctionType)]
+        names = list(names)
+        self._targets.append((cls, names))
+        if self.enabled:
+            self._patch(cls, names)
+
+    def enable(self) -> None:
+        if self.enabled:
+            return
+        self.enabled = True
+        for cls, names in self._targets:
+            self._patch(cls, names)
+
+    def disable(self) -> None:
+        if not self.enabled:
+            return
+        self.enabled = False
+        for cls, name, original in reversed(self._originals):
+            setattr(cls, name, original)
+        self._originals.clear()
+
+    def record(self, name: str, seconds: float, rows: Optional[int] = None, failed: bool = False) -> None:
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = OperationStats(self.window)
+            stats.add(seconds, rows, failed)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Замер произвольного блока кода (пишется только при включённых метриках)"""
+        if not self.enabled:
+            yield
+            return
+        start = perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self.record(name, perf_counter() - start, failed=failed)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Сводка по операциям: count, errors, total, rows, p50, p95, p99 (секунды)"""
+        with self._lock:
+            return {name: stats.summary() for name, stats in sorted(self._stats.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def _patch(self, cls: type, names: List[str]) -> None:
+        for name in names:
+            original = vars(cls)[name]
+            self._originals.append((cls, name, original))
+            setattr(cls, name, self._wrap(f"{cls.__name__}.{name}", original))
+
+    def _wrap(self, name: str, func):
+        record = self.record
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                record(name, perf_counter() - start, failed=True)
+                raise
+            if isinstance(result, types.GeneratorType):
+                return self._timed_generator(name, result, perf_counter() - start)
+            record(name, perf_counter() - start, _rows(result))
+            return result
+
+        return wrapper
+
+    def _timed_generator(self, name: str, generator, elapsed: float):
+        """Для потоковых операций время и строки считаются до исчерпания генератора"""
+        rows = 0
+        failed = True
+        try:
+            while True:
+                start = perf_counter()
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    elapsed += perf_counter() - start
+                    failed = False
+                    return
+                elapsed += perf_counter() - start
+                rows += len(item) if isinstance(item, list) else 1
+                yield item
+        except GeneratorExit:
+            # Потребитель прекратил чтение досрочно - это не ошибка
+            failed = False
+            generator.close()
+            raise
+        finally:
+            self.record(name, elapsed, rows, failed)
+
+
+metrics = Metrics()
+metrics.register(DatabaseManager)
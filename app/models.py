@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from dataclasses import dataclass
 from enum import  Enum
-from typing import Optional
+from typing import List, Optional, Union
 
 class ProjectStatus(Enum):
     """Перечисление статусов проекта"""
@@ -11,6 +11,15 @@ class ProjectStatus(Enum):
     COMPLETED = "Завершён"
     ON_HOLD = "Ожидание"
 
+    @property
+    def code(self) -> int:
+        """Код для хранения в БД"""
+        return PROJECT_STATUS_CODES[self]
+
+    @classmethod
+    def from_code(cls, code: int) -> "ProjectStatus":
+        return _PROJECT_STATUS_BY_CODE[code]
+
 class TaskPriority(Enum):
     """Перечисление приоритетов задачи"""
     LOW = "Низкий"
@@ -18,6 +27,50 @@ class TaskPriority(Enum):
     HIGH = "Высокий"
     CRITICAL = "Срочный"
 
+    @property
+    def code(self) -> int:
+        """Код для хранения в БД; чем важнее приоритет, тем больше код"""
+        return TASK_PRIORITY_CODES[self]
+
+    @classmethod
+    def from_code(cls, code: int) -> "TaskPriority":
+        return _TASK_PRIORITY_BY_CODE[code]
+
+
+# Коды перечислений в БД. Коды не меняются и не переиспользуются:
+# новый член перечисления получает новый код, порядок объявления не важен
+PROJECT_STATUS_CODES = {
+    ProjectStatus.PLANNING: 1,
+    ProjectStatus.IN_PROGRESS: 2,
+    ProjectStatus.TESTING: 3,
+    ProjectStatus.COMPLETED: 4,
+    ProjectStatus.ON_HOLD: 5,
+}
+TASK_PRIORITY_CODES = {
+    TaskPriority.LOW: 1,
+    TaskPriority.MEDIUM: 2,
+    TaskPriority.HIGH: 3,
+    TaskPriority.CRITICAL: 4,
+}
+_PROJECT_STATUS_BY_CODE = {code: status for status, code in PROJECT_STATUS_CODES.items()}
+_TASK_PRIORITY_BY_CODE = {code: priority for priority, code in TASK_PRIORITY_CODES.items()}
+
+# Даты хранятся в БД номером дня от 1970-01-01 (как datetime64[D] в NumPy)
+EPOCH = date(1970, 1, 1)
+_EPOCH_DATETIME = datetime(1970, 1, 1)
+
+
+def to_day_number(value: Union[date, datetime]) -> int:
+    """Перевод даты в номер дня от 1970-01-01"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return (value - EPOCH).days
+
+
+def from_day_number(number: int) -> datetime:
+    """Номер дня от 1970-01-01 -> datetime (полночь)"""
+    return _EPOCH_DATETIME + timedelta(days=number)
+
 
 @dataclass
 class Project:
@@ -30,6 +83,7 @@ class Project:
     status: ProjectStatus
     budget: float
     team_size: int
+    version: int = 1  # Растёт при каждом изменении (DatabaseManager.update_project)
 
     def to_dict(self):
         return {
@@ -40,7 +94,8 @@ class Project:
             'end_date': self.end_date.strftime('%Y-%m-%d') if self.end_date else None,
             'status': self.status.value,
             'budget': self.budget,
-            'team_size': self.team_size
+            'team_size': self.team_size,
+            'version': self.version
         }
 
 
@@ -55,6 +110,8 @@ class Task:
     priority: TaskPriority
     deadline: datetime
     status: ProjectStatus
+    duration: int = 1  # Длительность в днях
+    version: int = 1
 
     def to_dict(self):
         return {
@@ -65,5 +122,29 @@ class Task:
             'assignee': self.assignee,
             'priority': self.priority.value,
             'deadline': self.deadline.strftime('%Y-%m-%d'),
-            'status': self.status.value
+            'status': self.status.value,
+            'duration': self.duration,
+            'version': self.version
+        }
+
+
+@dataclass
+class ChangeSet:
+    """Изменения после ревизии: текущие версии изменённых строк и id удалённых"""
+    revision: int
+    projects: List[Project]
+    tasks: List[Task]
+    deleted_projects: List[int]
+    deleted_tasks: List[int]
+
+    def __bool__(self):
+        return bool(self.projects or self.tasks or self.deleted_projects or self.deleted_tasks)
+
+    def to_dict(self):
+        return {
+            'revision': self.revision,
+            'projects': [project.to_dict() for project in self.projects],
+            'tasks': [task.to_dict() for task in self.tasks],
+            'deleted_projects': self.deleted_projects,
+            'deleted_tasks': self.deleted_tasks
         }
\ No newline at end of file
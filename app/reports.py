@@ -0,0 +1,182 @@
+"""HTML-отчёты о состоянии проектов с графиками matplotlib.
+
+Отрисовка графиков занимает процессор, поэтому проекты раздаются пулу
+процессов: каждый процесс открывает БД только для чтения своим соединением,
+сам читает проект с задачами, рисует графики и пишет готовый файл. В
+основной процесс возвращается лишь путь к отчёту.
+
+    python -m app.reports --db projects.db --output reports --workers 4
+"""
+import argparse
+import base64
+import html
+import io
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from app.database import DatabaseManager
+from app.models import Project, Task, ProjectStatus, TaskPriority
+
+ProgressCallback = Callable[[int, int], None]
+
+PRIORITY_COLORS = ['#8BC34A', '#FFC107', '#FF9800', '#F44336']
+STATUS_COLORS = ['#90A4AE', '#42A5F5', '#AB47BC', '#66BB6A', '#FFA726']
+
+_worker_state = {}
+
+
+def _init_worker(db_path: str) -> None:
+    _worker_state['db'] = DatabaseManager(db_path, persistent=True, read_only=True)
+
+
+def _png(figure) -> str:
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', dpi=80)
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def render_charts(tasks: List[Task], today: datetime) -> List[str]:
+    """Графики приоритетов, статусов и сроков задач (PNG в base64)"""
+    # Без pyplot: Figure рисуется через Agg и не требует GUI в рабочем процессе
+    from matplotlib.figure import Figure
+
+    charts = []
+    figure = Figure(figsize=(5, 3))
+    ax = figure.add_subplot(111)
+    priorities = list(TaskPriority)
+    ax.bar([p.value for p in priorities], [sum(t.priority == p for t in tasks) for p in priorities],
+           color=PRIORITY_COLORS)
+    ax.set_title('Приоритеты задач')
+    figure.tight_layout()
+    charts.append(_png(figure))
+
+    figure = Figure(figsize=(5, 3))
+    ax = figure.add_subplot(111)
+    statuses = list(ProjectStatus)
+    ax.barh([s.value for s in statuses], [sum(t.status == s for t in tasks) for s in statuses], color=STATUS_COLORS)
+    ax.set_title('Статусы задач')
+    figure.tight_layout()
+    charts.append(_png(figure))
+
+    # Открытые задачи по месяцу срока; просроченные - красным
+    figure = Figure(figsize=(7, 3))
+    ax = figure.add_subplot(111)
+    months = {}
+    for task in tasks:
+        if task.status != ProjectStatus.COMPLETED:
+            month = task.deadline.strftime('%Y-%m')
+            on_time, overdue = months.get(month, (0, 0))
+            months[month] = (on_time, overdue + 1) if task.deadline < today else (on_time + 1, overdue)
+    labels = sorted(months)
+    ax.bar(labels, [months[m][0] for m in labels], color='#42A5F5', label='В срок')
+    ax.bar(labels, [months[m][1] for m in labels], bottom=[months[m][0] for m in labels], color='#F44336',
+           label='Просрочено')
+    ax.set_title('Открытые задачи по сроку')
+    if labels:
+        ax.legend(fontsize=8)
+    ax.tick_params(axis='x', labelrotation=45, labelsize=7)
+    figure.tight_layout()
+    charts.append(_png(figure))
+    return charts
+
+
+def render_report(project: Project, tasks: List[Task], today: datetime) -> str:
+    """HTML-страница отчёта по проекту"""
+    e = html.escape
+    end_date = project.end_date.strftime('%Y-%m-%d') if project.end_date else '-'
+    open_tasks = [t for t in tasks if t.status != ProjectStatus.COMPLETED]
+    late = {t.id for t in open_tasks if t.deadline < today}
+    rows = ''.join(
+        f"<tr class=\"{'overdue' if t.id in late else ''}\">"
+        f"<td>{t.id}</td><td>{e(t.title)}</td><td>{e(t.assignee)}</td><td>{e(t.priority.value)}</td>"
+        f"<td>{t.deadline:%Y-%m-%d}</td><td>{e(t.status.value)}</td></tr>"
+        for t in sorted(tasks, key=lambda t: (t.deadline, t.id))
+    )
+    charts = ''.join(f'<img src="data:image/png;base64,{chart}">' for chart in render_charts(tasks, today))
+    return f"""<!DOCTYPE html>
+<html lang="ru"><head><meta charset="utf-8"><title>{e(project.name)}</title>
+<style>body{{font-family:sans-serif;margin:2em}} table{{border-collapse:collapse}}
+td,th{{border:1px solid #ccc;padding:2px 6px}} .overdue{{color:#c62828}}</style></head>
+<body><h1>{e(project.name)}</h1><p>{e(project.description)}</p>
+<p>Статус: {e(project.status.value)} | {project.start_date:%Y-%m-%d} - {end_date} |
+Бюджет: {project.budget:,.2f} | Команда: {project.team_size}</p>
+<p>Задач: {len(tasks)}, открытых: {len(open_tasks)}, просроченных: {len(late)}.
+Отчёт на {today:%Y-%m-%d}.</p>
+<div>{charts}</div>
+<table><tr><th>ID</th><th>Задача</th><th>Исполнитель</th><th>Приоритет</th><th>Срок</th><th>Статус</th></tr>
+{rows}</table></body></html>
+"""
+
+
+def _project_report(project_id: int, output_dir: str, today: datetime, db: Optional[DatabaseManager] = None):
+    """Отчёт по одному проекту: (id, название, путь) или None, если проекта уже нет"""
+    db = db or _worker_state['db']
+    project = db.get_project(project_id)
+    if project is None:
+        return None
+    path = os.path.join(output_dir, f"project-{project_id}.html")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(render_report(project, db.get_tasks_by_project(project_id), today))
+    return project_id, project.name, path
+
+
+def generate_reports(db: DatabaseManager, output_dir: str, project_ids: Optional[List[int]] = None,
+                     workers: Optional[int] = None, progress: Optional[ProgressCallback] = None) -> List[str]:
+    """Отчёты по проектам (по умолчанию - по всем) и index.html со ссылками; возвращает пути отчётов.
+
+    workers=0 - в текущем процессе (так же и для БД в памяти, недоступной другим процессам).
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if db.in_memory:
+        workers = 0
+    os.makedirs(output_dir, exist_ok=True)
+    if project_ids is None:
+        project_ids = sorted(db.get_project_ids())
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    results = []
+    if workers <= 0:
+        for done, project_id in enumerate(project_ids, 1):
+            results.append(_project_report(project_id, output_dir, today, db))
+            if progress:
+                progress(done, len(project_ids))
+    else:
+        # spawn: fork процесса с Qt и фоновыми потоками небезопасен
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(db.db_path,)) as executor:
+            futures = [executor.submit(_project_report, project_id, output_dir, today) for project_id in project_ids]
+            for done, _ in enumerate(as_completed(futures), 1):
+                if progress:
+                    progress(done, len(project_ids))
+            results = [future.result() for future in futures]
+
+    results = [result for result in results if result is not None]
+    links = ''.join(f'<li><a href="{os.path.basename(path)}">{html.escape(name)}</a></li>'
+                    for _, name, path in results)
+    with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(f'<!DOCTYPE html>\n<html lang="ru"><head><meta charset="utf-8"><title>Отчёты по проектам</title>'
+                f'</head><body><h1>Отчёты по проектам на {today:%Y-%m-%d}</h1><ul>{links}</ul></body></html>\n')
+    return [path for _, _, path in results]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTML-отчёты по проектам")
+    parser.add_argument('--db', default='projects.db', help="Путь к базе данных")
+    parser.add_argument('--output', default='reports', help="Каталог отчётов")
+    parser.add_argument('--workers', type=int, default=None, help="Число процессов (0 - без пула)")
+    parser.add_argument('project_ids', type=int, nargs='*', help="Проекты (по умолчанию - все)")
+    args = parser.parse_args(argv)
+
+    def report(done, total):
+        print(f"\rОтчётов: {done}/{total}", end='', file=sys.stderr)
+
+    paths = generate_reports(DatabaseManager(args.db), args.output, args.project_ids or None, args.workers, report)
+    print(f"\nГотово: {len(paths)}, оглавление: {os.path.join(args.output, 'index.html')}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Расписание проекта по зависимостям задач (метод критического пути).
+
+Раннее начало задачи - максимум ранних окончаний её предшественников,
+раннее окончание - начало плюс длительность; время считается в днях от
+начала проекта. Задачи хранятся в топологическом порядке (rank), поэтому
+при изменении одной задачи пересчитываются только её потомки, причём
+распространение останавливается там, где окончание не изменилось.
+Новая зависимость, нарушающая порядок, переставляет лишь затронутый
+участок (алгоритм Pearce-Kelly), а не сортирует весь граф заново.
+
+    schedule = ProjectSchedule.from_database(db, project_id)
+    schedule.set_duration(task_id, 5)
+    schedule.critical_path()
+"""
+import heapq
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Set, Tuple
+
+from app.database import DatabaseManager, DependencyCycleError
+
+
+class ProjectSchedule:
+    def __init__(self, durations: Dict[int, int], dependencies: Iterable[Tuple[int, int]] = ()):
+        """durations: {task_id: дней}; dependencies: пары (task_id, depends_on)"""
+        self.duration: Dict[int, int] = dict(durations)
+        self.preds: Dict[int, Set[int]] = {task_id: set() for task_id in self.duration}
+        self.succs: Dict[int, Set[int]] = {task_id: set() for task_id in self.duration}
+        for task_id, depends_on in dependencies:
+            self.preds[task_id].add(depends_on)
+            self.succs[depends_on].add(task_id)
+        self.rank: Dict[int, int] = {}
+        self.start: Dict[int, int] = {}
+        self.finish: Dict[int, int] = {}
+        # Сколько задач пересчитано последним изменением
+        self.recomputed = 0
+
+        order = self._topological_order()
+        self.rank = {task_id: index for index, task_id in enumerate(order)}
+        self._next_rank = len(order)
+        for task_id in order:
+            self._compute(task_id)
+        self.recomputed = len(order)
+
+    @classmethod
+    def from_database(cls, db: DatabaseManager, project_id: int) -> 'ProjectSchedule':
+        return cls(db.get_task_durations(project_id), db.get_dependencies(project_id))
+
+    def _topological_order(self) -> List[int]:
+        """Сортировка Кана; DependencyCycleError, если граф содержит цикл"""
+        indegree = {task_id: len(preds) for task_id, preds in self.preds.items()}
+        ready = deque(sorted(task_id for task_id, degree in indegree.items() if degree == 0))
+        order = []
+        while ready:
+            task_id = ready.popleft()
+            order.append(task_id)
+            for successor in self.succs[task_id]:
+                indegree[successor] -= 1
+                if indegree[successor] == 0:
+                    ready.append(successor)
+        if len(order) != len(self.duration):
+            raise DependencyCycleError("Зависимости задач содержат цикл")
+        return order
+
+    def _compute(self, task_id: int) -> bool:
+        """Пересчёт сроков одной задачи по предшественникам; True, если окончание изменилось"""
+        start = max((self.finish[pred] for pred in self.preds[task_id]), default=0)
+        finish = start + self.duration[task_id]
+        changed = self.finish.get(task_id) != finish
+        self.start[task_id] = start
+        self.finish[task_id] = finish
+        return changed
+
+    def _propagate(self, seeds: Iterable[int]) -> None:
+        """Пересчёт задач seeds и тех потомков, чьи предшественники сдвинулись"""
+        heap = [(self.rank[task_id], task_id) for task_id in set(seeds)]
+        heapq.heapify(heap)
+        queued = {task_id for _, task_id in heap}
+        self.recomputed = 0
+        while heap:
+            _, task_id = heapq.heappop(heap)
+            queued.discard(task_id)
+            self.recomputed += 1
+            if self._compute(task_id):
+                for successor in self.succs[task_id]:
+                    if successor not in queued:
+                        queued.add(successor)
+                        heapq.heappush(heap, (self.rank[successor], successor))
+
+    # Изменения
+
+    def set_duration(self, task_id: int, duration: int) -> None:
+        self.duration[task_id] = duration
+        self._propagate([task_id])
+
+    def add_task(self, task_id: int, duration: int = 1, depends_on: Iterable[int] = ()) -> None:
+        self.duration[task_id] = duration
+        self.preds[task_id] = set()
+        self.succs[task_id] = set()
+        self.rank[task_id] = self._next_rank
+        self._next_rank += 1
+        self._compute(task_id)
+        for predecessor in depends_on:
+            self.add_dependency(task_id, predecessor)
+
+    def remove_task(self, task_id: int) -> None:
+        successors = self.succs.pop(task_id)
+        for predecessor in self.preds.pop(task_id):
+            self.succs[predecessor].discard(task_id)
+        for successor in successors:
+            self.preds[successor].discard(task_id)
+        for mapping in (self.duration, self.rank, self.start, self.finish):
+            del mapping[task_id]
+        self._propagate(successors)
+
+    def add_dependency(self, task_id: int, depends_on: int) -> None:
+        """task_id начинается после depends_on"""
+        if depends_on in self.preds[task_id]:
+            return
+        if task_id == depends_on:
+            raise DependencyCycleError(f"Задача {task_id} не может зависеть от самой себя")
+        if self.rank[depends_on] > self.rank[task_id]:
+            self._reorder(depends_on, task_id)
+        self.preds[task_id].add(depends_on)
+        self.succs[depends_on].add(task_id)
+        self._propagate([task_id])
+
+    def remove_dependency(self, task_id: int, depends_on: int) -> None:
+        self.preds[task_id].discard(depends_on)
+        self.succs[depends_on].discard(task_id)
+        self._propagate([task_id])
+
+    def _reorder(self, head: int, tail: int) -> None:
+        """Восстановление топологического порядка перед добавлением ребра head -> tail,
+        если rank[head] > rank[tail]: переставляются только задачи между ними"""
+        lower, upper = self.rank[tail], self.rank[head]
+        forward = self._reachable(tail, self.succs, lambda rank: rank <= upper)
+        if head in forward:
+            raise DependencyCycleError(f"Задача {head} уже зависит от {tail}")
+        backward = self._reachable(head, self.preds, lambda rank: rank >= lower)
+        affected = sorted(backward, key=self.rank.get) + sorted(forward, key=self.rank.get)
+        for task_id, rank in zip(affected, sorted(self.rank[task_id] for task_id in affected)):
+            self.rank[task_id] = rank
+
+    def _reachable(self, source: int, edges: Dict[int, Set[int]], within) -> Set[int]:
+        seen = {source}
+        stack = [source]
+        while stack:
+            for neighbour in edges[stack.pop()]:
+                if neighbour not in seen and within(self.rank[neighbour]):
+                    seen.add(neighbour)
+                    stack.append(neighbour)
+        return seen
+
+    # Результаты
+
+    def makespan(self) -> int:
+        """Длительность проекта в днях"""
+        return max(self.finish.values(), default=0)
+
+    def critical_path(self) -> List[int]:
+        """Цепочка задач, задающая длительность проекта (от первой к последней)"""
+        if not self.finish:
+            return []
+        task_id = max(self.finish, key=lambda item: (self.finish[item], -self.rank[item]))
+        path = [task_id]
+        while self.preds[task_id]:
+            start = self.start[task_id]
+            task_id = next(pred for pred in sorted(self.preds[task_id], key=self.rank.get)
+                           if self.finish[pred] == start)
+            path.append(task_id)
+        path.reverse()
+        return path
+
+    def slack(self) -> Dict[int, int]:
+        """Резерв времени каждой задачи (0 - задача критическая); полный обратный проход"""
+        end = self.makespan()
+        latest_finish = {}
+        for task_id in sorted(self.rank, key=self.rank.get, reverse=True):
+            latest_finish[task_id] = min(
+                (latest_finish[successor] - self.duration[successor] for successor in self.succs[task_id]),
+                default=end)
+        return {task_id: latest_finish[task_id] - self.finish[task_id] for task_id in self.finish}
+
+    def dates(self, project_start: datetime) -> Dict[int, Tuple[datetime, datetime]]:
+        """Ранние даты начала и окончания задач при старте проекта project_start"""
+        return {task_id: (project_start + timedelta(days=self.start[task_id]),
+                          project_start + timedelta(days=self.finish[task_id]))
+                for task_id in self.start}
@@ -0,0 +1,271 @@
+"""Локальный JSON API поверх DatabaseManager на asyncio.
+
+    python -m app.server --db projects.db --port 8080
+
+Чтения выполняются в пуле потоков, у каждого потока своё соединение.
+Записи идут через app.writer.WriteQueue - единственный поток-писатель
+с групповым commit.
+
+Маршруты:
+    GET    /projects?limit=&offset=        список проектов и общее число
+    GET    /projects/count
+    GET    /projects/{id}
+    POST   /projects                       тело - поля Project (как в импорте)
+    DELETE /projects/{id}
+    GET    /projects/{id}/tasks?limit=&offset=&sort=created|priority|deadline
+    GET    /tasks/count?project_id=
+    GET    /tasks/search?q=&project_id=
+    POST   /tasks                          тело - поля Task (как в импорте)
+    DELETE /tasks/{id}
+    GET    /changes?since=                 изменения после ревизии (DatabaseManager.get_changes_since)
+"""
+import argparse
+import asyncio
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from app.database import DatabaseManager, DatabaseBusyError
+from app.importer import parse_project, parse_task
+from app.writer import WriteQueue
+
+MAX_PAGE = 1000
+
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _int_param(query: dict, name: str, default: Optional[int] = None) -> Optional[int]:
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        return int(values[0])
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Параметр {name} должен быть целым числом")
+
+
+def _page(query: dict) -> tuple:
+    limit = min(_int_param(query, 'limit', 100), MAX_PAGE)
+    offset = _int_param(query, 'offset', 0)
+    if limit < 0 or offset < 0:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "limit и offset не могут быть отрицательными")
+    return limit, offset
+
+
+class ApiServer:
+    def __init__(self, db_path: str = "projects.db", host: str = "127.0.0.1", port: int = 8080,
+                 readers: int = 4, batch_size: int = 256):
+        self.db = DatabaseManager(db_path, persistent=True)
+        self.db.enable_wal()
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.read_pool = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="api-reader")
+        self.writer: Optional[WriteQueue] = None
+        self.server = None
+        self.connections = set()
+        self.routes = [
+            ('GET', re.compile(r'/projects'), self.list_projects),
+            ('GET', re.compile(r'/projects/count'), self.count_projects),
+            ('GET', re.compile(r'/projects/(\d+)'), self.get_project),
+            ('POST', re.compile(r'/projects'), self.create_project),
+            ('DELETE', re.compile(r'/projects/(\d+)'), self.delete_project),
+            ('GET', re.compile(r'/projects/(\d+)/tasks'), self.list_tasks),
+            ('GET', re.compile(r'/tasks/count'), self.count_tasks),
+            ('GET', re.compile(r'/tasks/search'), self.search_tasks),
+            ('POST', re.compile(r'/tasks'), self.create_task),
+            ('DELETE', re.compile(r'/tasks/(\d+)'), self.delete_task),
+            ('GET', re.compile(r'/changes'), self.list_changes),
+        ]
+
+    async def start(self):
+        self.writer = WriteQueue(self.db, self.batch_size)
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+        for task in list(self.connections):
+            task.cancel()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        if self.server:
+            await self.server.wait_closed()
+        if self.writer:
+            self.writer.close()
+        self.read_pool.shutdown()
+        self.db.close()
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"API: http://{self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+    # Доступ к данным
+
+    async def read(self, method: str, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.read_pool, lambda: getattr(self.db, method)(*args))
+
+    async def write(self, method: str, *args):
+        return await asyncio.wrap_future(self.writer.submit(method, *args))
+
+    # Обработчики
+
+    async def list_projects(self, query, body):
+        limit, offset = _page(query)
+        projects = await self.read('get_all_projects', limit, offset)
+        total = await self.read('count_projects')
+        return HTTPStatus.OK, {'total': total, 'items': [project.to_dict() for project in projects]}
+
+    async def count_projects(self, query, body):
+        return HTTPStatus.OK, {'count': await self.read('count_projects')}
+
+    async def get_project(self, query, body, project_id):
+        project = await self.read('get_project', int(project_id))
+        if project is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Проект не найден: {project_id}")
+        return HTTPStatus.OK, project.to_dict()
+
+    async def create_project(self, query, body):
+        project = parse_project(self._json(body))
+        project.id = await self.write('add_project', project)
+        return HTTPStatus.CREATED, project.to_dict()
+
+    async def delete_project(self, query, body, project_id):
+        if not await self.write('del_project', int(project_id)):
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Проект не найден: {project_id}")
+        return HTTPStatus.OK, {'deleted': int(project_id)}
+
+    async def list_tasks(self, query, body, project_id):
+        limit, offset = _page(query)
+        sort = (query.get('sort') or ['created'])[0]
+        tasks = await self.read('get_tasks_by_project', int(project_id), limit, offset, sort)
+        total = await self.read('count_tasks', int(project_id))
+        return HTTPStatus.OK, {'total': total, 'items': [task.to_dict() for task in tasks]}
+
+    async def count_tasks(self, query, body):
+        return HTTPStatus.OK, {'count': await self.read('count_tasks', _int_param(query, 'project_id'))}
+
+    async def list_changes(self, query, body):
+        changes = await self.read('get_changes_since', _int_param(query, 'since', 0))
+        return HTTPStatus.OK, changes.to_dict()
+
+    async def search_tasks(self, query, body):
+        text = (query.get('q') or [''])[0]
+        if not text:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Не задан параметр q")
+        tasks = await self.read('search_tasks', text, _int_param(query, 'project_id'))
+        return HTTPStatus.OK, {'total': len(tasks), 'items': [task.to_dict() for task in tasks[:MAX_PAGE]]}
+
+    async def create_task(self, query, body):
+        task = parse_task(self._json(body))
+        if await self.read('get_project', task.project_id) is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Проект не найден: {task.project_id}")
+        task.id = await self.write('add_task', task)
+        return HTTPStatus.CREATED, task.to_dict()
+
+    async def delete_task(self, query, body, task_id):
+        if not await self.write('del_task', int(task_id)):
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Задача не найдена: {task_id}")
+        return HTTPStatus.OK, {'deleted': int(task_id)}
+
+    @staticmethod
+    def _json(body: bytes) -> dict:
+        try:
+            data = json.loads(body or b'{}')
+        except json.JSONDecodeError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Некорректный JSON")
+        if not isinstance(data, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Ожидается JSON-объект")
+        return data
+
+    # HTTP
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> tuple:
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        query = parse_qs(url.query)
+        allowed = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.fullmatch(path)
+            if not match:
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            try:
+                return await handler(query, body, *match.groups())
+            except HttpError as e:
+                return e.status, {'error': str(e)}
+            except DatabaseBusyError as e:
+                return HTTPStatus.SERVICE_UNAVAILABLE, {'error': str(e)}
+            except ValueError as e:
+                return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+            except Exception as e:
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+        if allowed:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f"Метод {method} не поддерживается"}
+        return HTTPStatus.NOT_FOUND, {'error': f"Неизвестный путь: {path}"}
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.dispatch(method.upper(), target, body)
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, asyncio.CancelledError):
+            pass
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON API для проектов и задач")
+    parser.add_argument('--db', default='projects.db', help="Путь к базе данных")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--readers', type=int, default=4, help="Размер пула соединений для чтения")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(ApiServer(args.db, args.host, args.port, args.readers).serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
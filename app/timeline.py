@@ -0,0 +1,91 @@
+"""Данные диаграммы Ганта: полосы проектов и задач в колоночном виде.
+
+Каждая полоса занимает свою строку: проект, под ним его задачи по сроку.
+Полоса проекта - от начала до окончания (незавершённого - до сегодня),
+задачи - последние duration дней до срока включительно. Даты - номера
+дней, как в БД; полоса - полуинтервал [starts, ends).
+
+visible() отбирает только полосы, попадающие в окно дат и строк: окно
+строк - срез массивов, даты отсекаются маской NumPy, поэтому отрисовка
+не зависит от общего числа полос.
+
+    timeline = Timeline.from_database(db)
+    index = timeline.visible(first_day, last_day, first_row, last_row)
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.database import DatabaseManager
+from app.models import to_day_number
+
+PROJECT = 0
+TASK = 1
+
+
+class Timeline:
+    def __init__(self, ids: np.ndarray, kinds: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                 codes: np.ndarray, labels: List[str]):
+        """codes - код статуса для проектов и код приоритета для задач"""
+        self.ids = ids
+        self.kinds = kinds
+        self.starts = starts
+        self.ends = ends
+        self.codes = codes
+        self.labels = labels
+
+    @classmethod
+    def from_database(cls, db: DatabaseManager, today: Optional[datetime] = None) -> 'Timeline':
+        """Все живые проекты и задачи; читается порциями одним проходом по каждой таблице"""
+        today = to_day_number(today or datetime.now())
+        projects = [row for chunk in db.iter_project_rows() for row in chunk]
+        projects.sort(key=lambda row: (row[3], row[0]))
+        tasks = defaultdict(list)
+        for chunk in db.iter_task_rows():
+            for row in chunk:
+                tasks[row[1]].append(row)
+
+        ids, kinds, starts, ends, codes, labels = [], [], [], [], [], []
+        for project_id, name, _, start, end, status, *_ in projects:
+            ids.append(project_id)
+            kinds.append(PROJECT)
+            starts.append(start)
+            ends.append((end if end is not None else max(today, start)) + 1)
+            codes.append(status)
+            labels.append(name)
+            for task in sorted(tasks.get(project_id, ()), key=lambda row: (row[6], row[0])):
+                ids.append(task[0])
+                kinds.append(TASK)
+                starts.append(task[6] - task[9] + 1)
+                ends.append(task[6] + 1)
+                codes.append(task[5])
+                labels.append(task[2])
+        return cls(
+            ids=np.array(ids, dtype=np.int64),
+            kinds=np.array(kinds, dtype=np.int8),
+            starts=np.array(starts, dtype=np.int32),
+            ends=np.array(ends, dtype=np.int32),
+            codes=np.array(codes, dtype=np.int8),
+            labels=labels
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def span(self) -> Tuple[int, int]:
+        """Первый и последний (не включительно) день всех полос"""
+        if not len(self):
+            today = to_day_number(datetime.now())
+            return today, today + 1
+        return int(self.starts.min()), int(self.ends.max())
+
+    def visible(self, first_day: float, last_day: float, first_row: float, last_row: float) -> np.ndarray:
+        """Индексы (они же номера строк) полос, пересекающих окно дат и строк"""
+        first = max(int(np.floor(first_row)), 0)
+        last = min(int(np.ceil(last_row)) + 1, len(self))
+        if first >= last:
+            return np.empty(0, dtype=np.int64)
+        mask = (self.starts[first:last] < last_day) & (self.ends[first:last] > first_day)
+        return np.flatnonzero(mask) + first
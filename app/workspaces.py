@@ -0,0 +1,213 @@
+"""Рабочие пространства: отдельные файлы БД команд и запросы сразу по всем.
+
+Каждое пространство - обычная БД DatabaseManager. Сводные запросы и поиск
+по всем пространствам выполняются одним оператором SQL: к соединению с
+пустой БД в памяти подключаются (ATTACH, только для чтения) файлы
+пространств, а выборки по каждому объединяются через UNION ALL. SQLite
+подключает не больше MAX_ATTACHED БД, поэтому пространств больше - один
+оператор на каждую группу, результаты групп сливаются.
+
+    workspaces = Workspaces.load('workspaces.json')
+    workspaces.add('backend.db')
+    for name, project in workspaces.search_projects('api'):
+        print(name, project.name)
+"""
+import json
+import os
+import sqlite3
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.database import DatabaseManager, PROJECT_COLUMNS, _database_error, _lower
+from app.models import Project, Task, ProjectStatus, to_day_number
+
+WORKSPACES_FILE = 'workspaces.json'
+# Предел числа подключённых БД в SQLite по умолчанию (SQLITE_MAX_ATTACHED)
+MAX_ATTACHED = 10
+
+_PROJECT_SELECT = f"SELECT {{index}}, {', '.join(PROJECT_COLUMNS)} FROM {{schema}}.projects WHERE deletion_id IS NULL"
+_TASK_SELECT = '''
+    SELECT {index}, tasks.id, tasks.project_id, tasks.title, tasks.description, COALESCE(assignees.name, ''),
+           tasks.priority, tasks.deadline, tasks.status, tasks.created_at, tasks.duration, tasks.version
+    FROM {schema}.tasks AS tasks LEFT JOIN {schema}.assignees AS assignees ON assignees.id = tasks.assignee_id
+    WHERE tasks.deletion_id IS NULL
+'''
+
+
+def _read_only_uri(uri: str) -> str:
+    if 'mode=' in uri:
+        return uri
+    return uri + ('&' if '?' in uri else '?') + 'mode=ro'
+
+
+class Workspaces:
+    def __init__(self, paths: Optional[Dict[str, str]] = None, current: Optional[str] = None):
+        """paths - {имя пространства: путь к БД} в порядке показа"""
+        self.paths = dict(paths or {})
+        self.current = current if current in self.paths else next(iter(self.paths), None)
+        self._managers = {}
+
+    @classmethod
+    def load(cls, path: str = WORKSPACES_FILE) -> 'Workspaces':
+        """Список пространств из JSON-файла (пустой, если файла нет)"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get('workspaces'), data.get('current'))
+
+    def save(self, path: str = WORKSPACES_FILE) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'current': self.current, 'workspaces': self.paths}, f, ensure_ascii=False, indent=2)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.paths)
+
+    def add(self, db_path: str, name: Optional[str] = None) -> str:
+        """Добавление пространства (имя по умолчанию - имя файла); возвращает имя.
+        Уже добавленный файл не дублируется"""
+        for existing, path in self.paths.items():
+            if path == db_path:
+                return existing
+        base = name or Path(db_path).stem
+        name, n = base, 1
+        while name in self.paths:
+            n += 1
+            name = f"{base} ({n})"
+        self.paths[name] = db_path
+        if self.current is None:
+            self.current = name
+        return name
+
+    def remove(self, name: str) -> None:
+        """Исключение пространства из списка (файл БД остаётся)"""
+        del self.paths[name]
+        manager = self._managers.pop(name, None)
+        if manager is not None:
+            manager.close()
+        if self.current == name:
+            self.current = next(iter(self.paths), None)
+
+    def open(self, name: Optional[str] = None) -> DatabaseManager:
+        """DatabaseManager пространства (по умолчанию - текущего); создаётся один раз"""
+        name = name or self.current
+        if name not in self._managers:
+            self._managers[name] = DatabaseManager(self.paths[name])
+        return self._managers[name]
+
+    def _connect(self, names: List[str]) -> sqlite3.Connection:
+        """Соединение с подключёнными пространствами names как ws0, ws1, ..."""
+        # open() создаёт и мигрирует схему, прежде чем файл подключится только для чтения
+        uris = [_read_only_uri(self.open(name).uri) for name in names]
+        conn = sqlite3.connect(':memory:', uri=True)
+        try:
+            for index, uri in enumerate(uris):
+                conn.execute(f'ATTACH DATABASE ? AS ws{index}', (uri,))
+        except sqlite3.Error:
+            conn.close()
+            raise
+        conn.create_function('py_lower', 1, _lower, deterministic=True)
+        return conn
+
+    def _query(self, build: Callable[[int], str], params: dict) -> List[Tuple[List[str], List[tuple]]]:
+        """Запрос build(число пространств) по группам из не больше MAX_ATTACHED пространств:
+        [(имена группы по номерам ws, строки)] в порядке пространств"""
+        names = self.names
+        results = []
+        for start in range(0, len(names), MAX_ATTACHED):
+            group = names[start:start + MAX_ATTACHED]
+            conn = self._connect(group)
+            try:
+                results.append((group, conn.execute(build(len(group)), params).fetchall()))
+            finally:
+                conn.close()
+        return results
+
+    @staticmethod
+    def _union(template: str, count: int, condition: str = '') -> str:
+        return ' UNION ALL '.join(template.format(index=index, schema=f'ws{index}') + condition
+                                  for index in range(count))
+
+    def summary(self, today: datetime) -> List[tuple]:
+        """По пространствам: (имя, проектов, задач, открытых задач, просроченных, бюджет)"""
+        if not self.paths:
+            return []
+        template = '''
+            SELECT {index},
+                   (SELECT COUNT(*) FROM {schema}.projects WHERE deletion_id IS NULL),
+                   (SELECT COUNT(*) FROM {schema}.tasks WHERE deletion_id IS NULL),
+                   (SELECT COUNT(*) FROM {schema}.tasks WHERE deletion_id IS NULL AND status != :completed),
+                   (SELECT COUNT(*) FROM {schema}.tasks
+                    WHERE deletion_id IS NULL AND status != :completed AND deadline < :today),
+                   (SELECT COALESCE(SUM(budget), 0) FROM {schema}.projects WHERE deletion_id IS NULL)
+        '''
+        try:
+            groups = self._query(lambda count: self._union(template, count),
+                                 {'completed': ProjectStatus.COMPLETED.code, 'today': to_day_number(today)})
+            return [(names[row[0]],) + row[1:] for names, rows in groups for row in rows]
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка сводки по пространствам", e)
+
+    def workload(self, today: datetime) -> List[tuple]:
+        """Нагрузка исполнителей по всем пространствам (исполнители сопоставляются по имени):
+        (имя, открытых задач, просроченных, в скольких пространствах) по убыванию открытых"""
+        if not self.paths:
+            return []
+        template = '''
+            SELECT {index} AS workspace, assignees.name AS name, tasks.deadline < :today AS overdue
+            FROM {schema}.tasks AS tasks JOIN {schema}.assignees AS assignees ON assignees.id = tasks.assignee_id
+            WHERE tasks.deletion_id IS NULL AND tasks.status != :completed
+        '''
+        try:
+            groups = self._query(lambda count: f'''
+                SELECT name, COUNT(*), SUM(overdue), COUNT(DISTINCT workspace)
+                FROM ({self._union(template, count)})
+                GROUP BY name
+                ORDER BY 2 DESC, name
+            ''', {'completed': ProjectStatus.COMPLETED.code, 'today': to_day_number(today)})
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка подсчёта нагрузки по пространствам", e)
+        if len(groups) == 1:
+            return groups[0][1]
+        # Группы не пересекаются по пространствам: итоги исполнителя просто складываются
+        totals = defaultdict(lambda: [0, 0, 0])
+        for _, rows in groups:
+            for name, *counts in rows:
+                totals[name] = [total + count for total, count in zip(totals[name], counts)]
+        return sorted(((name, *counts) for name, counts in totals.items()), key=lambda row: (-row[1], row[0]))
+
+    def search_projects(self, text: str) -> List[Tuple[str, Project]]:
+        """Поиск проектов во всех пространствах: (имя пространства, проект)"""
+        if not self.paths:
+            return []
+        condition = ' AND (instr(py_lower(name), :text) > 0 OR instr(py_lower(description), :text) > 0)'
+        try:
+            groups = self._query(lambda count: self._union(_PROJECT_SELECT, count, condition) +
+                                 ' ORDER BY 1, created_at DESC', {'text': text.lower()})
+            return [(names[row[0]], DatabaseManager._project_from_row(row[1:]))
+                    for names, rows in groups for row in rows]
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка поиска проектов по пространствам", e)
+
+    def search_tasks(self, text: str) -> List[Tuple[str, Task]]:
+        """Поиск задач во всех пространствах: (имя пространства, задача)"""
+        if not self.paths:
+            return []
+        condition = '''
+            AND (instr(py_lower(tasks.title), :text) > 0 OR instr(py_lower(tasks.description), :text) > 0
+                 OR instr(py_lower(assignees.name), :text) > 0)
+        '''
+        try:
+            groups = self._query(lambda count: self._union(_TASK_SELECT, count, condition) + ' ORDER BY 1, deadline',
+                                 {'text': text.lower()})
+            return [(names[row[0]], DatabaseManager._task_from_row(row[1:]))
+                    for names, rows in groups for row in rows]
+        except sqlite3.Error as e:
+            raise _database_error("Ошибка поиска задач по пространствам", e)
+
+    def close(self) -> None:
+        for manager in self._managers.values():
+            manager.close()
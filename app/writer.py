@@ -0,0 +1,111 @@
+"""Единственный поток-писатель с групповым commit.
+
+Все записи ставятся в очередь и выполняются одним потоком: всё, что
+накопилось, пока шла предыдущая транзакция, применяется следующей одной
+транзакцией (DatabaseManager.batch()), каждый вызов - в своей точке
+сохранения: упавший вызов не оставляет записей. Если БД занята другим процессом
+дольше busy_timeout, пакет откатывается и повторяется с экспоненциальной
+паузой; после исчерпания попыток вызывающие получают DatabaseBusyError.
+
+    writer = WriteQueue(db)
+    task_id = writer.call('add_task', task)          # с ожиданием
+    future = writer.submit('del_task', task_id)      # без ожидания
+    writer.close()
+"""
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+
+from app.database import DatabaseManager, DatabaseBusyError, MAX_RETRY_DELAY
+
+_STOP = object()
+
+
+class WriteQueue:
+    def __init__(self, db: DatabaseManager, batch_size: int = 256):
+        self.db = db
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self.batches = 0
+        self.thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, method: str, *args) -> Future:
+        """Поставить вызов метода DatabaseManager в очередь записи"""
+        if not self.thread.is_alive():
+            raise RuntimeError("Очередь записи закрыта")
+        future = Future()
+        self.queue.put((method, args, future))
+        return future
+
+    def call(self, method: str, *args, timeout: Optional[float] = None):
+        """Записать и дождаться результата"""
+        return self.submit(method, *args).result(timeout)
+
+    def close(self) -> None:
+        """Дописать очередь и остановить поток"""
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            batch = [entry for entry in batch if entry[2].set_running_or_notify_cancel()]
+            for (_, _, future), (result, error) in zip(batch, self._apply(batch)):
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+    def _apply(self, batch: List[tuple]) -> List[tuple]:
+        """Пакет одной транзакцией; при занятой БД - повтор всего пакета"""
+        delay = self.db.retry_delay
+        for attempt in range(self.db.retries + 1):
+            try:
+                return self._apply_once(batch)
+            except DatabaseBusyError as e:
+                if attempt == self.db.retries:
+                    return [(None, e)] * len(batch)
+                time.sleep(delay * random.uniform(0.5, 1.5))
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+            except Exception as e:
+                return [(None, e)] * len(batch)
+
+    def _apply_once(self, batch: List[tuple]) -> List[tuple]:
+        results = []
+        with self.db.batch():
+            for method, args, _ in batch:
+                try:
+                    # Ошибка вызова откатывает только его записи, остальные вызовы пакета фиксируются
+                    with self.db.savepoint():
+                        results.append((getattr(self.db, method)(*args), None))
+                except DatabaseBusyError:
+                    raise
+                except Exception as e:
+                    results.append((None, e))
+        self.batches += 1
+        return results
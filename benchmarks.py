@@ -0,0 +1,295 @@
+"""Замеры производительности DatabaseManager с контролем регрессий.
+
+Запуск:
+    python benchmarks.py --sizes 1000 100000             # сравнение с benchmarks.json
+    python benchmarks.py --sizes 1000 100000 --update    # сохранить новую базовую линию
+
+Для каждого размера (число задач) база заполняется один раз и кешируется в
+.benchmarks/, замеры пишущих операций идут на её копии. Код возврата 1, если
+хотя бы одна операция медленнее базовой линии больше чем на --threshold.
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from app.database import DatabaseManager
+from app.models import Project, Task, ProjectStatus, TaskPriority
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+SEED_DIR = ".benchmarks"
+BATCH = 50000
+# Проекты, завершённые раньше, уходят в архив в замере archive_projects
+ARCHIVE_BEFORE = datetime(2025, 1, 1)
+
+
+def make_project(i: int) -> Project:
+    return Project(None, f"Проект {i}", "Проект для замеров", datetime(2024, 1, 1) + timedelta(days=i % 365),
+                   None, list(ProjectStatus)[i % len(ProjectStatus)], 1000.0 * (i % 100 + 1), i % 20 + 1)
+
+
+def make_task(i: int, project_id: int) -> Task:
+    return Task(None, project_id, f"Задача {i}", "Задача для замеров", f"Исполнитель {i % 50}",
+                list(TaskPriority)[i % len(TaskPriority)], datetime(2024, 1, 1) + timedelta(days=i % 730),
+                list(ProjectStatus)[i % len(ProjectStatus)])
+
+
+def seed(db_path: str, tasks: int) -> None:
+    """Заполнение БД: tasks задач, по 10 задач на проект"""
+    db = DatabaseManager(db_path)
+    project_ids = db.add_projects([make_project(i) for i in range(max(1, tasks // 10))])
+    for start in range(0, tasks, BATCH):
+        db.add_tasks([make_task(i, project_ids[i % len(project_ids)]) for i in range(start, min(tasks, start + BATCH))])
+
+
+def schema_fingerprint() -> str:
+    """Хэш схемы новой БД: заполненные копии пересоздаются при её изменении"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, "schema.db")
+        DatabaseManager(path)
+        conn = sqlite3.connect(path)
+        try:
+            schema = conn.execute("SELECT group_concat(sql, ';') FROM "
+                                  "(SELECT sql FROM sqlite_master WHERE sql IS NOT NULL ORDER BY name)").fetchone()[0]
+        finally:
+            conn.close()
+    return hashlib.sha1(schema.encode('utf-8')).hexdigest()[:8]
+
+
+def seeded_path(size: int) -> str:
+    os.makedirs(SEED_DIR, exist_ok=True)
+    path = os.path.join(SEED_DIR, f"seed-{size}-{schema_fingerprint()}.db")
+    if not os.path.exists(path):
+        print(f"Заполнение БД на {size} задач...", file=sys.stderr)
+        seed(path + '.part', size)
+        os.replace(path + '.part', path)
+    return path
+
+
+class Context:
+    """Рабочая копия заполненной БД и данные для операций"""
+
+    def __init__(self, db: DatabaseManager, work_dir: str):
+        self.db = db
+        self.work_dir = work_dir
+        self.project_ids = sorted(db.get_project_ids())
+        self.task_ids = [row[0] for row in next(db.iter_task_rows(chunk_size=1000), [])]
+        self.counter = 0
+        self.revision = db.get_revision()
+        # Цепочки зависимостей внутри проектов из середины списка (del_* берут с концов)
+        middle = len(self.project_ids) // 2
+        self.free_pairs = []
+        for project_id in self.project_ids[middle:middle + 20]:
+            ids = sorted(row[0] for row in db.get_task_rows(project_id))
+            self.free_pairs.extend(zip(ids[1:], ids))
+        self.dependencies = []
+        self.deleted_task_ids = []
+        self.deleted_project_ids = []
+        self.archived_ids = []
+
+    def next_project_id(self) -> int:
+        self.counter += 1
+        return self.project_ids[self.counter % len(self.project_ids)]
+
+    def pop_project_id(self) -> int:
+        self.deleted_project_ids.append(self.project_ids.pop())
+        return self.deleted_project_ids[-1]
+
+    def pop_task_id(self) -> int:
+        self.deleted_task_ids.append(self.task_ids.pop())
+        return self.deleted_task_ids[-1]
+
+    def next_task_id(self) -> int:
+        return self.task_ids[self.counter % len(self.task_ids)]
+
+    def add_dependency(self) -> None:
+        pair = self.free_pairs.pop()
+        self.db.add_dependency(*pair)
+        self.dependencies.append(pair)
+
+    def load_archived(self) -> int:
+        self.archived_ids = sorted(self.db.open_archive(read_only=True).get_project_ids())
+        return len(self.archived_ids)
+
+    @staticmethod
+    def pop(ids: List[int]) -> List[int]:
+        """Последний id списком (пустой, если ids кончились)"""
+        return [ids.pop()] if ids else []
+
+
+# Операции, расходующие заполненные данные, ограничены их количеством
+LIMITS: Dict[str, Callable[[Context], int]] = {
+    'del_task': lambda ctx: len(ctx.task_ids),
+    'del_project': lambda ctx: len(ctx.project_ids) - 1,
+    'add_dependency': lambda ctx: len(ctx.free_pairs),
+    'del_dependency': lambda ctx: max(1, len(ctx.dependencies)),
+    'restore_task': lambda ctx: max(1, len(ctx.deleted_task_ids)),
+    'restore_project': lambda ctx: max(1, len(ctx.deleted_project_ids)),
+    'restore_archived': lambda ctx: max(1, ctx.load_archived()),
+}
+
+# Служебные методы без собственной работы с данными: соединения и транзакции
+EXCLUDED = ('batch', 'close', 'enable_wal', 'open_archive', 'savepoint')
+
+
+def _drain(chunks) -> int:
+    return sum(len(rows) for rows in chunks)
+
+
+# Операция -> функция замера. Пишущие операции выполняются на копии БД.
+CASES: Dict[str, Callable[[Context], object]] = {
+    'add_project': lambda ctx: ctx.db.add_project(make_project(ctx.counter)),
+    'add_task': lambda ctx: ctx.db.add_task(make_task(ctx.counter, ctx.next_project_id())),
+    'add_projects': lambda ctx: ctx.db.add_projects([make_project(i) for i in range(100)]),
+    'add_tasks': lambda ctx: ctx.db.add_tasks([make_task(i, ctx.next_project_id()) for i in range(1000)]),
+    'set_task_duration': lambda ctx: ctx.db.set_task_duration(ctx.next_task_id(), ctx.counter % 10 + 1),
+    'update_task': lambda ctx: ctx.db.update_task(ctx.next_task_id(), status=ProjectStatus.TESTING,
+                                                  assignee=f"Исполнитель {ctx.counter % 50}"),
+    'update_project': lambda ctx: ctx.db.update_project(ctx.next_project_id(), budget=float(ctx.counter)),
+    'add_dependency': lambda ctx: ctx.add_dependency(),
+    'del_dependency': lambda ctx: ctx.db.del_dependency(*(ctx.dependencies.pop() if ctx.dependencies else (0, 0))),
+    'get_all_projects': lambda ctx: ctx.db.get_all_projects(),
+    'get_tasks_by_project': lambda ctx: ctx.db.get_tasks_by_project(ctx.next_project_id()),
+    'get_task_rows': lambda ctx: ctx.db.get_task_rows(),
+    'get_project_ids': lambda ctx: ctx.db.get_project_ids(),
+    'get_project': lambda ctx: ctx.db.get_project(ctx.next_project_id()),
+    'get_dependencies': lambda ctx: ctx.db.get_dependencies(ctx.next_project_id()),
+    'get_task_durations': lambda ctx: ctx.db.get_task_durations(ctx.next_project_id()),
+    'get_assignees': lambda ctx: ctx.db.get_assignees(),
+    'find_assignee': lambda ctx: ctx.db.find_assignee(f"Исполнитель {ctx.counter % 50}"),
+    'get_assignee_tasks': lambda ctx: ctx.db.get_assignee_tasks(ctx.counter % 50 + 1),
+    'get_assignee_workload': lambda ctx: ctx.db.get_assignee_workload(datetime(2024, 3, 1)),
+    'get_tasks_due_between': lambda ctx: ctx.db.get_tasks_due_between(datetime(2024, 3, 1), datetime(2024, 3, 7)),
+    'get_projects_active_on': lambda ctx: ctx.db.get_projects_active_on(datetime(2024, 3, 1)),
+    'count_projects': lambda ctx: ctx.db.count_projects(),
+    'count_tasks': lambda ctx: ctx.db.count_tasks(),
+    'search_projects': lambda ctx: ctx.db.search_projects(f"проект {ctx.counter % 100}"),
+    'search_tasks': lambda ctx: ctx.db.search_tasks(f"задача {ctx.counter % 1000}"),
+    'get_revision': lambda ctx: ctx.db.get_revision(),
+    'get_changes_since': lambda ctx: ctx.db.get_changes_since(max(0, ctx.revision - 100)),
+    'iter_project_rows': lambda ctx: _drain(ctx.db.iter_project_rows()),
+    'iter_task_rows': lambda ctx: _drain(ctx.db.iter_task_rows()),
+    'del_task': lambda ctx: ctx.db.del_task(ctx.pop_task_id()),
+    'del_project': lambda ctx: ctx.db.del_project(ctx.pop_project_id()),
+    'restore_task': lambda ctx: [ctx.db.restore_task(i) for i in ctx.pop(ctx.deleted_task_ids)],
+    'restore_project': lambda ctx: [ctx.db.restore_project(i) for i in ctx.pop(ctx.deleted_project_ids)],
+    'purge_deleted': lambda ctx: ctx.db.purge_deleted(datetime.now()),
+    'compact_changes': lambda ctx: ctx.db.compact_changes(),
+    'archive_projects': lambda ctx: ctx.db.archive_projects(ARCHIVE_BEFORE),
+    'restore_archived': lambda ctx: ctx.db.restore_archived(ctx.pop(ctx.archived_ids)),
+    'clone': lambda ctx: ctx.db.clone(),
+    'backup': lambda ctx: ctx.db.backup(os.path.join(ctx.work_dir, "backup.db")),
+    'restore': lambda ctx: ctx.db.restore(os.path.join(ctx.work_dir, "backup.db")),
+}
+
+
+def public_operations() -> List[str]:
+    return [name for name, _ in inspect.getmembers(DatabaseManager, inspect.isfunction) if not name.startswith('_')]
+
+
+def time_case(func: Callable[[Context], object], ctx: Context, budget: float, max_repeats: int) -> float:
+    """Медиана времени операции; повторы, пока не исчерпан бюджет времени"""
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_repeats and (not timings or time.perf_counter() - started < budget):
+        ctx.counter += 1
+        start = time.perf_counter()
+        func(ctx)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run(sizes, operations, budget: float, max_repeats: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for size in sizes:
+        results[str(size)] = {}
+        with tempfile.TemporaryDirectory() as work_dir:
+            db_path = os.path.join(work_dir, "bench.db")
+            shutil.copyfile(seeded_path(size), db_path)
+            db = DatabaseManager(db_path)
+            # Снимок для restore создаётся заранее
+            db.backup(os.path.join(work_dir, "backup.db"))
+            ctx = Context(db, work_dir)
+            for name in operations:
+                limit = LIMITS[name](ctx) if name in LIMITS else max_repeats
+                seconds = time_case(CASES[name], ctx, budget, min(max_repeats, limit))
+                results[str(size)][name] = seconds
+                print(f"{size:>9} {name:<28} {seconds * 1000:10.3f} мс")
+    return results
+
+
+def compare(results, baseline, threshold: float, min_delta: float) -> List[str]:
+    """Список регрессий: операция медленнее базовой линии больше чем на threshold"""
+    regressions = []
+    for size, timings in results.items():
+        for name, seconds in timings.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None:
+                continue
+            if seconds > base * (1 + threshold) and seconds - base > min_delta:
+                regressions.append(f"{size} {name}: {base * 1000:.3f} мс -> {seconds * 1000:.3f} мс "
+                                   f"(+{(seconds / base - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Замеры производительности DatabaseManager")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="Число задач в БД")
+    parser.add_argument('--only', nargs='+', help="Замерять только указанные операции")
+    parser.add_argument('--baseline', default='benchmarks.json', help="Файл базовой линии")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Допустимое замедление (0.25 = 25%%)")
+    parser.add_argument('--min-delta', type=float, default=0.0005,
+                        help="Минимальное абсолютное замедление в секундах, чтобы отсечь шум")
+    parser.add_argument('--budget', type=float, default=0.5, help="Время на одну операцию, с")
+    parser.add_argument('--max-repeats', type=int, default=50)
+    parser.add_argument('--update', action='store_true', help="Сохранить результаты как базовую линию")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.only or () if name not in CASES]
+    if unknown:
+        parser.error(f"неизвестные операции: {', '.join(unknown)}; доступны: {', '.join(CASES)}")
+
+    uncovered = sorted(set(public_operations()) - set(CASES) - set(EXCLUDED))
+    if uncovered:
+        print(f"Операции без замеров: {', '.join(uncovered)}", file=sys.stderr)
+    operations = args.only or [name for name in CASES if name in public_operations()]
+
+    results = run(args.sizes, operations, args.budget, args.max_repeats)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+
+    if args.update:
+        for size, timings in results.items():
+            baseline.setdefault(size, {}).update(timings)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'updated': datetime.now().isoformat(timespec='seconds'), 'results': baseline},
+                      f, ensure_ascii=False, indent=2)
+        print(f"Базовая линия сохранена: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold, args.min_delta)
+    if regressions:
+        print("\nРегрессии производительности:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("\nРегрессий нет" if baseline else "\nБазовая линия не найдена, сравнение пропущено")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
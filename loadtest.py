@@ -0,0 +1,155 @@
+"""Нагрузочный тест JSON API (app.server).
+
+    python loadtest.py --spawn --concurrency 50 --duration 10
+    python loadtest.py --host 127.0.0.1 --port 8080 --write-ratio 0.2
+
+С --spawn сервер запускается в этом же процессе на временной БД,
+заполненной генератором синтетических данных.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Client:
+    """HTTP/1.1 клиент с постоянным соединением"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method: str, path: str, payload=None) -> tuple:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else b''
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+        data = await self.reader.readexactly(length)
+        return status, json.loads(data)
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+
+async def worker(client: Client, project_ids: list, deadline: float, write_ratio: float, rng: random.Random,
+                 latencies: list, errors: list):
+    while time.perf_counter() < deadline:
+        roll = rng.random()
+        project_id = rng.choice(project_ids)
+        if roll < write_ratio:
+            request = ('POST', '/tasks', {'project_id': project_id, 'title': 'Нагрузочная задача',
+                                          'assignee': 'Тест', 'priority': 'MEDIUM', 'deadline': '2025-01-01'})
+        elif roll < write_ratio + (1 - write_ratio) * 0.5:
+            request = ('GET', f'/projects/{project_id}/tasks?limit=20', None)
+        elif roll < write_ratio + (1 - write_ratio) * 0.8:
+            request = ('GET', f'/projects?limit=20&offset={rng.randrange(len(project_ids))}', None)
+        else:
+            request = ('GET', f'/tasks/count?project_id={project_id}', None)
+        start = time.perf_counter()
+        try:
+            status, _ = await client.request(*request)
+            if status >= 400:
+                errors.append(status)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            errors.append(str(e))
+            client.close()
+            client.writer = None
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(host: str, port: int, concurrency: int, duration: float, write_ratio: float, seed: int) -> dict:
+    probe = Client(host, port)
+    _, page = await probe.request('GET', f'/projects?limit={1000}')
+    probe.close()
+    project_ids = [item['id'] for item in page['items']]
+    if not project_ids:
+        raise SystemExit("В БД нет проектов")
+
+    latencies, errors = [], []
+    clients = [Client(host, port) for _ in range(concurrency)]
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        worker(client, project_ids, deadline, write_ratio, random.Random(seed + i), latencies, errors)
+        for i, client in enumerate(clients)
+    ))
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        client.close()
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / elapsed,
+        'p50': quantiles[49],
+        'p95': quantiles[94],
+        'p99': quantiles[98],
+    }
+
+
+async def main_async(args):
+    server = None
+    if args.spawn:
+        from app.database import DatabaseManager
+        from app.generator import generate
+        from app.server import ApiServer
+        work_dir = tempfile.mkdtemp()
+        db_path = os.path.join(work_dir, "loadtest.db")
+        generate(DatabaseManager(db_path), args.projects, args.tasks, workers=0)
+        server = ApiServer(db_path, args.host, 0, args.readers)
+        await server.start()
+        args.port = server.port
+        print(f"Сервер запущен на порту {args.port}, БД: {args.projects} проектов, {args.tasks} задач")
+    try:
+        result = await run(args.host, args.port, args.concurrency, args.duration, args.write_ratio, args.seed)
+    finally:
+        if server:
+            await server.stop()
+
+    print(f"Запросов: {result['requests']}, ошибок: {result['errors']}")
+    print(f"Пропускная способность: {result['rps']:.0f} запросов/с")
+    print(f"Задержка: p50 {result['p50'] * 1000:.1f} мс, p95 {result['p95'] * 1000:.1f} мс, "
+          f"p99 {result['p99'] * 1000:.1f} мс")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Нагрузочный тест JSON API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--spawn', action='store_true', help="Запустить сервер на временной БД")
+    parser.add_argument('--projects', type=int, default=1000, help="Проектов во временной БД")
+    parser.add_argument('--tasks', type=int, default=100000, help="Задач во временной БД")
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=50, help="Одновременных клиентов")
+    parser.add_argument('--duration', type=float, default=10.0, help="Длительность, с")
+    parser.add_argument('--write-ratio', type=float, default=0.1, help="Доля запросов на запись")
+    parser.add_argument('--seed', type=int, default=1)
+    asyncio.run(main_async(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
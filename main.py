@@ -1,9 +1,15 @@
 import sys
-from PySide6.QtWidgets import QApplication
-from app.gui import ProjectManagementGUI
 
 
 def main():
+    # Консольный режим не загружает PySide6 и matplotlib
+    if '--cli' in sys.argv[1:]:
+        from app.cli import main as cli_main
+        sys.exit(cli_main([arg for arg in sys.argv[1:] if arg != '--cli']))
+
+    from PySide6.QtWidgets import QApplication
+    from app.gui import ProjectManagementGUI
+
     app = QApplication(sys.argv)
     app.setStyle('windows11')
     window = ProjectManagementGUI()
@@ -12,4 +18,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,2 @@
+"""Сравнение последовательного, многопоточного и многопроцессного выполнения
+типовых нагрузок на слой данных"""
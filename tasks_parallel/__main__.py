@@ -0,0 +1,80 @@
+import argparse
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tasks_parallel.workloads import MODES, build_workloads, measure
+
+MODE_TITLES = {'sequential': 'Последовательно', 'threads': 'Потоки', 'processes': 'Процессы'}
+
+
+def print_report(workloads):
+    header = f"{'Нагрузка':<24}" + ''.join(f"{MODE_TITLES[mode]:>18}" for mode in MODES)
+    print(header)
+    print('-' * len(header))
+    for workload in workloads:
+        cells = []
+        for mode in MODES:
+            cell = f"{workload.results[mode]:.3f} с"
+            if mode != 'sequential':
+                cell += f" (x{workload.speedup(mode):.2f})"
+            cells.append(f"{cell:>18}")
+        print(f"{workload.name:<24}" + ''.join(cells))
+
+
+def plot_report(workloads, output: str, show: bool):
+    import matplotlib
+    if not show:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    figure, ax = plt.subplots(figsize=(10, 5))
+    width = 0.25
+    colors = {'sequential': '#9E9E9E', 'threads': '#2196F3', 'processes': '#4CAF50'}
+    positions = range(len(workloads))
+    for offset, mode in enumerate(MODES):
+        values = [workload.results[mode] for workload in workloads]
+        bars = ax.bar([p + (offset - 1) * width for p in positions], values, width,
+                      label=MODE_TITLES[mode], color=colors[mode], alpha=0.8)
+        for bar, workload in zip(bars, workloads):
+            ax.text(bar.get_x() + bar.get_width() / 2., bar.get_height(),
+                    f'x{workload.speedup(mode):.2f}', ha='center', va='bottom', fontsize=8)
+    ax.set_xticks(list(positions))
+    ax.set_xticklabels([workload.name for workload in workloads])
+    ax.set_ylabel('Время, с')
+    ax.set_title('Сравнение эффективности', fontsize=12, fontweight='bold')
+    ax.legend()
+    ax.grid(True, axis='y', alpha=0.3)
+    figure.tight_layout()
+    figure.savefig(output)
+    print(f"\nГрафик сохранён: {output}")
+    if show:
+        plt.show()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="tasks_parallel",
+        description="Сравнение последовательного, многопоточного и многопроцессного выполнения"
+    )
+    parser.add_argument('--projects', type=int, default=40, help="Число проектов")
+    parser.add_argument('--tasks', type=int, default=1000, help="Задач на проект")
+    parser.add_argument('--log-lines', type=int, default=200000, help="Строк в журнале для анализа")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Размер пулов")
+    parser.add_argument('--output', default='tasks_parallel.png', help="Файл графика")
+    parser.add_argument('--show', action='store_true', help="Показать график в окне")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        print(f"Подготовка данных: {args.projects} проектов x {args.tasks} задач, "
+              f"{args.log_lines} строк журнала, пулы по {args.workers}")
+        workloads = build_workloads(work_dir, args.projects, args.tasks, args.log_lines, args.workers)
+        for workload in workloads:
+            measure(workload, args.workers)
+    print()
+    print_report(workloads)
+    plot_report(workloads, args.output, args.show)
+
+
+if __name__ == "__main__":
+    main()
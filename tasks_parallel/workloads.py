@@ -0,0 +1,132 @@
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from app.database import DatabaseManager
+from app.models import Project, Task, ProjectStatus, TaskPriority
+
+MODES = ('sequential', 'threads', 'processes')
+
+
+@dataclass
+class Workload:
+    """Нагрузка: функция одной единицы работы и список её аргументов"""
+    name: str
+    func: Callable
+    args: List[tuple]
+    results: Dict[str, float] = field(default_factory=dict)
+
+    def speedup(self, mode: str) -> float:
+        return self.results['sequential'] / self.results[mode] if self.results.get(mode) else 0.0
+
+
+def run_mode(mode: str, func: Callable, args: List[tuple], workers: int) -> list:
+    if mode == 'sequential':
+        return [func(*item) for item in args]
+    executor_cls = ThreadPoolExecutor if mode == 'threads' else ProcessPoolExecutor
+    with executor_cls(max_workers=workers) as executor:
+        return list(executor.map(func, *zip(*args)))
+
+
+def measure(workload: Workload, workers: int, modes=MODES) -> Workload:
+    for mode in modes:
+        start = time.perf_counter()
+        run_mode(mode, workload.func, workload.args, workers)
+        workload.results[mode] = time.perf_counter() - start
+    return workload
+
+
+# Единицы работы (функции уровня модуля - должны сериализоваться для пула процессов)
+
+def create_tasks(db_path: str, project_id: int, count: int) -> int:
+    """Массовое создание задач проекта одной транзакцией"""
+    rng = random.Random(project_id)
+    tasks = [
+        Task(None, project_id, f"Задача {i}", "Сгенерирована для замера", f"Исполнитель {rng.randint(1, 20)}",
+             rng.choice(list(TaskPriority)), datetime(2024, 1, 1) + timedelta(days=rng.randint(0, 365)),
+             rng.choice(list(ProjectStatus)))
+        for i in range(count)
+    ]
+    return DatabaseManager(db_path).add_tasks(tasks)
+
+
+def summarize_project(db_path: str, project_id: int) -> dict:
+    """Агрегация по проекту: задачи по приоритетам, исполнителям и просроченные"""
+    tasks = DatabaseManager(db_path).get_tasks_by_project(project_id)
+    today = datetime(2024, 7, 1)
+    return {
+        'project_id': project_id,
+        'by_priority': Counter(task.priority for task in tasks),
+        'by_assignee': Counter(task.assignee for task in tasks),
+        'overdue': sum(1 for task in tasks if task.deadline < today and task.status != ProjectStatus.COMPLETED)
+    }
+
+
+def analyze_log_range(log_path: str, start: int, end: int) -> Counter:
+    """Подсчёт событий по дням в байтовом диапазоне файла логов"""
+    activity = Counter()
+    with open(log_path, 'rb') as f:
+        f.seek(start)
+        for line in f.read(end - start).decode('utf-8').splitlines():
+            if len(line) >= 19:
+                try:
+                    activity[datetime.strptime(line[:10], '%Y-%m-%d').date()] += 1
+                except ValueError:
+                    continue
+    return activity
+
+
+# Подготовка данных
+
+def seed_database(db_path: str, projects: int, tasks_per_project: int) -> List[int]:
+    db = DatabaseManager(db_path)
+    project_ids = db.add_projects([
+        Project(None, f"Проект {i}", "Сгенерирован для замера", datetime(2024, 1, 1), None,
+                list(ProjectStatus)[i % len(ProjectStatus)], 10000.0 * (i + 1), 5)
+        for i in range(projects)
+    ])
+    for project_id in project_ids:
+        create_tasks(db_path, project_id, tasks_per_project)
+    return project_ids
+
+
+def generate_log(log_path: str, lines: int) -> None:
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    with open(log_path, 'w', encoding='utf-8') as f:
+        for i in range(lines):
+            moment = start + timedelta(seconds=rng.randint(0, 90 * 24 * 3600))
+            f.write(f"{moment:%Y-%m-%d %H:%M:%S},000 - INFO - Создана задача: Задача {i} для проекта ID: 1\n")
+
+
+def split_file(path: str, parts: int) -> List[tuple]:
+    """Разбиение файла на байтовые диапазоны, выровненные по концам строк"""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, parts):
+            f.seek(max(size * i // parts, bounds[-1]))
+            f.readline()
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(path, start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def build_workloads(work_dir: str, projects: int, tasks_per_project: int, log_lines: int,
+                    workers: int) -> List[Workload]:
+    db_path = os.path.join(work_dir, "benchmark.db")
+    log_path = os.path.join(work_dir, "benchmark.log")
+    project_ids = seed_database(db_path, projects, tasks_per_project)
+    generate_log(log_path, log_lines)
+    return [
+        Workload("Создание задач", create_tasks,
+                 [(db_path, project_id, tasks_per_project) for project_id in project_ids]),
+        Workload("Агрегация по проектам", summarize_project,
+                 [(db_path, project_id) for project_id in project_ids]),
+        Workload("Анализ логов", analyze_log_range, split_file(log_path, workers * 4)),
+    ]
@@ -1,10 +1,39 @@
+import asyncio
+import csv
+import gzip
+import json
+import multiprocessing
 import pytest
+import random
+import subprocess
+import sqlite3
 import sys
+import threading
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from app.database import DatabaseManager
-from app.models import Project, Task, ProjectStatus, TaskPriority
+from app.database import DatabaseManager, DatabaseBusyError, DatabaseIntegrityError, MEMORY, memory_uri
+from app.models import Project, Task, ProjectStatus, TaskPriority, to_day_number
+from app.frame import TaskFrame
+from app.exporter import export_table, detect_format
+from app.importer import import_file, parse_task, parse_enum
+from app.backup import run_backup, list_backups
+from tasks_parallel.workloads import build_workloads, measure, split_file
+import benchmarks
+from app.generator import generate
+from app.metrics import Metrics
+from app.audit import QueryPlanWarning, assert_indexed
+from app import cli
+from app.server import ApiServer
+from app.writer import WriteQueue
+from app.schedule import ProjectSchedule
+from app.database import DatabaseError, DependencyCycleError, StaleVersionError, TASK_COLUMNS
+from app.alerts import DeadlineScanner, SOON, OVERDUE
+from app.timeline import Timeline, PROJECT, TASK
+from app.reports import generate_reports
+from app.workspaces import Workspaces
+from loadtest import Client
 
 
 class TestDatabase:
@@ -395,7 +424,1117 @@ class TestEnums:
         priority = TaskPriority("Срочный")
         assert priority == TaskPriority.CRITICAL
 
+    def test_codes(self):
+        """Тест кодов перечислений для хранения в БД"""
+        for enum in (ProjectStatus, TaskPriority):
+            assert len({member.code for member in enum}) == len(enum)
+            assert all(enum.from_code(member.code) is member for member in enum)
+        assert TaskPriority.LOW.code < TaskPriority.MEDIUM.code < TaskPriority.HIGH.code < TaskPriority.CRITICAL.code
 
+    def test_migration_to_codes(self, tmp_path):
+        """Тест перевода текстовых статусов и приоритетов в коды"""
+        db_path = str(tmp_path / "test.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+                            description TEXT, start_date TEXT NOT NULL, end_date TEXT, status TEXT NOT NULL,
+                            budget REAL NOT NULL, team_size INTEGER NOT NULL,
+                            created_at TEXT DEFAULT CURRENT_TIMESTAMP)""")
+            conn.execute("""CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, project_id INTEGER NOT NULL,
+                            title TEXT NOT NULL, description TEXT, assignee TEXT NOT NULL, priority TEXT NOT NULL,
+                            deadline TEXT NOT NULL, status TEXT NOT NULL,
+                            created_at TEXT DEFAULT CURRENT_TIMESTAMP)""")
+            conn.execute("INSERT INTO projects (name, start_date, status, budget, team_size) "
+                         "VALUES ('Старый', '2024-01-01', 'Тестирование', 0, 1)")
+            conn.executemany("INSERT INTO tasks (project_id, title, assignee, priority, deadline, status) "
+                             "VALUES (1, ?, '', ?, '2024-01-01', 'В работе')",
+                             [("a", "Средний"), ("b", "Срочный"), ("c", "Низкий")])
+        db = DatabaseManager(db_path)
+        assert db.get_project(1).status == ProjectStatus.TESTING
+        assert [task.title for task in db.get_tasks_by_project(1, sort='priority')] == ["b", "a", "c"]
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT typeof(priority), typeof(status) FROM tasks").fetchone() == (
+                'integer', 'integer')
+            assert conn.execute("SELECT status FROM projects").fetchone() == (ProjectStatus.TESTING.code,)
 
+    def test_migration_unknown_value(self, tmp_path):
+        """Тест отказа миграции при неизвестном значении (данные не меняются)"""
+        db_path = str(tmp_path / "test.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+                            description TEXT, start_date TEXT NOT NULL, end_date TEXT, status TEXT NOT NULL,
+                            budget REAL NOT NULL, team_size INTEGER NOT NULL,
+                            created_at TEXT DEFAULT CURRENT_TIMESTAMP)""")
+            conn.execute("INSERT INTO projects (name, start_date, status, budget, team_size) "
+                         "VALUES ('Старый', '2024-01-01', 'Неизвестно', 0, 1)")
+        with pytest.raises(DatabaseIntegrityError):
+            DatabaseManager(db_path)
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT status FROM projects").fetchone() == ('Неизвестно',)
 
 
+class TestDates:
+    """Тесты хранения дат номерами дней"""
+    def test_migration_to_day_numbers(self, tmp_path):
+        """Тест перевода текстовых дат в номера дней с пересозданием индексов"""
+        db_path = str(tmp_path / "test.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+                            description TEXT, start_date TEXT NOT NULL, end_date TEXT, status TEXT NOT NULL,
+                            budget REAL NOT NULL, team_size INTEGER NOT NULL,
+                            created_at TEXT DEFAULT CURRENT_TIMESTAMP)""")
+            conn.execute("""CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, project_id INTEGER NOT NULL,
+                            title TEXT NOT NULL, description TEXT, assignee TEXT NOT NULL, priority TEXT NOT NULL,
+                            deadline TEXT NOT NULL, status TEXT NOT NULL,
+                            created_at TEXT DEFAULT CURRENT_TIMESTAMP)""")
+            conn.execute("CREATE INDEX idx_tasks_deadline ON tasks (deadline)")
+            conn.executemany("INSERT INTO projects (name, start_date, end_date, status, budget, team_size) "
+                             "VALUES (?, ?, ?, 'В работе', 0, 1)",
+                             [("Старый", "2023-01-01", "2023-12-31"), ("Текущий", "2024-01-01", None)])
+            conn.execute("INSERT INTO tasks (project_id, title, assignee, priority, deadline, status) "
+                         "VALUES (2, 'Задача', '', 'Средний', '2024-02-29', 'В работе')")
+        db = DatabaseManager(db_path)
+        assert db.get_project(1).end_date == datetime(2023, 12, 31)
+        assert db.get_tasks_by_project(2)[0].deadline == datetime(2024, 2, 29)
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT deadline FROM tasks").fetchone() == (
+                (datetime(2024, 2, 29) - datetime(1970, 1, 1)).days,)
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {'idx_tasks_deadline', 'idx_tasks_assignee', 'idx_projects_end'} <= indexes
+
+    def test_range_queries(self, tmp_path):
+        """Тест выборок по диапазону дат"""
+        db = DatabaseManager(str(tmp_path / "test.db"))
+        first = db.add_project(Project(None, "Прошлый", "", datetime(2024, 1, 1), datetime(2024, 1, 31),
+                                       ProjectStatus.COMPLETED, 0, 1))
+        second = db.add_project(Project(None, "Открытый", "", datetime(2024, 1, 15), None,
+                                        ProjectStatus.IN_PROGRESS, 0, 1))
+        assert [p.id for p in db.get_projects_active_on(datetime(2024, 1, 20))] == [first, second]
+        assert [p.id for p in db.get_projects_active_on(datetime(2024, 1, 31))] == [first, second]
+        assert [p.id for p in db.get_projects_active_on(datetime(2024, 2, 1))] == [second]
+        assert db.get_projects_active_on(datetime(2023, 12, 31)) == []
+        db.add_tasks([Task(None, second, f"Задача {day}", "", "", TaskPriority.LOW, datetime(2024, 2, day),
+                           ProjectStatus.PLANNING) for day in (1, 5, 10)])
+        assert [t.title for t in db.get_tasks_due_between(datetime(2024, 2, 1), datetime(2024, 2, 5))] == [
+            "Задача 1", "Задача 5"]
+
+
+class TestTaskFrame:
+    """Тесты колоночного представления задач"""
+    @pytest.fixture
+    def db(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / "test.db"))
+        first = db.add_project(Project(None, "Первый", "", datetime(2024, 1, 1), None,
+                                       ProjectStatus.IN_PROGRESS, 1000.0, 2))
+        second = db.add_project(Project(None, "Второй", "", datetime(2024, 1, 1), None,
+                                        ProjectStatus.PLANNING, 2000.0, 3))
+        tasks = [
+            (first, "Анна", TaskPriority.HIGH, datetime(2024, 1, 10), ProjectStatus.IN_PROGRESS),
+            (first, "Иван", TaskPriority.LOW, datetime(2024, 1, 20), ProjectStatus.COMPLETED),
+            (first, "Анна", TaskPriority.CRITICAL, datetime(2024, 3, 1), ProjectStatus.PLANNING),
+            (second, "Петр", TaskPriority.HIGH, datetime(2024, 1, 5), ProjectStatus.PLANNING),
+        ]
+        for i, (project_id, assignee, priority, deadline, status) in enumerate(tasks):
+            db.add_task(Task(None, project_id, f"Задача {i + 1}", "", assignee, priority, deadline, status))
+        return db
+
+    def test_load(self, db):
+        """Тест загрузки задач в колонки"""
+        frame = TaskFrame.from_database(db)
+        assert len(frame) == 4
+        assert frame.titles[0] == "Задача 1"
+        assert frame.deadlines[0] == (datetime(2024, 1, 10) - datetime(1970, 1, 1)).days
+
+    def test_filters(self, db):
+        """Тест векторных фильтров"""
+        frame = TaskFrame.from_database(db)
+        overdue = frame.overdue(today=datetime(2024, 1, 25).date())
+        assert sorted(overdue.titles) == ["Задача 1", "Задача 4"]
+        assert len(frame.by_priority(TaskPriority.HIGH)) == 2
+        assert len(frame.by_project(int(frame.project_ids[0]))) == 3
+        assert len(TaskFrame.from_database(db, project_id=99999)) == 0
+
+    def test_group_counts(self, db):
+        """Тест группировок"""
+        frame = TaskFrame.from_database(db)
+        assert frame.count_by_priority()[TaskPriority.HIGH] == 2
+        assert frame.count_by_priority()[TaskPriority.MEDIUM] == 0
+        assert frame.count_by_status()[ProjectStatus.PLANNING] == 2
+        assert sorted(frame.count_by_project().values()) == [1, 3]
+        assert frame.count_by_assignee() == {"Анна": 2, "Иван": 1, "Петр": 1}
+
+
+class TestExporter:
+    """Тесты потокового экспорта"""
+    @pytest.fixture
+    def db(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / "test.db"))
+        project_id = db.add_project(Project(None, "Экспорт", "Описание", datetime(2024, 1, 1), None,
+                                            ProjectStatus.PLANNING, 500.0, 1))
+        for i in range(5):
+            db.add_task(Task(None, project_id, f"Задача {i}", "", "Анна", TaskPriority.LOW,
+                             datetime(2024, 2, 1), ProjectStatus.PLANNING))
+        return db
+
+    def test_detect_format(self):
+        """Тест определения формата по расширению"""
+        assert detect_format("out.csv") == ('csv', False)
+        assert detect_format("out.jsonl.gz") == ('jsonl', True)
+        with pytest.raises(ValueError):
+            detect_format("out.txt")
+
+    def test_export_csv(self, db, tmp_path):
+        """Тест экспорта в CSV порциями с прогрессом"""
+        path = tmp_path / "tasks.csv"
+        calls = []
+        count = export_table(db, 'tasks', str(path), 'csv', chunk_size=2,
+                             progress=lambda written, total: calls.append((written, total)))
+        assert count == 5
+        assert calls == [(2, 5), (4, 5), (5, 5)]
+        with open(path, encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 5
+        assert rows[0]['title'] == "Задача 0"
+        assert rows[0]['priority'] == "Низкий"
+
+    def test_export_jsonl_gzip(self, db, tmp_path):
+        """Тест экспорта в сжатый JSON Lines"""
+        path = tmp_path / "projects.jsonl.gz"
+        assert export_table(db, 'projects', str(path), 'jsonl', compress=True) == 1
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        assert records[0]['name'] == "Экспорт"
+        assert records[0]['status'] == "Планируется"
+
+
+class TestImporter:
+    """Тесты пакетного импорта"""
+    @pytest.fixture
+    def db(self, tmp_path):
+        return DatabaseManager(str(tmp_path / "test.db"))
+
+    def test_parse_enum(self):
+        """Тест разбора перечислений по значению и имени"""
+        assert parse_enum(TaskPriority, "Высокий") == TaskPriority.HIGH
+        assert parse_enum(TaskPriority, "critical") == TaskPriority.CRITICAL
+        with pytest.raises(ValueError):
+            parse_enum(ProjectStatus, "Неизвестно")
+
+    def test_parse_task_validation(self):
+        """Тест проверки полей задачи"""
+        task = parse_task({'project_id': '1', 'title': 'Задача', 'deadline': '2024-05-01'})
+        assert task.priority == TaskPriority.MEDIUM
+        assert task.status == ProjectStatus.PLANNING
+        with pytest.raises(ValueError):
+            parse_task({'project_id': '1', 'title': 'Задача', 'deadline': '01.05.2024'})
+        with pytest.raises(ValueError):
+            parse_task({'project_id': '1', 'deadline': '2024-05-01'})
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_import_projects_and_tasks(self, db, tmp_path, workers):
+        """Тест импорта с сопоставлением id проектов и отчётом"""
+        projects_path = tmp_path / "projects.csv"
+        with open(projects_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['id', 'name', 'start_date', 'status', 'budget', 'team_size'])
+            writer.writerow([10, 'Импорт А', '2024-01-01', 'В работе', '100', '2'])
+            writer.writerow([11, 'Импорт Б', '2024-13-01', 'В работе', '100', '2'])
+        tasks_path = tmp_path / "tasks.jsonl"
+        with open(tasks_path, 'w', encoding='utf-8') as f:
+            for i in range(7):
+                f.write(json.dumps({'project_id': 10, 'title': f'Задача {i}', 'deadline': '2024-02-01',
+                                    'priority': 'HIGH'}, ensure_ascii=False) + '\n')
+            f.write(json.dumps({'project_id': 11, 'title': 'Без проекта', 'deadline': '2024-02-01'}) + '\n')
+            f.write('{broken\n')
+
+        projects = import_file(db, 'projects', str(projects_path), chunk_size=1, workers=workers)
+        assert projects.imported == 1
+        assert projects.rejected == 1
+        assert projects.report_path is not None
+
+        tasks = import_file(db, 'tasks', str(tasks_path), chunk_size=3, workers=workers,
+                            id_map=projects.id_map)
+        assert tasks.imported == 7
+        assert tasks.rejected == 2
+        with open(tasks.report_path, encoding='utf-8', newline='') as f:
+            report = list(csv.DictReader(f))
+        assert [row['line'] for row in report] == ['8', '9']
+
+        project_id = projects.id_map[10]
+        assert db.count_tasks(project_id) == 7
+        assert db.get_tasks_by_project(project_id)[0].priority == TaskPriority.HIGH
+
+
+class TestBackup:
+    """Тесты резервного копирования и восстановления"""
+    @pytest.fixture
+    def db(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / "test.db"))
+        db.add_project(Project(None, "Исходный", "", datetime(2024, 1, 1), None,
+                               ProjectStatus.PLANNING, 100.0, 1))
+        return db
+
+    def test_backup_and_restore(self, db, tmp_path):
+        """Тест снимка и восстановления"""
+        snapshot = str(tmp_path / "snapshot.db")
+        steps = []
+        db.backup(snapshot, pages_per_step=1, progress=lambda status, remaining, total: steps.append(remaining))
+        assert steps[-1] == 0
+
+        db.add_project(Project(None, "Лишний", "", datetime(2024, 1, 1), None,
+                               ProjectStatus.PLANNING, 100.0, 1))
+        assert len(db.get_all_projects()) == 2
+        db.restore(snapshot)
+        projects = db.get_all_projects()
+        assert [p.name for p in projects] == ["Исходный"]
+
+    def test_restore_missing_file(self, db, tmp_path):
+        """Тест ошибки восстановления из несуществующего файла"""
+        with pytest.raises(Exception):
+            db.restore(str(tmp_path / "missing.db"))
+
+    def test_retention(self, db, tmp_path, monkeypatch):
+        """Тест ротации плановых копий"""
+        import app.backup
+        backups_dir = str(tmp_path / "backups")
+        for second in range(4):
+            monkeypatch.setattr(app.backup, 'backup_name',
+                                lambda db_path, now=None, s=second: f"test-20240101-00000{s}.db")
+            run_backup(db, backups_dir, keep=2)
+        backups = list_backups(backups_dir, db.db_path)
+        assert [os.path.basename(path) for path in backups] == ["test-20240101-000002.db",
+                                                                 "test-20240101-000003.db"]
+
+
+class TestTasksParallel:
+    """Тесты сравнения режимов выполнения"""
+    def test_split_file(self, tmp_path):
+        """Тест разбиения файла по границам строк"""
+        path = tmp_path / "log.txt"
+        path.write_text("".join(f"строка {i}\n" for i in range(100)), encoding='utf-8')
+        ranges = split_file(str(path), 7)
+        assert ranges[0][1] == 0
+        assert ranges[-1][2] == os.path.getsize(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        assert all(data[end - 1:end] == b"\n" for _, _, end in ranges)
+
+    def test_modes_give_same_results(self, tmp_path):
+        """Тест замеров во всех режимах"""
+        workloads = build_workloads(str(tmp_path), projects=2, tasks_per_project=20, log_lines=200, workers=2)
+        for workload in workloads:
+            measure(workload, workers=2)
+            assert set(workload.results) == {'sequential', 'threads', 'processes'}
+            assert workload.speedup('threads') > 0
+        assert DatabaseManager(str(tmp_path / "benchmark.db")).count_tasks() == 2 * 20 * 4
+
+
+class TestBenchmarks:
+    """Тесты набора замеров производительности"""
+    def test_cases_are_public_operations(self):
+        """Тест соответствия замеров публичным методам DatabaseManager"""
+        assert set(benchmarks.CASES) == set(benchmarks.public_operations()) - set(benchmarks.EXCLUDED)
+
+    def test_compare(self):
+        """Тест обнаружения регрессий с порогом и абсолютным допуском"""
+        baseline = {'1000': {'add_task': 0.010, 'count_tasks': 0.0001}}
+        results = {'1000': {'add_task': 0.020, 'count_tasks': 0.0003, 'get_all_projects': 0.5}}
+        regressions = benchmarks.compare(results, baseline, threshold=0.25, min_delta=0.0005)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("1000 add_task")
+
+    def test_run_small(self, tmp_path, monkeypatch):
+        """Тест прогона на маленькой БД"""
+        monkeypatch.setattr(benchmarks, 'SEED_DIR', str(tmp_path / "seed"))
+        results = benchmarks.run([100], list(benchmarks.CASES), budget=0.01, max_repeats=2)
+        assert set(results['100']) == set(benchmarks.CASES)
+
+    def test_unknown_operation(self, capsys):
+        """Тест отказа для неизвестной операции в --only"""
+        with pytest.raises(SystemExit):
+            benchmarks.main(['--only', 'nosuchop'])
+        assert "nosuchop" in capsys.readouterr().err
+
+
+@pytest.fixture(scope="session")
+def seeded_template():
+    """БД в памяти, заполненная генератором один раз на весь прогон"""
+    db = DatabaseManager(MEMORY)
+    generate(db, projects=200, tasks=5000, seed=1, workers=0)
+    return db
+
+
+@pytest.fixture
+def seeded_db(seeded_template):
+    """Своя копия заполненной БД для каждого теста"""
+    return seeded_template.clone()
+
+
+class TestGenerator:
+    """Тесты генератора синтетических данных"""
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_deterministic(self, tmp_path, workers):
+        """Тест воспроизводимости при разном числе процессов"""
+        reference = DatabaseManager(str(tmp_path / "reference.db"))
+        generate(reference, projects=20, tasks=500, seed=7, workers=0, batch_size=100)
+        db = DatabaseManager(str(tmp_path / f"generated-{workers}.db"))
+        calls = []
+        assert generate(db, projects=20, tasks=500, seed=7, workers=workers, batch_size=100,
+                        progress=lambda written, total: calls.append(written)) == (20, 500)
+        assert calls == [100, 200, 300, 400, 500]
+        assert db.get_task_rows() == reference.get_task_rows()
+
+    def test_distributions(self, seeded_db):
+        """Тест охвата всех статусов и перекоса исполнителей"""
+        frame = TaskFrame.from_database(seeded_db)
+        assert {p.status for p in seeded_db.get_all_projects()} == set(ProjectStatus)
+        assert all(count > 0 for count in frame.count_by_priority().values())
+        workload = sorted(frame.count_by_assignee().values(), reverse=True)
+        assert workload[0] > 10 * workload[len(workload) // 2]
+
+
+class TestMetrics:
+    """Тесты замеров времени операций"""
+    @pytest.fixture
+    def metrics(self):
+        metrics = Metrics()
+        metrics.register(DatabaseManager)
+        yield metrics
+        metrics.disable()
+
+    def test_disabled_is_original(self, metrics):
+        """Тест: в выключенном состоянии методы не обёрнуты"""
+        original = DatabaseManager.get_all_projects
+        metrics.enable()
+        assert DatabaseManager.get_all_projects is not original
+        metrics.disable()
+        assert DatabaseManager.get_all_projects is original
+
+    def test_records(self, metrics, tmp_path):
+        """Тест подсчёта вызовов, строк и ошибок"""
+        db = DatabaseManager(str(tmp_path / "test.db"))
+        metrics.enable()
+        project_id = db.add_project(Project(None, "Метрики", "", datetime(2024, 1, 1), None,
+                                            ProjectStatus.PLANNING, 0.0, 1))
+        db.add_tasks([Task(None, project_id, f"Задача {i}", "", "Анна", TaskPriority.LOW,
+                           datetime(2024, 2, 1), ProjectStatus.PLANNING) for i in range(5)])
+        for _ in range(3):
+            db.get_tasks_by_project(project_id)
+        assert sum(len(rows) for rows in db.iter_task_rows(chunk_size=2)) == 5
+        with pytest.raises(Exception):
+            db.add_task(Task(None, 99999, "Без проекта", "", "", TaskPriority.LOW,
+                             datetime(2024, 2, 1), ProjectStatus.PLANNING))
+
+        snapshot = metrics.snapshot()
+        stats = snapshot['DatabaseManager.get_tasks_by_project']
+        assert stats['count'] == 3
+        assert stats['rows'] == 15
+        assert stats['p50'] <= stats['p95'] <= stats['p99']
+        assert snapshot['DatabaseManager.iter_task_rows']['rows'] == 5
+        assert snapshot['DatabaseManager.add_task']['errors'] == 1
+        metrics.reset()
+        assert metrics.snapshot() == {}
+
+
+class TestQueryAudit:
+    """Тесты аудита планов запросов"""
+    @pytest.fixture
+    def db(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / "test.db"), audit_queries=True)
+        project_id = db.add_project(Project(None, "Аудит", "", datetime(2024, 1, 1), None,
+                                            ProjectStatus.PLANNING, 0.0, 1))
+        db.add_task(Task(None, project_id, "Задача", "", "Анна", TaskPriority.LOW,
+                         datetime(2024, 2, 1), ProjectStatus.PLANNING))
+        return db
+
+    def test_full_scan_warning(self, db):
+        """Тест предупреждения о полном сканировании"""
+        with pytest.warns(QueryPlanWarning):
+            db.get_task_rows()
+        assert any("FROM tasks" in sql for sql in db.auditor.scans)
+
+    @pytest.mark.filterwarnings("ignore::app.audit.QueryPlanWarning")
+    def test_hot_queries_use_indexes(self, db):
+        """Тест: частые запросы используют индексы"""
+        project_id = db.get_all_projects()[0].id
+        task_id = db.get_tasks_by_project(project_id)[0].id
+        with assert_indexed(db):
+            db.get_all_projects(limit=50)
+            db.count_tasks()
+            db.get_tasks_by_project(project_id)
+            db.get_task_rows(project_id)
+            db.count_tasks(project_id)
+            db.get_dependencies(project_id)
+            db.get_task_durations(project_id)
+            db.get_tasks_due_between(datetime(2024, 1, 1), datetime(2024, 1, 31))
+            db.get_projects_active_on(datetime(2024, 1, 15))
+            db.del_task(task_id)
+            db.del_project(project_id)
+
+    def test_assert_indexed_fails_on_scan(self, db):
+        """Тест: помощник падает на запросе без индекса"""
+        with pytest.raises(AssertionError):
+            with assert_indexed(db):
+                db.get_task_rows()
+
+    def test_scan_by_partial_index_is_full_scan(self, db):
+        """Тест: проход по частичному индексу тоже считается полным чтением"""
+        with pytest.raises(AssertionError, match="idx_tasks_deadline"):
+            with assert_indexed(db):
+                db.search_tasks("задача")
+
+
+class TestCli:
+    """Тесты консольного интерфейса"""
+    def test_no_gui_imports(self):
+        """Тест: консольный режим не загружает Qt и matplotlib"""
+        code = "import sys, app.cli; print('PySide6' in sys.modules, 'matplotlib' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        assert output.strip() == "False False"
+
+    def test_workflow(self, tmp_path, capsys):
+        """Тест добавления, поиска и удаления через CLI"""
+        db = ['--db', str(tmp_path / "test.db")]
+        assert cli.main(db + ['projects', 'add', '--name', 'Консоль', '--start', '2024-01-01',
+                              '--status', 'IN_PROGRESS']) == 0
+        project_id = capsys.readouterr().out.strip()
+        assert cli.main(db + ['tasks', 'add', project_id, '--title', 'Ревью', '--deadline', '2024-02-01',
+                              '--priority', 'Высокий', '--assignee', 'Анна']) == 0
+        task_id = capsys.readouterr().out.strip()
+
+        assert cli.main(db + ['--json', 'tasks', 'search', 'анна']) == 0
+        found = json.loads(capsys.readouterr().out)
+        assert found['title'] == "Ревью"
+        assert found['priority'] == "Высокий"
+
+        assert cli.main(db + ['projects', 'search', 'КОНС']) == 0
+        assert "Консоль\tВ работе" in capsys.readouterr().out
+
+        assert cli.main(db + ['tasks', 'add', '999', '--title', 'x', '--deadline', '2024-02-01']) == 1
+        assert cli.main(db + ['tasks', 'add', project_id, '--title', 'x', '--deadline', '02.2024']) == 1
+        assert cli.main(db + ['tasks', 'delete', task_id]) == 0
+        assert cli.main(db + ['projects', 'delete', project_id]) == 0
+        assert cli.main(db + ['projects', 'delete', project_id]) == 1
+
+
+class TestServer:
+    """Тесты JSON API"""
+    def test_api(self, tmp_path):
+        """Тест создания, чтения и удаления через HTTP"""
+        async def scenario():
+            server = ApiServer(str(tmp_path / "test.db"), port=0)
+            await server.start()
+            client = Client(server.host, server.port)
+            try:
+                status, project = await client.request('POST', '/projects', {
+                    'name': 'API', 'start_date': '2024-01-01', 'status': 'IN_PROGRESS'})
+                assert status == 201 and project['status'] == "В работе"
+                results = await asyncio.gather(*(
+                    Client(server.host, server.port).request('POST', '/tasks', {
+                        'project_id': project['id'], 'title': f'Задача {i}', 'deadline': '2024-02-01'})
+                    for i in range(20)
+                ))
+                assert all(status == 201 for status, _ in results)
+                assert len({task['id'] for _, task in results}) == 20
+
+                status, page = await client.request('GET', f"/projects/{project['id']}/tasks?limit=5&offset=15")
+                assert status == 200 and page['total'] == 20 and len(page['items']) == 5
+                status, found = await client.request('GET', '/tasks/search?' + urlencode({'q': 'задача 19'}))
+                assert found['total'] == 1
+
+                assert (await client.request('GET', '/projects/999'))[0] == 404
+                assert (await client.request('POST', '/tasks', {
+                    'project_id': 999, 'title': 'x', 'deadline': '2024-02-01'}))[0] == 404
+                assert (await client.request('POST', '/tasks', {'title': 'x'}))[0] == 400
+                assert (await client.request('PUT', '/projects'))[0] == 405
+
+                assert (await client.request('DELETE', f"/projects/{project['id']}"))[0] == 200
+                status, count = await client.request('GET', '/tasks/count')
+                assert count['count'] == 0
+                status, changes = await client.request('GET', '/changes?since=0')
+                assert changes['deleted_projects'] == [project['id']] and len(changes['deleted_tasks']) == 20
+            finally:
+                client.close()
+                await server.stop()
+
+        asyncio.run(scenario())
+
+
+def _stress_writer(db_path, worker, count):
+    """Процесс стресс-теста: половина записей напрямую, половина через очередь"""
+    db = DatabaseManager(db_path, busy_timeout=0.01, retries=100, retry_delay=0.001)
+    project_id = db.add_project(Project(None, f"Процесс {worker}", "", datetime(2024, 1, 1), None,
+                                        ProjectStatus.IN_PROGRESS, 0, 1))
+    task = Task(None, project_id, "Задача", "", "", TaskPriority.LOW, datetime(2024, 2, 1), ProjectStatus.PLANNING)
+    for _ in range(count // 2):
+        db.add_task(task)
+    with WriteQueue(db) as writer:
+        futures = [writer.submit('add_task', task) for _ in range(count - count // 2)]
+        for future in futures:
+            future.result()
+
+
+class TestWriteQueue:
+    """Тесты конкурентной записи"""
+    @pytest.fixture
+    def project(self):
+        return Project(None, "Проект", "", datetime(2024, 1, 1), None, ProjectStatus.PLANNING, 0, 1)
+
+    def test_typed_errors(self, tmp_path, project):
+        """Тест: блокировка другим соединением и нарушение ключа дают типизированные ошибки"""
+        db = DatabaseManager(str(tmp_path / "test.db"), busy_timeout=0.01, retries=1, retry_delay=0.001)
+        locker = sqlite3.connect(str(tmp_path / "test.db"))
+        locker.execute("BEGIN EXCLUSIVE")
+        with pytest.raises(DatabaseBusyError):
+            db.add_project(project)
+        locker.rollback()
+        with pytest.raises(DatabaseIntegrityError):
+            db.add_task(Task(None, 999, "x", "", "", TaskPriority.LOW, datetime(2024, 1, 1), ProjectStatus.PLANNING))
+
+    def test_group_commit_waits_for_lock(self, tmp_path, project):
+        """Тест: очередь пережидает блокировку и пишет накопленное одной транзакцией"""
+        db = DatabaseManager(str(tmp_path / "test.db"), busy_timeout=0.01, retries=50, retry_delay=0.01)
+        locker = sqlite3.connect(str(tmp_path / "test.db"), check_same_thread=False)
+        locker.execute("BEGIN EXCLUSIVE")
+        threading.Timer(0.2, locker.rollback).start()
+        with WriteQueue(db) as writer:
+            futures = [writer.submit('add_project', project) for _ in range(50)]
+            ids = [future.result(timeout=10) for future in futures]
+            assert writer.call('del_project', 12345) is False
+            assert writer.batches <= 3
+        assert len(set(ids)) == 50
+        assert db.count_projects() == 50
+
+    def test_failed_call_rolled_back(self, tmp_path, project):
+        """Тест: упавший вызов не оставляет строк, остальные вызовы пакета фиксируются"""
+        db = DatabaseManager(str(tmp_path / "test.db"))
+        project_id = db.add_project(project)
+
+        def task(project_id):
+            return Task(None, project_id, "x", "", "", TaskPriority.LOW, datetime(2024, 1, 1), ProjectStatus.PLANNING)
+
+        with WriteQueue(db) as writer:
+            futures = [writer.submit('add_task', task(project_id)),
+                       writer.submit('add_tasks', [task(project_id), task(project_id), task(999)]),
+                       writer.submit('add_task', task(project_id))]
+            assert futures[0].result(timeout=10) and futures[2].result(timeout=10)
+            with pytest.raises(DatabaseIntegrityError):
+                futures[1].result(timeout=10)
+        assert db.count_tasks() == 2
+
+    def test_multiprocess_stress(self, tmp_path):
+        """Стресс-тест: несколько процессов пишут в один файл без потерь и ошибок"""
+        db_path = str(tmp_path / "test.db")
+        DatabaseManager(db_path)
+        processes = [multiprocessing.Process(target=_stress_writer, args=(db_path, i, 100)) for i in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+        assert [process.exitcode for process in processes] == [0] * 4
+        db = DatabaseManager(db_path)
+        assert db.count_projects() == 4
+        assert db.count_tasks() == 400
+
+
+class TestSchedule:
+    """Тесты зависимостей и критического пути"""
+    def test_critical_path(self):
+        """Тест ранних сроков, резервов и критического пути"""
+        # 1 -> 2 -> 4, 1 -> 3 -> 4
+        schedule = ProjectSchedule({1: 2, 2: 5, 3: 1, 4: 3}, [(2, 1), (3, 1), (4, 2), (4, 3)])
+        assert schedule.start == {1: 0, 2: 2, 3: 2, 4: 7}
+        assert schedule.makespan() == 10
+        assert schedule.critical_path() == [1, 2, 4]
+        assert schedule.slack() == {1: 0, 2: 0, 3: 4, 4: 0}
+        assert schedule.dates(datetime(2024, 1, 1))[4] == (datetime(2024, 1, 8), datetime(2024, 1, 11))
+
+        schedule.set_duration(3, 9)
+        assert schedule.critical_path() == [1, 3, 4]
+        with pytest.raises(DependencyCycleError):
+            schedule.add_dependency(1, 4)
+        with pytest.raises(DependencyCycleError):
+            ProjectSchedule({1: 1, 2: 1}, [(1, 2), (2, 1)])
+
+    def test_incremental_matches_full(self):
+        """Тест: пошаговые изменения дают то же, что полный пересчёт, и трогают только потомков"""
+        rng = random.Random(7)
+        count = 2000
+        schedule = ProjectSchedule({task_id: rng.randint(0, 5) for task_id in range(count)})
+        edges = set()
+        for _ in range(3000):
+            task_id, depends_on = rng.sample(range(count), 2)
+            try:
+                schedule.add_dependency(task_id, depends_on)
+                edges.add((task_id, depends_on))
+            except DependencyCycleError:
+                pass
+        for task_id in rng.sample(range(count), 50):
+            schedule.set_duration(task_id, rng.randint(0, 5))
+        schedule.remove_task(0)
+        edges = {edge for edge in edges if 0 not in edge}
+
+        full = ProjectSchedule(schedule.duration, edges)
+        assert schedule.start == full.start
+        assert schedule.finish == full.finish
+        assert all(schedule.rank[pred] < schedule.rank[task_id] for task_id, pred in edges)
+
+        leaf = next(task_id for task_id in schedule.succs if not schedule.succs[task_id])
+        schedule.set_duration(leaf, schedule.duration[leaf] + 1)
+        assert schedule.recomputed == 1
+
+    def test_database_dependencies(self, tmp_path):
+        """Тест хранения зависимостей, запрета циклов и миграции старой БД"""
+        db_path = str(tmp_path / "test.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, project_id INTEGER NOT NULL,
+                            title TEXT NOT NULL, description TEXT, assignee TEXT NOT NULL, priority TEXT NOT NULL,
+                            deadline TEXT NOT NULL, status TEXT NOT NULL,
+                            created_at TEXT DEFAULT CURRENT_TIMESTAMP)""")
+        db = DatabaseManager(db_path)
+        project_id = db.add_project(Project(None, "Граф", "", datetime(2024, 1, 1), None,
+                                            ProjectStatus.PLANNING, 0, 1))
+        ids = [db.add_task(Task(None, project_id, f"Задача {i}", "", "", TaskPriority.LOW, datetime(2024, 2, 1),
+                                ProjectStatus.PLANNING, duration=i + 1)) for i in range(3)]
+        db.add_dependency(ids[1], ids[0])
+        db.add_dependency(ids[2], ids[1])
+        with pytest.raises(DependencyCycleError):
+            db.add_dependency(ids[0], ids[2])
+        with pytest.raises(DependencyCycleError):
+            db.add_dependency(ids[0], ids[0])
+
+        schedule = ProjectSchedule.from_database(db, project_id)
+        assert schedule.critical_path() == ids
+        assert schedule.makespan() == 6
+        assert db.get_tasks_by_project(project_id)[2].duration == 3
+
+        db.del_task(ids[1])
+        assert db.get_dependencies(project_id) == []
+
+
+class TestDeadlineAlerts:
+    """Тесты оповещений о сроках"""
+    @pytest.fixture
+    def db(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / "test.db"), audit_queries=True)
+        project_id = db.add_project(Project(None, "Сроки", "", datetime(2024, 1, 1), None,
+                                            ProjectStatus.IN_PROGRESS, 0, 1))
+        for day, status in ((1, ProjectStatus.IN_PROGRESS), (3, ProjectStatus.PLANNING),
+                            (5, ProjectStatus.COMPLETED), (20, ProjectStatus.PLANNING)):
+            db.add_task(Task(None, project_id, f"Срок {day}", "", "", TaskPriority.HIGH, datetime(2024, 3, day),
+                             status))
+        return db
+
+    def test_range_query_uses_index(self, db):
+        """Тест выборки по диапазону сроков через индекс"""
+        with assert_indexed(db):
+            tasks = db.get_tasks_due_between(datetime(2024, 3, 2), datetime(2024, 3, 10))
+            assert [task.title for task in tasks] == ["Срок 3"]
+            assert len(db.get_tasks_due_between(None, datetime(2024, 3, 10), include_completed=True)) == 3
+
+    def test_scanner(self, db, monkeypatch):
+        """Тест: оповещения выдаются один раз, из БД читается только новая полоса дат"""
+        ranges = []
+        query = db.get_tasks_due_between
+        monkeypatch.setattr(db, 'get_tasks_due_between', lambda start, end: ranges.append((start, end)) or
+                            query(start, end))
+        scanner = DeadlineScanner(db, horizon_days=3)
+
+        alerts = scanner.poll(datetime(2024, 3, 2, 9, 30))
+        assert sorted((alert.task.title, alert.level) for alert in alerts) == [
+            ("Срок 1", OVERDUE), ("Срок 3", SOON)]
+        assert scanner.poll(datetime(2024, 3, 2, 18, 0)) == []
+
+        task = next(task for task in scanner.upcoming() if task.title == "Срок 3")
+        task.deadline = datetime(2024, 3, 30)
+        scanner.task_changed(task)
+        added = Task(None, task.project_id, "Новая", "", "", TaskPriority.LOW, datetime(2024, 3, 4),
+                     ProjectStatus.PLANNING)
+        added.id = db.add_task(added)
+        scanner.task_changed(added)
+        assert [(alert.task.title, alert.level) for alert in scanner.poll(datetime(2024, 3, 3))] == [("Новая", SOON)]
+        scanner.task_removed(added.id)
+        assert scanner.poll(datetime(2024, 3, 10)) == []
+
+        alerts = scanner.poll(datetime(2024, 3, 18))
+        assert [(alert.task.title, alert.level) for alert in alerts] == [("Срок 20", SOON)]
+        assert ranges == [(None, datetime(2024, 3, 5)), (datetime(2024, 3, 6), datetime(2024, 3, 6)),
+                          (datetime(2024, 3, 7), datetime(2024, 3, 13)), (datetime(2024, 3, 14), datetime(2024, 3, 21))]
+
+
+class TestAssignees:
+    """Тесты справочника исполнителей"""
+    def test_migration_deduplicates(self, tmp_path):
+        """Тест миграции текстовых исполнителей с объединением вариантов написания"""
+        db_path = str(tmp_path / "test.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, project_id INTEGER NOT NULL,
+                            title TEXT NOT NULL, description TEXT, assignee TEXT NOT NULL, priority TEXT NOT NULL,
+                            deadline TEXT NOT NULL, status TEXT NOT NULL,
+                            created_at TEXT DEFAULT CURRENT_TIMESTAMP)""")
+            conn.executemany("INSERT INTO tasks (project_id, title, assignee, priority, deadline, status) "
+                             "VALUES (1, ?, ?, 'Высокий', '2024-01-01', 'В работе')",
+                             [("a", "Алёна Смирнова"), ("b", "алена  смирнова"), ("c", "Алёна Смирнова"),
+                              ("d", "Борис"), ("e", "")])
+        db = DatabaseManager(db_path)
+        assert [name for _, name in db.get_assignees()] == ["Алёна Смирнова", "Борис"]
+        assert [task.assignee for task in db.get_tasks_by_project(1)] == [
+            "Алёна Смирнова", "Алёна Смирнова", "Алёна Смирнова", "Борис", ""]
+        DatabaseManager(db_path)
+        assert len(db.get_assignees()) == 2
+
+    @pytest.mark.filterwarnings("ignore::app.audit.QueryPlanWarning")
+    def test_assignee_queries(self, tmp_path):
+        """Тест задач и нагрузки исполнителя через индекс"""
+        db = DatabaseManager(str(tmp_path / "test.db"), audit_queries=True)
+        project_id = db.add_project(Project(None, "Команда", "", datetime(2024, 1, 1), None,
+                                            ProjectStatus.IN_PROGRESS, 0, 2))
+        db.add_tasks([
+            Task(None, project_id, "Старая", "", "Иван", TaskPriority.HIGH, datetime(2024, 1, 10),
+                 ProjectStatus.IN_PROGRESS),
+            Task(None, project_id, "Новая", "", "иван ", TaskPriority.LOW, datetime(2024, 3, 1),
+                 ProjectStatus.PLANNING),
+            Task(None, project_id, "Готово", "", "ИВАН", TaskPriority.CRITICAL, datetime(2024, 1, 5),
+                 ProjectStatus.COMPLETED),
+            Task(None, project_id, "Чужая", "", "Пётр", TaskPriority.LOW, datetime(2024, 1, 1),
+                 ProjectStatus.PLANNING),
+        ])
+        ivan = db.find_assignee("ИВАН")
+        assert ivan is not None and db.find_assignee("Нет такого") is None
+        with assert_indexed(db):
+            assert [task.title for task in db.get_assignee_tasks(ivan)] == ["Старая", "Новая"]
+            assert [task.title for task in db.get_assignee_tasks(ivan, due_before=datetime(2024, 2, 1))] == ["Старая"]
+            assert [task.title for task in db.get_assignee_tasks(ivan, include_completed=True,
+                                                                 priority=TaskPriority.CRITICAL)] == ["Готово"]
+            workload = db.get_assignee_workload(datetime(2024, 2, 1))
+        assert [row[1:] for row in workload] == [("Иван", 2, 1, 1), ("Пётр", 1, 1, 0)]
+        assert [task.title for task in db.search_tasks("пётр")] == ["Чужая"]
+
+
+class TestSoftDelete:
+    """Тесты удаления надгробиями, отмены и очистки"""
+    @pytest.fixture
+    def db(self, tmp_path):
+        return DatabaseManager(str(tmp_path / "test.db"))
+
+    def _project(self, db, tasks=3):
+        project_id = db.add_project(Project(None, "Проект", "", datetime(2024, 1, 1), None,
+                                            ProjectStatus.IN_PROGRESS, 0, 1))
+        db.add_tasks([Task(None, project_id, f"Задача {i}", "", "Анна", TaskPriority.LOW, datetime(2024, 2, 1),
+                           ProjectStatus.PLANNING) for i in range(tasks)])
+        return project_id
+
+    def test_delete_and_restore(self, db):
+        """Тест: удалённое скрыто из выборок и возвращается вместе с задачами"""
+        project_id = self._project(db)
+        lone_task = db.get_tasks_by_project(project_id)[0].id
+        assert db.del_task(lone_task) is True
+        assert db.del_task(lone_task) is False
+        assert db.del_project(project_id) is True
+        assert db.get_project(project_id) is None
+        assert db.count_tasks() == 0 and db.get_assignee_workload(datetime(2024, 1, 1))[0][2] == 0
+        assert db.restore_task(lone_task) is False
+
+        assert db.restore_project(project_id) is True
+        assert db.restore_project(project_id) is False
+        assert db.count_tasks(project_id) == 2
+        assert db.restore_task(lone_task) is True
+        assert db.count_tasks(project_id) == 3
+
+    def test_purge(self, db, tmp_path):
+        """Тест: очистка порциями физически удаляет строки и возвращает место"""
+        kept = self._project(db, tasks=10)
+        removed = self._project(db, tasks=2000)
+        db.del_project(removed)
+        db.del_task(db.get_tasks_by_project(kept)[0].id)
+        assert db.purge_deleted(datetime.now() - timedelta(days=1)) == 0
+
+        assert db.purge_deleted(datetime.now() + timedelta(seconds=1), batch_size=300) == 2000 + 1 + 1
+        with sqlite3.connect(str(tmp_path / "test.db")) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 9
+            assert conn.execute("SELECT COUNT(*) FROM deletions").fetchone()[0] == 0
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+            assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+        assert db.restore_project(removed) is False
+
+
+    def test_no_tasks_in_deleted_project(self, tmp_path):
+        """Тест: задачу нельзя добавить в удалённый проект"""
+        db = DatabaseManager(str(tmp_path / "test.db"))
+        project_id = db.add_project(Project(None, "Проект", "", datetime(2024, 1, 1), None,
+                                            ProjectStatus.PLANNING, 0, 1))
+        db.del_project(project_id)
+        task = Task(None, project_id, "Задача", "", "", TaskPriority.LOW, datetime(2024, 2, 1), ProjectStatus.PLANNING)
+        with pytest.raises(DatabaseIntegrityError):
+            db.add_task(task)
+        with pytest.raises(DatabaseIntegrityError):
+            db.add_tasks([task])
+        db.restore_project(project_id)
+        assert db.add_task(task) and db.count_tasks(project_id) == 1
+
+
+class TestChangeFeed:
+    """Тесты журнала изменений"""
+    def test_changes_since(self, tmp_path):
+        """Тест: добавления, изменения и удаления после ревизии"""
+        db = DatabaseManager(str(tmp_path / "test.db"))
+        assert db.get_revision() == 0 and not db.get_changes_since(0)
+        project_id = db.add_project(Project(None, "Проект", "", datetime(2024, 1, 1), None,
+                                            ProjectStatus.IN_PROGRESS, 0, 1))
+        first, second = [db.add_task(Task(None, project_id, title, "", "", TaskPriority.LOW, datetime(2024, 2, 1),
+                                          ProjectStatus.PLANNING)) for title in ("Первая", "Вторая")]
+        start = db.get_revision()
+        changes = db.get_changes_since(0)
+        assert changes.revision == start
+        assert [p.id for p in changes.projects] == [project_id] and len(changes.tasks) == 2
+
+        db.set_task_duration(first, 5)
+        db.del_task(second)
+        changes = db.get_changes_since(start)
+        assert [(t.id, t.duration) for t in changes.tasks] == [(first, 5)]
+        assert changes.deleted_tasks == [second] and changes.projects == []
+        assert not db.get_changes_since(changes.revision)
+
+        db.restore_task(second)
+        db.del_project(project_id)
+        db.purge_deleted(datetime.now() + timedelta(seconds=1))
+        changes = db.get_changes_since(start)
+        assert changes.deleted_projects == [project_id] and changes.deleted_tasks == [first, second]
+        assert changes.revision > start
+        with sqlite3.connect(str(tmp_path / "test.db")) as conn:
+            # После сжатия в журнале по одной записи на строку
+            assert conn.execute("SELECT COUNT(*) FROM changes").fetchone()[0] == 3
+
+    def test_compact_in_batches(self, tmp_path):
+        """Тест: сжатие порциями оставляет последнюю запись строки и не повторяет работу"""
+        db = DatabaseManager(str(tmp_path / "test.db"))
+        project_id = db.add_project(Project(None, "Проект", "", datetime(2024, 1, 1), None,
+                                            ProjectStatus.IN_PROGRESS, 0, 1))
+        task_ids = [db.add_task(Task(None, project_id, str(n), "", "", TaskPriority.LOW, datetime(2024, 2, 1),
+                                     ProjectStatus.PLANNING)) for n in range(5)]
+        for duration in (2, 3):
+            for task_id in task_ids:
+                db.set_task_duration(task_id, duration)
+        start = db.get_revision()
+        assert db.compact_changes(batch_size=2) == 10
+        assert db.compact_changes(batch_size=2) == 0
+        db.set_task_duration(task_ids[0], 4)
+        assert db.compact_changes(batch_size=2) == 1
+        changes = db.get_changes_since(start)
+        assert [(t.id, t.duration) for t in changes.tasks] == [(task_ids[0], 4)]
+        with sqlite3.connect(str(tmp_path / "test.db")) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM changes").fetchone()[0] == 6
+
+
+class TestMemoryDatabase:
+    """Тесты БД в памяти"""
+    def test_memory_isolated(self):
+        """Тест: данные живут между вызовами и не видны другим экземплярам"""
+        db = DatabaseManager(MEMORY)
+        db.add_project(Project(None, "В памяти", "", datetime(2024, 1, 1), None, ProjectStatus.PLANNING, 0, 1))
+        assert db.in_memory and db.count_projects() == 1
+        assert DatabaseManager(MEMORY).count_projects() == 0
+
+    def test_shared_by_name(self):
+        """Тест: именованная БД общая, запись из потоков ждёт блокировку"""
+        first = DatabaseManager(memory_uri("shared-test"))
+        second = DatabaseManager(memory_uri("shared-test"))
+        project_id = first.add_project(Project(None, "Общий", "", datetime(2024, 1, 1), None,
+                                               ProjectStatus.PLANNING, 0, 1))
+        threads = [threading.Thread(target=lambda: [second.add_task(
+            Task(None, project_id, "Задача", "", "", TaskPriority.LOW, datetime(2024, 2, 1), ProjectStatus.PLANNING))
+            for _ in range(20)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert first.count_tasks(project_id) == 80
+
+    def test_clone(self, seeded_template, seeded_db):
+        """Тест: копия шаблона совпадает с ним и изменяется независимо"""
+        assert seeded_db.get_task_rows() == seeded_template.get_task_rows()
+        seeded_db.del_project(seeded_db.get_all_projects()[0].id)
+        assert seeded_db.count_projects() == seeded_template.count_projects() - 1
+
+
+class TestTimeline:
+    """Тесты данных диаграммы Ганта"""
+    def test_bars_and_visible(self):
+        """Тест: порядок строк, границы полос и отсечение по окну"""
+        db = DatabaseManager(MEMORY)
+        late = db.add_project(Project(None, "Поздний", "", datetime(2024, 3, 1), datetime(2024, 3, 31),
+                                      ProjectStatus.PLANNING, 0, 1))
+        early = db.add_project(Project(None, "Ранний", "", datetime(2024, 1, 1), None, ProjectStatus.IN_PROGRESS, 0, 1))
+        for title, deadline, duration in (("Вторая", datetime(2024, 2, 20), 5), ("Первая", datetime(2024, 1, 10), 1)):
+            task_id = db.add_task(Task(None, early, title, "", "", TaskPriority.HIGH, deadline, ProjectStatus.PLANNING))
+            db.set_task_duration(task_id, duration)
+
+        timeline = Timeline.from_database(db, today=datetime(2024, 6, 1))
+        assert timeline.labels == ["Ранний", "Первая", "Вторая", "Поздний"]
+        assert list(timeline.kinds) == [PROJECT, TASK, TASK, PROJECT]
+        assert timeline.ids[3] == late
+        day = to_day_number
+        # Незавершённый проект тянется до сегодня, задача - duration дней до срока включительно
+        assert timeline.ends[0] == day(datetime(2024, 6, 2))
+        assert (timeline.starts[2], timeline.ends[2]) == (day(datetime(2024, 2, 16)), day(datetime(2024, 2, 21)))
+        assert timeline.span() == (day(datetime(2024, 1, 1)), day(datetime(2024, 6, 2)))
+
+        february = (day(datetime(2024, 2, 1)), day(datetime(2024, 3, 1)))
+        assert list(timeline.visible(*february, 0, 10)) == [0, 2]
+        assert list(timeline.visible(*february, 1.5, 10)) == [2]
+        assert list(timeline.visible(*february, 20, 30)) == []
+
+
+class TestUpdate:
+    """Тесты изменения проектов и задач"""
+    @pytest.fixture
+    def db(self):
+        db = DatabaseManager(MEMORY)
+        project_id = db.add_project(Project(None, "Проект", "", datetime(2024, 1, 1), None,
+                                            ProjectStatus.PLANNING, 100.0, 2))
+        db.add_task(Task(None, project_id, "Задача", "", "Анна", TaskPriority.LOW, datetime(2024, 2, 1),
+                         ProjectStatus.PLANNING))
+        return db
+
+    def test_partial_update(self, db):
+        """Тест: меняются только переданные поля, id и created_at сохраняются"""
+        project = db.get_all_projects()[0]
+        task = db.get_tasks_by_project(project.id)[0]
+        created_at = next(db.iter_task_rows())[0][TASK_COLUMNS.index('created_at')]
+        assert db.update_task(task.id, task.version, status=ProjectStatus.COMPLETED, assignee="Борис") == 2
+        assert db.update_project(project.id, end_date=datetime(2024, 3, 1)) == 2
+        updated = db.get_tasks_by_project(project.id)[0]
+        assert (updated.id, updated.title, updated.status, updated.assignee, updated.version) == \
+            (task.id, "Задача", ProjectStatus.COMPLETED, "Борис", 2)
+        assert db.get_project(project.id).end_date == datetime(2024, 3, 1)
+        assert next(db.iter_task_rows())[0][TASK_COLUMNS.index('created_at')] == created_at
+        assert db.update_task(999, status=ProjectStatus.COMPLETED) is None
+        with pytest.raises(ValueError):
+            db.update_task(task.id, project_id=2)
+
+    def test_stale_version(self, db):
+        """Тест: устаревшая версия отклоняется, пакет правок откатывается целиком"""
+        project = db.get_all_projects()[0]
+        task = db.get_tasks_by_project(project.id)[0]
+        db.update_task(task.id, task.version, title="Чужая правка")
+        with pytest.raises(StaleVersionError):
+            with db.batch():
+                db.update_project(project.id, project.version, name="Новое имя")
+                db.update_task(task.id, task.version, title="Моя правка")
+        assert db.get_project(project.id).name == "Проект"
+        assert db.get_tasks_by_project(project.id)[0].title == "Чужая правка"
+
+
+class TestReports:
+    """Тесты HTML-отчётов по проектам"""
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_generate_reports(self, tmp_path, workers):
+        """Тест: отчёт на проект с графиками и оглавление, в том числе из пула процессов"""
+        db = DatabaseManager(str(tmp_path / "test.db"))
+        ids = [db.add_project(Project(None, f"Проект <{n}>", "", datetime(2024, 1, 1), None,
+                                      ProjectStatus.IN_PROGRESS, 100.0, 2)) for n in range(3)]
+        db.add_task(Task(None, ids[0], "Задача", "", "Анна", TaskPriority.HIGH, datetime(2024, 2, 1),
+                         ProjectStatus.PLANNING))
+        progress = []
+        paths = generate_reports(db, str(tmp_path / "reports"), workers=workers,
+                                 progress=lambda done, total: progress.append((done, total)))
+        assert [os.path.basename(path) for path in paths] == [f"project-{i}.html" for i in ids]
+        assert progress[-1] == (3, 3)
+        report = open(paths[0], encoding='utf-8').read()
+        assert "Проект &lt;0&gt;" in report and "data:image/png" in report and "Анна" in report
+        index = open(tmp_path / "reports" / "index.html", encoding='utf-8').read()
+        assert all(f'href="project-{i}.html"' in index for i in ids)
+
+
+class TestWorkspaces:
+    """Тесты рабочих пространств и запросов по всем БД сразу"""
+    @pytest.fixture
+    def workspaces(self, tmp_path):
+        workspaces = Workspaces()
+        for n, team in enumerate(("backend", "frontend")):
+            db = workspaces.open(workspaces.add(str(tmp_path / f"{team}.db")))
+            project_id = db.add_project(Project(None, f"API {team}", "", datetime(2024, 1, 1), None,
+                                                ProjectStatus.IN_PROGRESS, 100.0 * (n + 1), 2))
+            db.add_task(Task(None, project_id, f"Задача {team}", "", "Анна", TaskPriority.HIGH,
+                             datetime(2024, 2, 1), ProjectStatus.PLANNING))
+        workspaces.add(MEMORY, "пустое")
+        return workspaces
+
+    def test_cross_queries(self, workspaces):
+        """Тест: сводка, поиск и нагрузка считаются по всем пространствам"""
+        today = datetime(2024, 3, 1)
+        assert workspaces.summary(today) == [("backend", 1, 1, 1, 1, 100.0), ("frontend", 1, 1, 1, 1, 200.0),
+                                             ("пустое", 0, 0, 0, 0, 0)]
+        assert [(name, project.name) for name, project in workspaces.search_projects("api")] == \
+            [("backend", "API backend"), ("frontend", "API frontend")]
+        assert [(name, task.title) for name, task in workspaces.search_tasks("FRONT")] == \
+            [("frontend", "Задача frontend")]
+        assert workspaces.workload(today) == [("Анна", 2, 2, 2)]
+
+    def test_more_than_attach_limit(self, workspaces, tmp_path):
+        """Тест: пространств больше предела ATTACH - запросы идут группами и сливаются"""
+        for n in range(10):
+            db = workspaces.open(workspaces.add(str(tmp_path / f"team{n}.db")))
+            project_id = db.add_project(Project(None, f"API {n}", "", datetime(2024, 1, 1), None,
+                                                ProjectStatus.IN_PROGRESS, 1.0, 2))
+            db.add_task(Task(None, project_id, f"Задача {n}", "", "Анна", TaskPriority.LOW,
+                             datetime(2024, 4, 1), ProjectStatus.PLANNING))
+        today = datetime(2024, 3, 1)
+        assert [row[0] for row in workspaces.summary(today)] == workspaces.names
+        assert len(workspaces.search_projects("api")) == 12
+        assert [name for name, _ in workspaces.search_tasks("задача 9")] == ["team9"]
+        assert workspaces.workload(today) == [("Анна", 12, 2, 12)]
+
+    def test_names_and_persistence(self, workspaces, tmp_path):
+        """Тест: имена не повторяются, список пространств сохраняется в файл"""
+        assert workspaces.add(str(tmp_path / "backend.db")) == "backend"
+        assert workspaces.add(str(tmp_path / "other" / "backend.db")) == "backend (2)"
+        workspaces.remove("backend (2)")
+        workspaces.current = "frontend"
+        path = str(tmp_path / "workspaces.json")
+        workspaces.save(path)
+        loaded = Workspaces.load(path)
+        assert loaded.names == ["backend", "frontend", "пустое"] and loaded.current == "frontend"
+        assert Workspaces.load(str(tmp_path / "missing.json")).names == []
+
+
+class TestArchive:
+    """Тесты архивирования завершённых проектов"""
+    @pytest.fixture
+    def db(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / "test.db"))
+        for name, end, status in (("Старый", datetime(2020, 2, 1), ProjectStatus.COMPLETED),
+                                  ("Недавний", datetime(2024, 2, 1), ProjectStatus.COMPLETED),
+                                  ("Текущий", None, ProjectStatus.IN_PROGRESS)):
+            project_id = db.add_project(Project(None, name, "", datetime(2020, 1, 1), end, status, 100.0, 2))
+            first = db.add_task(Task(None, project_id, f"{name} 1", "", "Анна", TaskPriority.HIGH,
+                                     datetime(2020, 1, 10), ProjectStatus.COMPLETED))
+            second = db.add_task(Task(None, project_id, f"{name} 2", "", "", TaskPriority.LOW,
+                                      datetime(2020, 1, 20), ProjectStatus.COMPLETED))
+            db.add_dependency(second, first)
+        return db
+
+    def test_archive_and_restore(self, db, tmp_path):
+        """Тест: перенос старых завершённых проектов с задачами и возврат с прежними id"""
+        project = db.search_projects("Старый")[0]
+        tasks = db.get_tasks_by_project(project.id)
+        revision = db.get_revision()
+        assert db.archive_projects(datetime(2023, 1, 1), batch_size=1) == 1
+        assert sorted(p.name for p in db.get_all_projects()) == ["Недавний", "Текущий"]
+        assert db.count_tasks() == 4
+        changes = db.get_changes_since(revision)
+        assert changes.deleted_projects == [project.id] and changes.deleted_tasks == [t.id for t in tasks]
+
+        archive = db.open_archive(read_only=True)
+        assert (tmp_path / "test-archive.db").exists()
+        assert [p.name for p in archive.search_projects("стар")] == ["Старый"]
+        assert archive.get_tasks_by_project(project.id) == tasks
+        assert archive.get_dependencies(project.id) == [(tasks[1].id, tasks[0].id)]
+        with pytest.raises(DatabaseError):
+            archive.add_project(project)
+
+        assert db.restore_archived([project.id, 999]) == 1
+        assert db.get_project(project.id) == project
+        assert db.get_tasks_by_project(project.id) == tasks
+        assert db.get_dependencies(project.id) == [(tasks[1].id, tasks[0].id)]
+        assert archive.count_projects() == 0